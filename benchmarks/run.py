@@ -0,0 +1,146 @@
+"""
+Offline end-to-end benchmark of the hospital services.
+
+Every service runs in-process in its own interpreter (see worker.py) against
+a scratch SQLite database filled by generate_synthetic_data; the upstream
+services it calls (token introspection, patient/staff/user/inventory
+lookups) are answered by a local stub server (see stubs.py). No
+docker-compose, PostgreSQL or network access is needed.
+
+    python benchmarks/run.py --scale 0.1 --requests 200 --concurrency 1 8 \\
+        --output report.json [--compare previous-report.json]
+
+The JSON report holds p50/p95/p99, throughput and database queries per
+request for every endpoint and concurrency level, plus the git commit, so
+reports of different commits can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scenarios import SCENARIOS
+from stubs import StubServer
+from worker import ROOT, SERVICES
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_service(service, stub, args, workdir):
+    output = Path(workdir) / f'{service}.json'
+    command = [
+        sys.executable, str(Path(__file__).with_name('worker.py')), service,
+        '--database', str(Path(workdir) / f'{service}.sqlite3'),
+        '--output', str(output),
+        '--scale', str(args.scale),
+        '--seed', str(args.seed),
+        '--requests', str(args.requests),
+        '--warmup', str(args.warmup),
+        '--concurrency', *map(str, args.concurrency),
+    ]
+    for scenario in args.scenario:
+        command += ['--scenario', scenario]
+
+    calls_before = stub.calls
+    started = time.perf_counter()
+    # The services print debugging output on stdout; errors still show on stderr.
+    subprocess.run(command, env={**os.environ, **stub.service_env()}, stdout=subprocess.DEVNULL, check=True)
+    with open(output, encoding='utf-8') as output_file:
+        result = json.load(output_file)
+    result['seconds'] = round(time.perf_counter() - started, 1)
+    result['upstream_calls'] = stub.calls - calls_before
+    return result
+
+
+def compare(report, baseline):
+    """Print p95 and throughput changes against an earlier report."""
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for service, result in report['services'].items():
+        for scenario, levels in result['scenarios'].items():
+            for concurrency, stats in levels.items():
+                previous = (
+                    baseline.get('services', {}).get(service, {})
+                    .get('scenarios', {}).get(scenario, {}).get(concurrency)
+                )
+                if not previous:
+                    continue
+                p95 = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+                rps = (stats['throughput_rps'] - previous['throughput_rps']) / previous['throughput_rps'] * 100
+                print(
+                    f"  {service}/{scenario} x{concurrency}: p95 {previous['p95_ms']} -> {stats['p95_ms']} ms "
+                    f"({p95:+.0f}%), throughput {previous['throughput_rps']} -> {stats['throughput_rps']} rps "
+                    f"({rps:+.0f}%)"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--services', nargs='+', choices=SERVICES, default=list(SERVICES))
+    parser.add_argument(
+        '--scenario', action='append', default=[],
+        help="Only run this scenario (repeatable); see scenarios.py.",
+    )
+    parser.add_argument('--scale', type=float, default=0.1, help="Synthetic dataset scale.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help="Timed requests per scenario and concurrency.")
+    parser.add_argument('--warmup', type=int, default=10, help="Untimed requests before each run.")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8], help="Client threads.")
+    parser.add_argument(
+        '--upstream-latency-ms', type=float, default=0.0,
+        help="Delay the stub upstream services add to every response.",
+    )
+    parser.add_argument('--output', default='benchmark-report.json')
+    parser.add_argument('--compare', help="Earlier report to compare with.")
+    args = parser.parse_args()
+
+    stub = StubServer(latency=args.upstream_latency_ms / 1000).start()
+    report = {
+        'commit': git_commit(),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            key: getattr(args, key)
+            for key in ('scale', 'seed', 'requests', 'warmup', 'concurrency', 'upstream_latency_ms')
+        },
+        'services': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='hospital-bench-') as workdir:
+        for service in args.services:
+            if args.scenario and not any(s.name in args.scenario for s in SCENARIOS[service]):
+                continue
+            print(f"{service}: seeding and benchmarking...", flush=True)
+            result = report['services'][service] = run_service(service, stub, args, workdir)
+            for scenario, levels in result['scenarios'].items():
+                for concurrency, stats in levels.items():
+                    print(
+                        f"  {scenario:<16} x{concurrency:<3} p50 {stats['p50_ms']:>8.1f} ms  "
+                        f"p95 {stats['p95_ms']:>8.1f} ms  p99 {stats['p99_ms']:>8.1f} ms  "
+                        f"{stats['throughput_rps']:>7.1f} rps  {stats['queries_per_request']:>5.1f} queries"
+                        + (f"  {stats['errors']} errors" if stats['errors'] else "")
+                    )
+    stub.shutdown()
+
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            compare(report, json.load(baseline_file))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Endpoints driven for each service. A scenario builds the i-th request from
+the synthetic dataset's volumes (`counts`, see generate_synthetic_data) so
+that every request hits existing rows.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+PASSWORD = 'synthetic-password'
+SURNAMES = ["Rossi", "Bianchi", "Ferrari", "Esposito", "Ricci", "Greco", "Conti", "Costa"]
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[int, dict], str]
+    body: Optional[Callable[[int, dict], dict]] = None
+    authenticated: bool = True
+
+
+def _pick(i, count):
+    """A spread-out but deterministic 1-based id for the i-th request."""
+    return (i * 7919) % count + 1
+
+
+SCENARIOS = {
+    'auth': [
+        Scenario(
+            'login', 'POST', lambda i, counts: '/api/auth/login/',
+            body=lambda i, counts: {'username': f"doctor{_pick(i, counts['doctors'])}", 'password': PASSWORD},
+            authenticated=False,
+        ),
+    ],
+    'patient': [
+        Scenario(
+            'patient_search', 'GET',
+            lambda i, counts: f"/api/patients/search/?q={SURNAMES[i % len(SURNAMES)]}&limit=10",
+        ),
+        Scenario('patient_detail', 'GET', lambda i, counts: f"/api/patients/{_pick(i, counts['patients'])}/"),
+    ],
+    'staff': [
+        Scenario('doctor_detail', 'GET', lambda i, counts: f"/api/doctors/{_pick(i, counts['doctors'])}/"),
+    ],
+    'inventory': [
+        Scenario('low_stock', 'GET', lambda i, counts: '/api/inventory/inventoryitems/low_stock/'),
+    ],
+    'visit': [
+        Scenario(
+            'visit_list_day', 'GET',
+            lambda i, counts: (
+                f"/api/visit/emergency-visits/?arrival_time__date={date.today() - timedelta(days=1 + i % 7)}"
+            ),
+        ),
+        Scenario('visit_active', 'GET', lambda i, counts: '/api/visit/emergency-visits/active/'),
+        Scenario(
+            'patient_chart', 'GET',
+            lambda i, counts: f"/api/visit/emergency-visits/timeline/?patient_id={_pick(i, counts['patients'])}",
+        ),
+        Scenario('visit_stats', 'GET', lambda i, counts: '/api/visit/emergency-visits/stats/'),
+        Scenario(
+            'vitals_ingest', 'POST', lambda i, counts: '/api/visit/vital-signs/',
+            body=lambda i, counts: {
+                'visit': _pick(i, counts['visits']),
+                'heart_rate': 60 + i % 60,
+                'blood_pressure_systolic': 110 + i % 40,
+                'blood_pressure_diastolic': 70 + i % 20,
+                'oxygen_saturation': 92 + i % 8,
+            },
+        ),
+    ],
+}
@@ -0,0 +1,97 @@
+"""
+Print the call tree of one trace across the services, with the duration and
+self time of every span, and point out the slowest hop.
+
+The spans come from the /traces endpoint of every service (enabled with
+TRACE_ENDPOINT_ENABLED=true; by default the docker-compose ports are
+queried) or from the files the services export with TRACE_EXPORT_PATH:
+
+    python benchmarks/show_trace.py 4bf92f3577b34da6a3ce929d0e0e4736
+    python benchmarks/show_trace.py 4bf92f35... --file /tmp/visit-spans.jsonl /tmp/patient-spans.jsonl
+
+The trace id of a response is in its `traceresponse` header
+(00-<trace id>-<span id>-01) and in the service's timing log line.
+"""
+import argparse
+import json
+
+import requests
+
+DEFAULT_SERVICES = [f"http://localhost:{port}" for port in (8000, 8001, 8002, 8003, 8004)]
+
+
+def fetch_spans(trace_id, services, files):
+    spans = []
+    for path in files:
+        with open(path, encoding='utf-8') as spans_file:
+            spans += [span for span in map(json.loads, spans_file) if span['trace_id'] == trace_id]
+    for url in services:
+        try:
+            response = requests.get(f"{url.rstrip('/')}/traces", params={'trace_id': trace_id}, timeout=5)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            print(f"{url}: {exc}")
+            continue
+        spans += response.json()['spans']
+    # The same span can come from a file and an endpoint.
+    return list({span['span_id']: span for span in spans}.values())
+
+
+def print_tree(spans):
+    children = {}
+    by_id = {span['span_id']: span for span in spans}
+    for span in spans:
+        parent = span['parent_id'] if span['parent_id'] in by_id else None
+        children.setdefault(parent, []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span['start'])
+
+    def self_time(span):
+        return span['duration_ms'] - sum(child['duration_ms'] for child in children.get(span['span_id'], []))
+
+    def walk(span, depth):
+        status = span['attributes'].get('status') or span['attributes'].get('error') or ''
+        print(
+            f"{'  ' * depth}{span['service']:<10} {span['kind']:<6} {span['name']:<60} "
+            f"{span['duration_ms']:>9.1f} ms  self {self_time(span):>8.1f} ms  {status}"
+        )
+        for child in children.get(span['span_id'], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+
+    # A hop is a call to another service: the client span on the caller's side.
+    hops = [span for span in spans if span['kind'] == 'client']
+    if hops:
+        slowest = max(hops, key=lambda span: span['duration_ms'])
+        print(
+            f"\n{len(hops)} calls between services, {sum(h['duration_ms'] for h in hops):.1f} ms in total; "
+            f"slowest: {slowest['service']} -> {slowest['name']} ({slowest['duration_ms']:.1f} ms)"
+        )
+    slowest_self = max(spans, key=self_time)
+    print(
+        f"Most time spent in: {slowest_self['service']} {slowest_self['name']} "
+        f"({self_time(slowest_self):.1f} ms outside its child spans)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('trace_id')
+    parser.add_argument(
+        '--service', action='append', dest='services',
+        help="Base URL of a service to query (repeatable; default: the docker-compose ports).",
+    )
+    parser.add_argument('--file', nargs='+', default=[], help="Span files written with TRACE_EXPORT_PATH.")
+    args = parser.parse_args()
+
+    services = args.services if args.services is not None else ([] if args.file else DEFAULT_SERVICES)
+    spans = fetch_spans(args.trace_id, services, args.file)
+    if not spans:
+        parser.exit(1, f"No spans found for trace {args.trace_id}.\n")
+    print_tree(spans)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,560 @@
+"""
+Emergency-room shift simulation against the five services running for real.
+
+Unlike run.py, which measures one endpoint at a time against stubbed
+upstreams, this drives the whole system the way a shift does: patients
+arrive as a Poisson process whose rate follows the hour of day, are
+registered (patient search) and triaged, get vitals every few minutes
+depending on their triage level, diagnoses, treatments and prescriptions,
+and are either discharged (with their prescriptions dispensed) or admitted
+and discharged after boarding. Meanwhile --terminals dashboards keep polling
+the active visits, the ER stats, the free beds, the current admissions and
+the low-stock items. Every call goes through token introspection on the auth
+service and the visit service validates ids against the patient, staff and
+auth services, so all five services are in the loop.
+
+By default every service is started locally with uvicorn on a scratch
+SQLite database seeded by generate_synthetic_data, the services pointing at
+each other. With --attach the simulation runs against an already running
+deployment instead (the docker-compose ports), which must have been seeded
+with the same --scale. SQLite takes one writer at a time, so locally the
+write endpoints (discharge_workflow first) start failing with "database is
+locked" well before they would on PostgreSQL.
+
+    python benchmarks/simulate_shift.py --hours 8 --speedup 60 --terminals 4 \\
+        --ramp-to 4 --output shift-report.json
+
+The shift clock runs --speedup times faster than real time, and so does the
+load: at --speedup 60 the services see one shift minute of traffic every
+second. --load and --ramp-to multiply the arrival rate, linearly from the
+first to the second over the shift, so that a single run can look for the
+load at which the system breaks. The report is a time series of shift
+buckets with throughput, error rate and latency percentiles, overall and per
+endpoint, plus the first bucket that broke the --p95-budget-ms or
+--max-error-rate limits.
+"""
+import argparse
+import ast
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from run import git_commit
+from scenarios import PASSWORD, SURNAMES
+from worker import ROOT, SERVICES, percentile
+
+# Same shape as the visit service's synthetic data: relative arrivals by hour
+# of day, triage mix, admission probability and median stay (minutes).
+HOUR_WEIGHTS = [3, 2, 2, 1, 1, 1, 2, 4, 6, 8, 9, 9, 8, 8, 7, 7, 7, 8, 8, 7, 6, 5, 4, 3]
+TRIAGE_WEIGHTS = {1: 2, 2: 12, 3: 40, 4: 34, 5: 12}
+ADMISSION_RATE = {1: 0.7, 2: 0.4, 3: 0.15, 4: 0.04, 5: 0.01}
+MEDIAN_STAY = {1: 360, 2: 300, 3: 240, 4: 150, 5: 90}
+# Minutes between two sets of vitals by triage level.
+VITALS_EVERY = {1: 5, 2: 10, 3: 20, 4: 30, 5: 45}
+# Minutes an admitted patient boards in the ER before leaving for the ward.
+BOARDING = 60
+CHIEF_COMPLAINTS = ["Chest pain", "Shortness of breath", "Abdominal pain", "Fall with head trauma", "Fever"]
+DEPARTMENTS = ["Cardiology", "Internal Medicine", "Neurology", "Orthopedics", "General Surgery"]
+TREATMENTS = [('MED', 'Paracetamol 1g IV'), ('TEST', 'Complete blood count'), ('PROC', 'Wound suture')]
+
+# Ports published by docker-compose, used with --attach.
+ATTACH_PORTS = {'auth': 8000, 'inventory': 8001, 'patient': 8002, 'staff': 8003, 'visit': 8004}
+API_PREFIX = {
+    'auth': '/api/auth/',
+    'inventory': '/api/inventory/',
+    'patient': '/api/',
+    'staff': '/api/',
+    'visit': '/api/visit/',
+}
+
+
+def dataset_counts(scale):
+    """
+    Row counts of generate_synthetic_data at this scale, read from the visit
+    command's SCALE_UNIT without importing it (that needs Django set up).
+    """
+    path = ROOT / 'services' / 'visit_service' / 'visit_app' / 'management' / 'commands' / 'generate_synthetic_data.py'
+    for node in ast.parse(path.read_text(encoding='utf-8')).body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'SCALE_UNIT' for t in node.targets):
+            unit = ast.literal_eval(node.value)
+            return {name: max(1, round(count * scale)) for name, count in unit.items()}
+    raise RuntimeError(f"SCALE_UNIT not found in {path}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"service on port {port} exited with status {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"service on port {port} did not start within {timeout}s")
+
+
+def start_services(args, workdir, servers):
+    """
+    Migrate, seed and serve every service on a free local port, wired to
+    each other through the same environment variables docker-compose sets.
+    The server processes are appended to `servers`; returns the base URLs.
+    """
+    ports = {service: free_port() for service in SERVICES}
+    urls = {service: f"http://127.0.0.1:{port}" for service, port in ports.items()}
+    upstream = {
+        'AUTH_INTROSPECT_URL': f"{urls['auth']}/api/auth/introspect/",
+        'AUTH_SERVICE_URL': f"{urls['auth']}/api/auth/",
+        'PATIENT_SERVICE_URL': f"{urls['patient']}/api/",
+        'STAFF_SERVICE_URL': f"{urls['staff']}/api/",
+        'INVENTORY_SERVICE_URL': f"{urls['inventory']}/api/inventory/",
+    }
+
+    def service_env(service):
+        env = {
+            **os.environ, **upstream,
+            'DB_ENGINE': 'django.db.backends.sqlite3',
+            'DB_NAME': str(Path(workdir) / f'{service}.sqlite3'),
+            # Read inverted by the settings: "true" turns DEBUG off.
+            'DJANGO_DEBUG': 'true',
+        }
+        if args.service_workers > 1:
+            # Lets /metrics aggregate the uvicorn workers.
+            metrics_dir = Path(workdir) / f'{service}-metrics'
+            metrics_dir.mkdir(exist_ok=True)
+            env['PROMETHEUS_MULTIPROC_DIR'] = str(metrics_dir)
+        return env
+
+    logs_dir = Path(args.logs or workdir)
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    logs = {service: open(logs_dir / f'{service}.log', 'w', encoding='utf-8') for service in SERVICES}
+    seeding = {
+        service: subprocess.Popen(
+            f"{sys.executable} manage.py migrate --verbosity 0 && "
+            f"{sys.executable} manage.py generate_synthetic_data --scale {args.scale} --seed {args.seed}",
+            shell=True, cwd=ROOT / 'services' / service_dir, env=service_env(service),
+            stdout=subprocess.DEVNULL, stderr=logs[service],
+        )
+        for service, (service_dir, _, _) in SERVICES.items()
+    }
+    for service, process in seeding.items():
+        if process.wait():
+            logs[service].close()
+            log = Path(logs[service].name).read_text(encoding='utf-8')
+            raise RuntimeError(f"seeding {service} failed:\n{log[-2000:]}")
+
+    for service, (service_dir, _, app) in SERVICES.items():
+        # The services print debugging output on stdout; uvicorn logs warnings on stderr.
+        servers.append(subprocess.Popen(
+            [
+                # Same entry point as docker-compose.
+                sys.executable, '-m', 'uvicorn', f'{app}.asgi:application',
+                '--host', '127.0.0.1', '--port', str(ports[service]),
+                '--workers', str(args.service_workers), '--log-level', 'warning', '--no-access-log',
+            ],
+            cwd=ROOT / 'services' / service_dir, env=service_env(service),
+            stdout=subprocess.DEVNULL, stderr=logs[service],
+        ))
+    for service, process in zip(SERVICES, servers):
+        wait_for_port(ports[service], process)
+    return urls
+
+
+class Shift:
+    """
+    Discrete-event driver. Events are scheduled on the shift clock (minutes
+    since the start of the shift) and fired on a thread pool when the
+    scaled real clock reaches them; an event's follow-ups are scheduled
+    from its response (e.g. a visit's vitals once the visit has an id).
+    """
+
+    def __init__(self, args, urls, token, counts):
+        self.args = args
+        self.urls = {service: url.rstrip('/') + API_PREFIX[service] for service, url in urls.items()}
+        self.counts = counts
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.headers = {'Authorization': f'Token {token}', 'Content-Type': 'application/json'}
+        self.local = threading.local()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.wakeup = threading.Condition()
+        self.pending = 0
+        self.samples = []
+        self.samples_lock = threading.Lock()
+        self.lags = []
+        self.arrivals = []
+        self.prescriptions = {}
+        self.started = None
+
+    # Clock and scheduling.
+
+    def now(self):
+        """Current shift minute."""
+        return (time.monotonic() - self.started) * self.args.speedup / 60
+
+    def load_factor(self, minute):
+        fraction = min(max(minute / (self.args.hours * 60), 0), 1)
+        return self.args.load + (self.args.ramp_to - self.args.load) * fraction
+
+    def arrival_rate(self, minute):
+        """Expected arrivals per shift minute at this point of the shift."""
+        hour = int(self.args.start_hour + minute // 60) % 24
+        per_hour = self.args.arrivals_per_day * HOUR_WEIGHTS[hour] / sum(HOUR_WEIGHTS)
+        return per_hour / 60 * self.load_factor(minute)
+
+    def schedule(self, minute, action, *args):
+        if minute >= self.args.hours * 60:
+            return
+        with self.wakeup:
+            heapq.heappush(self.queue, (minute, next(self.sequence), action, args))
+            self.wakeup.notify()
+
+    def random(self, method, *args):
+        with self.rng_lock:
+            return getattr(self.rng, method)(*args)
+
+    # HTTP.
+
+    def call(self, endpoint, service, method, path, body=None):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+            session.headers.update(self.headers)
+        minute = self.now()
+        started = time.perf_counter()
+        try:
+            response = session.request(
+                method, self.urls[service] + path, timeout=self.args.timeout,
+                data=json.dumps(body) if body is not None else None,
+            )
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 0
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.samples_lock:
+            self.samples.append((minute, endpoint, elapsed, status))
+        if response is not None and status < 400:
+            try:
+                return response.json()
+            except ValueError:
+                return {}
+        return None
+
+    # Patient journey.
+
+    def arrive(self):
+        minute = self.now()
+        self.arrivals.append(minute)
+        triage = self.random('choices', list(TRIAGE_WEIGHTS), list(TRIAGE_WEIGHTS.values()))[0]
+        self.call('registration_search', 'patient', 'GET',
+                  f"patients/search/?q={self.random('choice', SURNAMES)}&limit=10")
+        visit = self.call('triage', 'visit', 'POST', 'emergency-visits/', {
+            'patient_id': self.random('randint', 1, self.counts['patients']),
+            'triage_level': triage,
+            'chief_complaint': self.random('choice', CHIEF_COMPLAINTS),
+            'attending_physician_id': self.random('randint', 1, self.counts['doctors']),
+            'triage_nurse_id': self.random('randint', 1, self.counts['nurses']),
+        })
+        if not visit:
+            return
+        visit_id = visit['id']
+        stay = self.random('lognormvariate', math.log(MEDIAN_STAY[triage]), 0.5)
+        doctor = self.random('randint', 1, self.counts['doctors'])
+
+        vitals = minute + VITALS_EVERY[triage]
+        while vitals < minute + stay:
+            self.schedule(vitals, self.vitals, visit_id)
+            vitals += VITALS_EVERY[triage]
+        self.schedule(minute + stay * 0.2, self.diagnose, visit_id, doctor)
+        for _ in range(self.random('randint', 1, 3)):
+            self.schedule(minute + stay * self.random('uniform', 0.1, 0.9), self.treat, visit_id, doctor)
+        if self.random('random') < ADMISSION_RATE[triage]:
+            self.schedule(minute + stay, self.admit, visit_id, doctor)
+            self.schedule(minute + stay + BOARDING, self.discharge, visit_id)
+        else:
+            self.schedule(minute + stay * 0.9, self.prescribe, visit_id, doctor)
+            self.schedule(minute + stay, self.discharge, visit_id)
+
+    def vitals(self, visit_id):
+        self.call('vitals', 'visit', 'POST', 'vital-signs/', {
+            'visit': visit_id,
+            'heart_rate': self.random('randint', 55, 130),
+            'blood_pressure_systolic': self.random('randint', 95, 170),
+            'blood_pressure_diastolic': self.random('randint', 55, 100),
+            'oxygen_saturation': self.random('randint', 88, 100),
+            'pain_level': self.random('randint', 0, 10),
+        })
+
+    def diagnose(self, visit_id, doctor):
+        self.call('diagnosis', 'visit', 'POST', 'diagnoses/', {
+            'visit': visit_id, 'code': 'R07.9', 'description': 'Chest pain, unspecified',
+            'diagnosed_by_id': doctor, 'is_primary': True,
+        })
+
+    def treat(self, visit_id, doctor):
+        treatment_type, name = self.random('choice', TREATMENTS)
+        self.call('treatment', 'visit', 'POST', 'treatments/', {
+            'visit': visit_id, 'treatment_type': treatment_type, 'name': name, 'administered_by_id': doctor,
+        })
+
+    def prescribe(self, visit_id, doctor):
+        prescription = self.call('prescription', 'visit', 'POST', 'prescriptions/', {
+            'visit': visit_id, 'medication': 'Ibuprofen 400mg', 'dosage': '400mg',
+            'frequency': 'Every 8 hours', 'duration': '5 days', 'prescribed_by_id': doctor,
+        })
+        if prescription:
+            self.prescriptions[visit_id] = prescription['id']
+
+    def admit(self, visit_id, doctor):
+        self.call('admission', 'visit', 'POST', 'admissions/', {
+            'visit': visit_id, 'admitted_by_id': doctor,
+            'admitting_diagnosis': 'Observation', 'department': self.random('choice', DEPARTMENTS),
+        })
+
+    def discharge(self, visit_id):
+        prescription = self.prescriptions.pop(visit_id, None)
+        self.call('discharge', 'visit', 'POST', f'emergency-visits/{visit_id}/discharge_workflow/', {
+            'discharge_instructions': 'Follow up with your GP',
+            'dispense_prescriptions': [prescription] if prescription else [],
+        })
+
+    # Dashboards.
+
+    def refresh(self, terminal):
+        self.call('dashboard_active', 'visit', 'GET', 'emergency-visits/active/')
+        self.call('dashboard_stats', 'visit', 'GET', 'emergency-visits/stats/')
+        self.call('dashboard_beds', 'visit', 'GET', 'beds/available/')
+        self.call('dashboard_admissions', 'visit', 'GET', 'admissions/current/')
+        self.call('dashboard_low_stock', 'inventory', 'GET', 'inventoryitems/low_stock/')
+        self.schedule(self.now() + self.args.poll_seconds / 60, self.refresh, terminal)
+
+    def arrival_times(self):
+        """Non-homogeneous Poisson arrivals over the shift, by thinning."""
+        end = self.args.hours * 60
+        peak = max(self.arrival_rate(minute) for minute in range(0, end + 1))
+        minute, times = 0.0, []
+        while True:
+            minute += self.rng.expovariate(peak)
+            if minute >= end:
+                return times
+            if self.rng.random() < self.arrival_rate(minute) / peak:
+                times.append(minute)
+
+    def run(self):
+        for minute in self.arrival_times():
+            self.schedule(minute, self.arrive)
+        for terminal in range(self.args.terminals):
+            self.schedule(terminal * self.args.poll_seconds / 60 / max(self.args.terminals, 1), self.refresh, terminal)
+
+        self.started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.args.clients) as pool:
+            while True:
+                with self.wakeup:
+                    if not self.queue:
+                        if not self.pending:
+                            break
+                        # Events in flight may still schedule follow-ups.
+                        self.wakeup.wait()
+                        continue
+                    minute = self.queue[0][0]
+                    delay = (minute - self.now()) * 60 / self.args.speedup
+                    if delay > 0:
+                        self.wakeup.wait(delay)
+                        continue
+                    minute, _, action, args = heapq.heappop(self.queue)
+                    self.pending += 1
+                pool.submit(self.fire, minute, action, args)
+        return self.report()
+
+    def fire(self, minute, action, args):
+        # How late events start: when this grows, all --clients are busy and
+        # the driver, not the services, sets the pace.
+        self.lags.append((minute, (self.now() - minute) * 60 / self.args.speedup * 1000))
+        try:
+            action(*args)
+        except Exception as exc:  # keep the shift going, but say why an event died
+            print(f"event {action.__name__} failed: {exc!r}", file=sys.stderr)
+        finally:
+            with self.wakeup:
+                self.pending -= 1
+                self.wakeup.notify()
+
+    # Report.
+
+    def report(self):
+        bucket_minutes = self.args.bucket_minutes
+        buckets = {}
+        for minute, endpoint, elapsed, status in self.samples:
+            buckets.setdefault(int(minute // bucket_minutes), []).append((endpoint, elapsed, status))
+        arrivals = {}
+        for minute in self.arrivals:
+            index = int(minute // bucket_minutes)
+            arrivals[index] = arrivals.get(index, 0) + 1
+        lags = {}
+        for minute, lag in self.lags:
+            index = int(minute // bucket_minutes)
+            lags[index] = max(lags.get(index, 0), lag)
+
+        real_seconds = bucket_minutes * 60 / self.args.speedup
+        series, breaking_point = [], None
+        for index in sorted(buckets):
+            samples = buckets[index]
+            start = index * bucket_minutes
+            hour = (self.args.start_hour + start / 60) % 24
+            bucket = {
+                'shift_minute': start,
+                'clock': f"{int(hour):02d}:{int(hour * 60 % 60):02d}",
+                'load_factor': round(self.load_factor(start + bucket_minutes / 2), 2),
+                'arrivals': arrivals.get(index, 0),
+                'driver_lag_ms': round(lags.get(index, 0), 1),
+                **stats([s[1:] for s in samples], real_seconds),
+                'endpoints': {
+                    endpoint: stats([s[1:] for s in samples if s[0] == endpoint], real_seconds)
+                    for endpoint in sorted({s[0] for s in samples})
+                },
+            }
+            series.append(bucket)
+            if breaking_point is None and (
+                bucket['error_rate'] > self.args.max_error_rate or bucket['p95_ms'] > self.args.p95_budget_ms
+            ):
+                breaking_point = {
+                    key: bucket[key]
+                    for key in ('shift_minute', 'clock', 'load_factor', 'throughput_rps', 'error_rate', 'p95_ms')
+                }
+        return {
+            'totals': stats([s[2:] for s in self.samples], self.now() * 60 / self.args.speedup),
+            'arrivals': len(self.arrivals),
+            'breaking_point': breaking_point,
+            'series': series,
+        }
+
+
+def stats(samples, seconds):
+    """Throughput, error rate and latency percentiles of (elapsed_ms, status) samples."""
+    timings = sorted(elapsed for elapsed, _ in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status in samples if status == 0 or status >= 400)
+    return {
+        'requests': len(samples),
+        'statuses': statuses,
+        'throughput_rps': round(len(samples) / seconds, 1) if seconds else None,
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0,
+        'p50_ms': round(percentile(timings, 50), 1) if timings else None,
+        'p95_ms': round(percentile(timings, 95), 1) if timings else None,
+        'p99_ms': round(percentile(timings, 99), 1) if timings else None,
+    }
+
+
+def login(urls, username):
+    response = requests.post(
+        f"{urls['auth'].rstrip('/')}/api/auth/login/",
+        json={'username': username, 'password': PASSWORD}, timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()['token']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=int, default=8, help="Shift length.")
+    parser.add_argument('--start-hour', type=int, default=8, help="Hour of day the shift starts.")
+    parser.add_argument('--speedup', type=float, default=60, help="Shift minutes per real minute.")
+    parser.add_argument('--arrivals-per-day', type=float, default=120, help="Arrival rate at --load 1.")
+    parser.add_argument('--load', type=float, default=1.0, help="Arrival rate multiplier at the start.")
+    parser.add_argument('--ramp-to', type=float, help="Arrival rate multiplier at the end (default: --load).")
+    parser.add_argument('--terminals', type=int, default=4, help="Dashboards polling during the shift.")
+    parser.add_argument('--poll-seconds', type=float, default=30, help="Dashboard refresh period, shift seconds.")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent client threads.")
+    parser.add_argument('--timeout', type=float, default=10, help="Per-request timeout, seconds.")
+    parser.add_argument('--bucket-minutes', type=float, default=30, help="Report bucket, shift minutes.")
+    parser.add_argument('--p95-budget-ms', type=float, default=1000)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--scale', type=float, default=0.1, help="Synthetic dataset scale.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--service-workers', type=int, default=1, help="uvicorn workers per service.")
+    parser.add_argument('--logs', help="Keep the services' stderr in this directory.")
+    parser.add_argument(
+        '--attach', action='store_true',
+        help="Use the services already running on the docker-compose ports instead of starting them.",
+    )
+    parser.add_argument('--user', default='doctor1', help="Account the clients log in with.")
+    parser.add_argument('--output', default='shift-report.json')
+    args = parser.parse_args()
+    if args.ramp_to is None:
+        args.ramp_to = args.load
+
+    counts = dataset_counts(args.scale)
+    servers = []
+    with tempfile.TemporaryDirectory(prefix='hospital-shift-') as workdir:
+        try:
+            if args.attach:
+                urls = {service: f"http://localhost:{port}" for service, port in ATTACH_PORTS.items()}
+            else:
+                print("Seeding and starting the services...", flush=True)
+                urls = start_services(args, workdir, servers)
+            shift = Shift(args, urls, login(urls, args.user), counts)
+            print(
+                f"Simulating a {args.hours}h shift from {args.start_hour:02d}:00 in "
+                f"{args.hours * 60 / args.speedup:.1f} real minutes...", flush=True
+            )
+            result = shift.run()
+        finally:
+            for server in servers:
+                server.terminate()
+            for server in servers:
+                server.wait()
+
+    for bucket in result['series']:
+        print(
+            f"  {bucket['clock']} x{bucket['load_factor']:<5} {bucket['arrivals']:>4} arrivals "
+            f"{bucket['throughput_rps']:>7.1f} rps  p50 {bucket['p50_ms']:>8.1f} ms  "
+            f"p95 {bucket['p95_ms']:>8.1f} ms  p99 {bucket['p99_ms']:>8.1f} ms  "
+            f"errors {bucket['error_rate']:>6.1%}  lag {bucket['driver_lag_ms']:>7.1f} ms"
+        )
+    breaking_point = result['breaking_point']
+    if breaking_point:
+        print(
+            f"Breaking point at {breaking_point['clock']} (load x{breaking_point['load_factor']}, "
+            f"{breaking_point['throughput_rps']} rps): p95 {breaking_point['p95_ms']} ms, "
+            f"errors {breaking_point['error_rate']:.1%}"
+        )
+    else:
+        print("No bucket exceeded the latency budget or the error rate limit.")
+
+    report = {
+        'commit': git_commit(),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'config': vars(args),
+        'counts': counts,
+        **result,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Stand-ins for the upstream services a service under benchmark calls: token
+introspection and the patient, staff, user and inventory lookups. Every
+request is answered locally with a plausible payload, after an optional
+fixed delay that models the network hop.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DETAIL_PATH = re.compile(r'/(?P<entity>[\w-]+)/(?P<id>\d+)/?$')
+
+STUB_USER = {
+    'id': 1,
+    'username': 'doctor1',
+    'email': 'doctor1@hospital.example',
+    'first_name': 'Bench',
+    'last_name': 'Mark',
+}
+
+
+def detail(entity, entity_id):
+    if entity == 'patients':
+        return {
+            'id': entity_id, 'first_name': 'Bench', 'last_name': f'Patient{entity_id}',
+            'date_of_birth': '1970-01-01', 'gender': 'U',
+        }
+    if entity in ('doctors', 'nurses'):
+        return {
+            'id': entity_id, 'user': entity_id, 'badge_number': f'{entity[0].upper()}{entity_id:06d}',
+            'work_unit': 'ER',
+        }
+    if entity == 'inventoryitems':
+        return {'id': entity_id, 'name': f'Item {entity_id}', 'quantity': 1000}
+    return {**STUB_USER, 'id': entity_id, 'username': f'user{entity_id}'}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def reply(self, status, payload):
+        time.sleep(self.server.latency)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.calls += 1
+
+    def do_GET(self):
+        match = DETAIL_PATH.search(self.path.split('?')[0])
+        if match is None:
+            self.reply(404, {'detail': 'Not found.'})
+        else:
+            self.reply(200, detail(match['entity'], int(match['id'])))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        path = self.path.split('?')[0]
+        if path.endswith('/introspect/'):
+            # Same shape as auth_app.views.TokenIntrospectionView.
+            self.reply(200, {'active': True, 'user': STUB_USER})
+        elif path.endswith('/decrement_stock/'):
+            self.reply(200, {'updated': []})
+        else:
+            self.reply(404, {'detail': 'Not found.'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def service_env(self):
+        """Environment pointing every upstream URL of the services at this stub."""
+        return {
+            'AUTH_INTROSPECT_URL': f"{self.url}/api/auth/introspect/",
+            'AUTH_SERVICE_URL': f"{self.url}/api/auth/",
+            'PATIENT_SERVICE_URL': f"{self.url}/api/",
+            'STAFF_SERVICE_URL': f"{self.url}/api/",
+            'INVENTORY_SERVICE_URL': f"{self.url}/api/inventory/",
+        }
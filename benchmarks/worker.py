@@ -0,0 +1,150 @@
+"""
+Benchmark one service in-process. Run by run.py in a fresh interpreter per
+service (each is a separate Django project): migrates a scratch SQLite
+database, fills it with generate_synthetic_data, then drives the service's
+scenarios through Django's test Client from a thread pool and writes the
+per-request latencies and query counts to a JSON file.
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVICES = {
+    'auth': ('auth_service', 'auth_project', 'auth_app'),
+    'inventory': ('inventory_service', 'inventory_project', 'inventory_app'),
+    'patient': ('patient_service', 'patient_project', 'patient_app'),
+    'staff': ('staff_service', 'staff_project', 'staff_app'),
+    'visit': ('visit_service', 'visit_project', 'visit_app'),
+}
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile (0-100) of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(timings, queries, statuses, wall_time):
+    timings = sorted(timings)
+    errors = sum(count for status, count in statuses.items() if int(status) >= 400)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'statuses': statuses,
+        'throughput_rps': round(len(timings) / wall_time, 1) if wall_time else None,
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'max_ms': round(timings[-1], 2),
+        'queries_per_request': round(statistics.fmean(queries), 2),
+    }
+
+
+def run_scenario(scenario, counts, requests, concurrency, warmup):
+    from django.db import connection
+    from django.test import Client
+
+    local = threading.local()
+
+    def send(i):
+        client = getattr(local, 'client', None)
+        if client is None:
+            headers = {'HTTP_HOST': 'localhost'}
+            if scenario.authenticated:
+                headers['HTTP_AUTHORIZATION'] = 'Token benchmark'
+            client = local.client = Client(**headers)
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        path = scenario.path(i, counts)
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            if scenario.method == 'POST':
+                response = client.post(path, json.dumps(scenario.body(i, counts)), content_type='application/json')
+            else:
+                response = client.get(path)
+        return (time.perf_counter() - started) * 1000, queries, response.status_code
+
+    for i in range(warmup):
+        send(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, range(warmup, warmup + requests)))
+    wall_time = time.perf_counter() - started
+
+    statuses = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return summarize([r[0] for r in results], [r[1] for r in results], statuses, wall_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('service', choices=SERVICES)
+    parser.add_argument('--database', required=True, help="Scratch SQLite file.")
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--scale', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--scenario', action='append', default=[])
+    args = parser.parse_args()
+
+    service_dir, project, app = SERVICES[args.service]
+    sys.path.insert(0, str(ROOT / 'services' / service_dir))
+    os.environ['DJANGO_SETTINGS_MODULE'] = f'{project}.settings'
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = args.database
+    # The settings read DJANGO_DEBUG inverted: "true" turns DEBUG off, which
+    # keeps connection.queries from growing during the run.
+    os.environ['DJANGO_DEBUG'] = 'true'
+    # Per-request timing lines would flood the console, even if the shell enables them.
+    os.environ['REQUEST_TIMING_LOG_LEVEL'] = 'WARNING'
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from scenarios import SCENARIOS
+
+    setup_started = time.perf_counter()
+    call_command('migrate', verbosity=0)
+    call_command('generate_synthetic_data', scale=args.scale, seed=args.seed, stdout=io.StringIO())
+    counts = importlib.import_module(f'{app}.management.commands.generate_synthetic_data').scaled_counts(args.scale)
+    setup_seconds = time.perf_counter() - setup_started
+
+    results = {}
+    for scenario in SCENARIOS[args.service]:
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        results[scenario.name] = {
+            str(concurrency): run_scenario(scenario, counts, args.requests, concurrency, args.warmup)
+            for concurrency in args.concurrency
+        }
+
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump({'setup_seconds': round(setup_seconds, 1), 'counts': counts, 'scenarios': results}, output_file)
+
+
+if __name__ == '__main__':
+    main()
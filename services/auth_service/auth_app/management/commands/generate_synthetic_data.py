@@ -0,0 +1,153 @@
+import random
+import time
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+
+# Rows per unit of --scale. The generators of all services derive their id
+# ranges from these numbers, so ids referenced across services exist as long
+# as every service is generated with the same --scale.
+SCALE_UNIT = {
+    'doctors': 50,
+    'nurses': 150,
+    'staff': 100,
+    'patients': 10000,
+    'visits': 20000,
+    'beds': 200,
+    'inventory_items': 1000,
+}
+
+
+def scaled_counts(scale):
+    return {name: max(1, round(count * scale)) for name, count in SCALE_UNIT.items()}
+
+
+def user_ids(counts):
+    """Auth user id ranges: doctors first, then nurses, then other staff."""
+    doctors = range(1, counts['doctors'] + 1)
+    nurses = range(doctors.stop, doctors.stop + counts['nurses'])
+    staff = range(nurses.stop, nurses.stop + counts['staff'])
+    return doctors, nurses, staff
+
+
+def insert_rows(model, rows):
+    """
+    Batched INSERT of dicts keyed by attname with explicit primary keys.
+    Unlike bulk_create it keeps the given auto_now_add timestamps and skips
+    the per-object model work; fields missing from a row get their default.
+    Only dates and datetimes need adapting, the driver takes the rest as is.
+    """
+    if not rows:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    adapters = {
+        'DateTimeField': db.ops.adapt_datetimefield_value,
+        'DateField': db.ops.adapt_datefield_value,
+    }
+    columns = [
+        (field.attname, field.get_default(), adapters.get(field.get_internal_type()))
+        for field in model._meta.concrete_fields
+    ]
+    params = [
+        [
+            (adapt(row.get(name, default)) if adapt else row.get(name, default))
+            for name, default, adapt in columns
+        ]
+        for row in rows
+    ]
+    with db.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} "
+            f"({', '.join(db.ops.quote_name(field.column) for field in model._meta.concrete_fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            params,
+        )
+
+
+def reset_sequences(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def ensure_empty(models):
+    filled = [model._meta.label for model in models if model._default_manager.exists()]
+    if filled:
+        raise CommandError(
+            f"{', '.join(filled)} already contain rows; run `manage.py flush` first "
+            f"so the generated ids match the other services."
+        )
+
+
+
+FIRST_NAMES = ["Marco", "Giulia", "Luca", "Sofia", "Andrea", "Chiara", "Matteo", "Elena", "Paolo", "Sara",
+               "Davide", "Anna", "Stefano", "Laura", "Roberto", "Marta"]
+LAST_NAMES = ["Rossi", "Bianchi", "Ferrari", "Esposito", "Romano", "Colombo", "Ricci", "Marino",
+              "Greco", "Bruno", "Gallo", "Conti", "Costa", "Giordano", "Mancini", "Lombardi"]
+
+
+def user_rows(counts, seed, password, now):
+    """
+    The auth users, identical in the auth and staff services: `doctor<n>`,
+    `nurse<n>` and `staff<n>` with ids laid out by user_ids().
+    """
+    rng = random.Random(seed)
+    for prefix, ids in zip(('doctor', 'nurse', 'staff'), user_ids(counts)):
+        for number, user_id in enumerate(ids, start=1):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield {
+                'id': user_id,
+                'password': password,
+                'last_login': None,
+                'is_superuser': False,
+                'username': f"{prefix}{number}",
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': f"{prefix}{number}@hospital.example",
+                'is_staff': False,
+                'is_active': True,
+                'date_joined': now,
+            }
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with the synthetic hospital users: doctors, "
+        "nurses and other staff, with the ids and usernames the staff service's "
+        "generator creates for the same --scale and --seed. All share one password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help=f"Multiplier of the base volume ({SCALE_UNIT['doctors']} doctors, "
+                 f"{SCALE_UNIT['nurses']} nurses, {SCALE_UNIT['staff']} staff per unit).",
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed.")
+        parser.add_argument(
+            '--password',
+            default='synthetic-password',
+            help="Password of every generated user.",
+        )
+
+    def handle(self, *args, **options):
+        ensure_empty([User])
+        counts = scaled_counts(options['scale'])
+
+        started = time.monotonic()
+        # Hashing is deliberately slow; all users share the one hash.
+        rows = list(user_rows(counts, options['seed'], make_password(options['password']), timezone.now()))
+        with transaction.atomic():
+            insert_rows(User, rows)
+            reset_sequences([User])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(rows)} users in {elapsed:.1f}s; log in as doctor1, nurse1 or staff1 "
+            f"with the password {options['password']!r}."
+        ))
@@ -0,0 +1,83 @@
+"""
+Prometheus metrics, served in the text exposition format at /metrics.
+
+Request latency, database queries and upstream call latency come from the
+request timings collected by .timing, and are observed once per request by
+MetricsMiddleware. Caches report their lookups with `record_cache`.
+
+With several worker processes (uvicorn --workers N) every worker keeps its
+own values: set PROMETHEUS_MULTIPROC_DIR to an empty directory, shared by the
+workers and wiped before they start, and /metrics aggregates all of them.
+"""
+import os
+import time
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+from .timing import current_timings
+
+# Seconds; API calls are expected in the tens of milliseconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', "Time to serve a request.",
+    ['route', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', "Requests being served.", multiprocess_mode='livesum',
+)
+DB_QUERIES = Counter('db_queries_total', "SQL queries executed while serving requests.", ['route'])
+DB_QUERY_SECONDS = Counter('db_query_seconds_total', "Time spent in SQL queries while serving requests.", ['route'])
+UPSTREAM_DURATION = Histogram(
+    'upstream_request_duration_seconds', "Duration of the calls made to the other services.",
+    ['upstream'], buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter('cache_lookups_total', "Cache lookups by outcome.", ['cache', 'result'])
+
+
+def record_cache(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Goes right after timing.ServerTimingMiddleware, whose timings it reads."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+
+        route = _route(request)
+        REQUEST_DURATION.labels(route, request.method, str(response.status_code)).observe(
+            time.perf_counter() - started
+        )
+        timings = current_timings()
+        if timings is not None:
+            if timings.db_queries:
+                DB_QUERIES.labels(route).inc(timings.db_queries)
+                DB_QUERY_SECONDS.labels(route).inc(timings.db_ms / 1000)
+            for upstream, ms in timings.calls:
+                UPSTREAM_DURATION.labels(upstream).observe(ms / 1000)
+        return response
+
+
+def metrics_view(request):
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
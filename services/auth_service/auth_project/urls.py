@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
+from auth_app.metrics import metrics_view
+from auth_app.tracing import traces_view
 
 urlpatterns = [
     path('api/auth/', include('auth_app.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('traces', traces_view, name='traces'),
 ]
\ No newline at end of file
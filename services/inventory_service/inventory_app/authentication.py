@@ -4,6 +4,8 @@ from django.contrib.auth.models import User
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
 
+from .timing import upstream_call
+
 class RemoteTokenAuthentication(BaseAuthentication):
     """
     Custom authentication class to validate tokens against a remote auth_service.
@@ -38,9 +40,12 @@ class RemoteTokenAuthentication(BaseAuthentication):
             raise AuthenticationFailed('AUTH_SERVICE_INTROSPECT_URL is not configured in settings.')
 
         try:
-            response = requests.post(introspection_url, data={'token': key}, timeout=5)
+            with upstream_call('auth', introspection_url) as trace_headers:
+                response = requests.post(introspection_url, data={'token': key}, headers=trace_headers, timeout=5)
             if response.status_code == 200:
-                user_data = response.json()
+                # The introspection response is {"active": true, "user": {...}}.
+                payload = response.json()
+                user_data = payload.get('user') or payload
                 user = User(
                     id=user_data.get('id'),
                     username=user_data.get('username'),
@@ -0,0 +1,151 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from inventory_app.models import InventoryItem
+
+# Rows per unit of --scale. The generators of all services derive their id
+# ranges from these numbers, so ids referenced across services exist as long
+# as every service is generated with the same --scale.
+SCALE_UNIT = {
+    'doctors': 50,
+    'nurses': 150,
+    'staff': 100,
+    'patients': 10000,
+    'visits': 20000,
+    'beds': 200,
+    'inventory_items': 1000,
+}
+
+
+def scaled_counts(scale):
+    return {name: max(1, round(count * scale)) for name, count in SCALE_UNIT.items()}
+
+
+def user_ids(counts):
+    """Auth user id ranges: doctors first, then nurses, then other staff."""
+    doctors = range(1, counts['doctors'] + 1)
+    nurses = range(doctors.stop, doctors.stop + counts['nurses'])
+    staff = range(nurses.stop, nurses.stop + counts['staff'])
+    return doctors, nurses, staff
+
+
+def insert_rows(model, rows):
+    """
+    Batched INSERT of dicts keyed by attname with explicit primary keys.
+    Unlike bulk_create it keeps the given auto_now_add timestamps and skips
+    the per-object model work; fields missing from a row get their default.
+    Only dates and datetimes need adapting, the driver takes the rest as is.
+    """
+    if not rows:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    adapters = {
+        'DateTimeField': db.ops.adapt_datetimefield_value,
+        'DateField': db.ops.adapt_datefield_value,
+    }
+    columns = [
+        (field.attname, field.get_default(), adapters.get(field.get_internal_type()))
+        for field in model._meta.concrete_fields
+    ]
+    params = [
+        [
+            (adapt(row.get(name, default)) if adapt else row.get(name, default))
+            for name, default, adapt in columns
+        ]
+        for row in rows
+    ]
+    with db.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} "
+            f"({', '.join(db.ops.quote_name(field.column) for field in model._meta.concrete_fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            params,
+        )
+
+
+def reset_sequences(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def ensure_empty(models):
+    filled = [model._meta.label for model in models if model._default_manager.exists()]
+    if filled:
+        raise CommandError(
+            f"{', '.join(filled)} already contain rows; run `manage.py flush` first "
+            f"so the generated ids match the other services."
+        )
+
+
+# (category, relative frequency, base names, units)
+CATALOG = [
+    ('MED', 5, ["Paracetamol", "Ibuprofen", "Amoxicillin", "Ceftriaxone", "Morphine", "Ondansetron",
+                "Furosemide", "Heparin", "Salbutamol", "Omeprazole", "Metoclopramide", "Ketorolac"],
+     ["tablets", "vials", "ampoules", "bags"]),
+    ('SUPP', 3, ["Gauze", "Syringe", "IV cannula", "Suture kit", "Gloves", "Bandage", "Catheter", "Face mask"],
+     ["boxes", "packs", "pieces"]),
+    ('EQUIP', 1, ["Pulse oximeter", "Infusion pump", "Defibrillator pads", "Thermometer", "Nebulizer"],
+     ["pieces", "units"]),
+    ('OTHER', 1, ["Disinfectant", "Ice pack", "Sharps container", "Specimen bag"], ["pieces", "liters"]),
+]
+SUPPLIERS = ["Pharma Italia", "MedSupply", "Farmaceutica Nord", "HealthCare Logistics", "BioMedica"]
+LOCATIONS = ["Pharmacy", "ER Storage", "Ward A", "Ward B", "Central Store"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a reproducible synthetic inventory. Item "
+        "ids run from 1 to the count the other generators assume for the same "
+        "--scale; about one in ten items is at or below its minimum stock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help=f"Multiplier of the base volume ({SCALE_UNIT['inventory_items']} items per unit).",
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed.")
+
+    def handle(self, *args, **options):
+        ensure_empty([InventoryItem])
+        rng = random.Random(options['seed'])
+        items = scaled_counts(options['scale'])['inventory_items']
+        now = timezone.now()
+        today = timezone.localdate()
+
+        started = time.monotonic()
+        rows = []
+        for item_id in range(1, items + 1):
+            category, _, names, units = rng.choices(CATALOG, [entry[1] for entry in CATALOG])[0]
+            minimum_stock = rng.choice([10, 20, 50, 100, 200])
+            if rng.random() < 0.1:
+                quantity = rng.randint(0, minimum_stock)
+            else:
+                quantity = rng.randint(minimum_stock + 1, minimum_stock * 10)
+            rows.append({
+                'id': item_id,
+                'name': f"{rng.choice(names)} #{item_id}",
+                'category': category,
+                'description': None,
+                'quantity': quantity,
+                'unit': rng.choice(units),
+                'minimum_stock': minimum_stock,
+                'last_restocked': now - timedelta(days=rng.randint(0, 90)),
+                'supplier': rng.choice(SUPPLIERS),
+                'location': rng.choice(LOCATIONS),
+                'expiry_date': today + timedelta(days=rng.randint(30, 3 * 365)) if category == 'MED' else None,
+            })
+
+        with transaction.atomic():
+            insert_rows(InventoryItem, rows)
+            reset_sequences([InventoryItem])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Generated {items} inventory items in {elapsed:.1f}s."))
@@ -5,4 +5,8 @@ class InventoryItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryItem
         fields = '__all__'
-        read_only_fields = ['last_restocked']
\ No newline at end of file
+        read_only_fields = ['last_restocked']
+
+class StockDecrementSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
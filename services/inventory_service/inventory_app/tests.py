@@ -1,3 +1,38 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+from .models import InventoryItem
 
-# Create your tests here.
+
+class DecrementStockTests(TestCase):
+    url = '/api/inventory/inventoryitems/decrement_stock/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User(id=1, username='tester'), token='test-token')
+        self.items = InventoryItem.objects.bulk_create([
+            InventoryItem(name=f"Item {i}", category='MED', quantity=10, unit='box', minimum_stock=2)
+            for i in range(2)
+        ])
+
+    def test_list_body_is_rejected(self):
+        response = self.client.post(self.url, [{'id': self.items[0].id, 'quantity': 1}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_lines_are_applied_together(self):
+        lines = [
+            {'id': self.items[0].id, 'quantity': 2},
+            {'id': self.items[0].id, 'quantity': 3},
+            {'id': self.items[1].id, 'quantity': 1},
+        ]
+        response = self.client.post(self.url, {'items': lines}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            dict(InventoryItem.objects.values_list('id', 'quantity')), {self.items[0].id: 5, self.items[1].id: 9}
+        )
+
+    def test_insufficient_stock_applies_nothing(self):
+        lines = [{'id': self.items[0].id, 'quantity': 1}, {'id': self.items[1].id, 'quantity': 11}]
+        response = self.client.post(self.url, {'items': lines}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(set(InventoryItem.objects.values_list('quantity', flat=True)), {10})
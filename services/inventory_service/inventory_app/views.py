@@ -1,6 +1,7 @@
 from .models import InventoryItem
-from .serializers import InventoryItemSerializer
-from rest_framework import viewsets
+from .serializers import InventoryItemSerializer, StockDecrementSerializer
+from django.db import models, transaction
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response 
@@ -22,3 +23,51 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
     def count(self, request):
         count = self.get_queryset().count()
         return Response({'count': count})
+
+    @action(detail=False, methods=['post'])
+    def decrement_stock(self, request):
+        """
+        Decrement the stock of several items at once: either every line is
+        applied or none is. Body: {"items": [{"id": 1, "quantity": 2}, ...]}.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"detail": "Expected an object with an items list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        lines = StockDecrementSerializer(data=request.data.get('items'), many=True)
+        lines.is_valid(raise_exception=True)
+        requested = {}
+        for line in lines.validated_data:
+            requested[line['id']] = requested.get(line['id'], 0) + line['quantity']
+
+        with transaction.atomic():
+            items = {
+                item.id: item
+                for item in self.get_queryset().select_for_update().filter(id__in=requested).order_by('id')
+            }
+            missing = sorted(set(requested) - set(items))
+            if missing:
+                return Response(
+                    {"detail": "Inventory items not found", "missing": missing},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            insufficient = [
+                {"id": item_id, "requested": quantity, "available": items[item_id].quantity}
+                for item_id, quantity in requested.items()
+                if items[item_id].quantity < quantity
+            ]
+            if insufficient:
+                return Response(
+                    {"detail": "Insufficient stock", "items": insufficient},
+                    status=status.HTTP_409_CONFLICT
+                )
+            InventoryItem.objects.filter(id__in=requested).update(
+                quantity=models.F('quantity') - models.Case(
+                    *[models.When(id=item_id, then=models.Value(quantity)) for item_id, quantity in requested.items()],
+                    output_field=models.PositiveIntegerField()
+                )
+            )
+
+        serializer = self.get_serializer(self.get_queryset().filter(id__in=requested), many=True)
+        return Response(serializer.data)
@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'inventory_app.tracing.TracingMiddleware',
+    'inventory_app.timing.ServerTimingMiddleware',
+    'inventory_app.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -155,4 +158,29 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ]
-}
\ No newline at end of file
+}
+
+# One JSON line per request with its SQL, upstream and rendering timings
+# (see inventory_app.timing); logged when REQUEST_TIMING_LOG_LEVEL=INFO
+# (docker-compose sets it), silent by default so tests and benchmarks stay quiet.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'inventory_app.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Tracing (see inventory_app.tracing): finished spans kept in memory per process,
+# optionally appended to a JSON-lines file, and served at /traces when
+# enabled (span names carry patient and staff ids).
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 5000))
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH')
+TRACE_ENDPOINT_ENABLED = os.environ.get('TRACE_ENDPOINT_ENABLED', 'false').lower() == 'true'
@@ -0,0 +1,171 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from patient_app.models import Patient
+
+# Rows per unit of --scale. The generators of all services derive their id
+# ranges from these numbers, so ids referenced across services exist as long
+# as every service is generated with the same --scale.
+SCALE_UNIT = {
+    'doctors': 50,
+    'nurses': 150,
+    'staff': 100,
+    'patients': 10000,
+    'visits': 20000,
+    'beds': 200,
+    'inventory_items': 1000,
+}
+
+
+def scaled_counts(scale):
+    return {name: max(1, round(count * scale)) for name, count in SCALE_UNIT.items()}
+
+
+def user_ids(counts):
+    """Auth user id ranges: doctors first, then nurses, then other staff."""
+    doctors = range(1, counts['doctors'] + 1)
+    nurses = range(doctors.stop, doctors.stop + counts['nurses'])
+    staff = range(nurses.stop, nurses.stop + counts['staff'])
+    return doctors, nurses, staff
+
+
+def insert_rows(model, rows):
+    """
+    Batched INSERT of dicts keyed by attname with explicit primary keys.
+    Unlike bulk_create it keeps the given auto_now_add timestamps and skips
+    the per-object model work; fields missing from a row get their default.
+    Only dates and datetimes need adapting, the driver takes the rest as is.
+    """
+    if not rows:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    adapters = {
+        'DateTimeField': db.ops.adapt_datetimefield_value,
+        'DateField': db.ops.adapt_datefield_value,
+    }
+    columns = [
+        (field.attname, field.get_default(), adapters.get(field.get_internal_type()))
+        for field in model._meta.concrete_fields
+    ]
+    params = [
+        [
+            (adapt(row.get(name, default)) if adapt else row.get(name, default))
+            for name, default, adapt in columns
+        ]
+        for row in rows
+    ]
+    with db.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} "
+            f"({', '.join(db.ops.quote_name(field.column) for field in model._meta.concrete_fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            params,
+        )
+
+
+def reset_sequences(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def ensure_empty(models):
+    filled = [model._meta.label for model in models if model._default_manager.exists()]
+    if filled:
+        raise CommandError(
+            f"{', '.join(filled)} already contain rows; run `manage.py flush` first "
+            f"so the generated ids match the other services."
+        )
+
+
+
+FIRST_NAMES = {
+    'M': ["Marco", "Luca", "Giuseppe", "Francesco", "Alessandro", "Andrea", "Matteo", "Lorenzo",
+          "James", "John", "Ahmed", "Wei", "Carlos", "Pierre", "Ivan", "Tomás"],
+    'F': ["Giulia", "Sofia", "Francesca", "Chiara", "Sara", "Martina", "Anna", "Elena",
+          "Mary", "Emma", "Fatima", "Mei", "Lucía", "Claire", "Olga", "Aisha"],
+}
+LAST_NAMES = [
+    "Rossi", "Russo", "Ferrari", "Esposito", "Bianchi", "Romano", "Colombo", "Ricci",
+    "Marino", "Greco", "Bruno", "Gallo", "Conti", "De Luca", "Costa", "Giordano",
+    "Mancini", "Rizzo", "Lombardi", "Moretti", "Smith", "Garcia", "Müller", "Nguyen",
+    "Kowalski", "Popescu", "Haddad", "Chen", "Silva", "Dubois", "Ivanova", "Okafor",
+]
+STREETS = ["Via Roma", "Via Garibaldi", "Corso Italia", "Via Mazzini", "Via Dante", "Viale Europa", "Piazza Duomo"]
+CITIES = ["Milano", "Roma", "Torino", "Bologna", "Firenze", "Napoli", "Genova", "Verona"]
+BLOOD_TYPES = [('O+', 38), ('A+', 34), ('B+', 9), ('AB+', 3), ('O-', 7), ('A-', 6), ('B-', 2), ('AB-', 1)]
+ALLERGIES = ["Penicillin", "Latex", "Peanuts", "Aspirin", "Sulfonamides", "Shellfish"]
+CONDITIONS = ["Hypertension", "Type 2 diabetes", "Asthma", "COPD", "Atrial fibrillation", "Hypothyroidism"]
+INSURERS = ["SSN", "Generali", "Allianz", "UniSalute", "AXA"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a reproducible synthetic patient registry. "
+        "Patient ids run from 1 to the count the visit service's generator "
+        "references for the same --scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help=f"Multiplier of the base volume ({SCALE_UNIT['patients']} patients per unit).",
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed.")
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help="Patients written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        ensure_empty([Patient])
+        rng = random.Random(options['seed'])
+        patients = scaled_counts(options['scale'])['patients']
+        now = timezone.now()
+        today = timezone.localdate()
+
+        started = time.monotonic()
+        for chunk_start in range(1, patients + 1, options['chunk_size']):
+            rows = []
+            for patient_id in range(chunk_start, min(chunk_start + options['chunk_size'], patients + 1)):
+                gender = rng.choices(['M', 'F', 'O', 'U'], [48, 50, 1, 1])[0]
+                first_name = rng.choice(FIRST_NAMES.get(gender) or FIRST_NAMES[rng.choice('MF')])
+                last_name = rng.choice(LAST_NAMES)
+                # Ages skew old, as in an ER population.
+                age_days = int(min(100, abs(rng.gauss(52, 24))) * 365.25)
+                rows.append({
+                    'id': patient_id,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'date_of_birth': today - timedelta(days=age_days),
+                    'gender': gender,
+                    'address': f"{rng.choice(STREETS)} {rng.randint(1, 200)}, {rng.choice(CITIES)}",
+                    'phone_number': f"+39 3{rng.randint(10, 99)} {rng.randint(1000000, 9999999)}",
+                    'emergency_contact_name': f"{rng.choice(FIRST_NAMES[rng.choice('MF')])} {last_name}",
+                    'emergency_contact_phone': f"+39 3{rng.randint(10, 99)} {rng.randint(1000000, 9999999)}",
+                    'blood_type': rng.choices(*zip(*BLOOD_TYPES))[0] if rng.random() < 0.7 else None,
+                    'allergies': rng.choice(ALLERGIES) if rng.random() < 0.2 else None,
+                    'pre_existing_conditions': (
+                        ", ".join(rng.sample(CONDITIONS, rng.randint(1, 2))) if rng.random() < 0.35 else None
+                    ),
+                    'insurance_info': rng.choice(INSURERS),
+                    'created_at': now,
+                    'updated_at': now,
+                })
+            with transaction.atomic():
+                insert_rows(Patient, rows)
+            self.stdout.write(f"{rows[-1]['id']} of {patients} patients written.")
+
+        reset_sequences([Patient])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {patients} patients in {elapsed:.1f}s, {patients / elapsed:,.0f} rows/s."
+        ))
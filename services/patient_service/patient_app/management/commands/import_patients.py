@@ -0,0 +1,74 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from patient_app.importer import CHUNK_SIZE, format_from_filename, import_patients, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load patients from a CSV (with header) or NDJSON file. Invalid and "
+        "duplicate rows are skipped and reported; valid rows are written in chunks "
+        "with COPY on PostgreSQL and a batched INSERT elsewhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or NDJSON file to import.")
+        parser.add_argument(
+            '--format',
+            dest='input_format',
+            choices=['csv', 'ndjson'],
+            help="File format; inferred from the extension when omitted.",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows validated and written per transaction.",
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help="Use a batched INSERT instead of COPY on PostgreSQL.",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only validate the file.",
+        )
+        parser.add_argument(
+            '--errors-file',
+            help="Write the row errors to this file as NDJSON.",
+        )
+
+    def handle(self, *args, **options):
+        input_format = options['input_format'] or format_from_filename(options['path'])
+        if input_format is None:
+            raise CommandError("Cannot infer the format from the file name; pass --format.")
+
+        started = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = import_patients(
+                    read_rows(stream, input_format),
+                    dry_run=options['dry_run'],
+                    use_copy=False if options['no_copy'] else None,
+                    chunk_size=options['chunk_size'],
+                )
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+        elapsed = time.monotonic() - started
+
+        if options['errors_file']:
+            with open(options['errors_file'], 'w', encoding='utf-8') as errors_file:
+                for error in result['errors']:
+                    errors_file.write(json.dumps(error) + '\n')
+        else:
+            for error in result['errors'][:20]:
+                self.stdout.write(f"Row {error['row']}: {error['errors']}")
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        rate = result['total'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['imported']} of {result['total']} rows "
+            f"({result['failed']} failed) in {elapsed:.1f}s, {rate:,.0f} rows/s."
+        ))
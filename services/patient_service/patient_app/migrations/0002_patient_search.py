@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:58
+
+from django.db import migrations, models
+
+TRIGRAM_COLUMNS = ['first_name', 'last_name', 'phone_number']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX patient_app_patient_{column}_trgm "
+            f"ON patient_app_patient USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS patient_app_patient_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patient_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['date_of_birth'], name='patient_app_date_of_b32b21_idx'),
+        ),
+    ]
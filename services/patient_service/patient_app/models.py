@@ -23,6 +23,11 @@ class Patient(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_of_birth']),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.date_of_birth})"
 
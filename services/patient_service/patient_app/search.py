@@ -0,0 +1,70 @@
+from difflib import SequenceMatcher
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from .models import Patient
+
+# Rows scored in Python by the non-PostgreSQL fallback.
+FALLBACK_CANDIDATES = 1000
+
+
+def search_patients(name=None, date_of_birth=None, phone=None, limit=10):
+    """
+    Return up to `limit` (patient, score) pairs, best match first.
+
+    `name` is matched against first and last name with typo tolerance:
+    on PostgreSQL through the pg_trgm GIN indexes (`%` operator, ranked by
+    similarity), elsewhere by scoring a bounded candidate set in Python.
+    `date_of_birth` and `phone` narrow the result set.
+    """
+    queryset = Patient.objects.all()
+    if date_of_birth:
+        queryset = queryset.filter(date_of_birth=date_of_birth)
+    if phone:
+        queryset = queryset.filter(phone_number__contains=phone)
+
+    tokens = name.split() if name else []
+    if not tokens:
+        return [(patient, 1.0) for patient in queryset.order_by('last_name', 'first_name')[:limit]]
+
+    if connection.vendor == 'postgresql':
+        return _trigram_search(queryset, tokens, limit)
+    return _fallback_search(queryset, tokens, limit)
+
+
+def _trigram_search(queryset, tokens, limit):
+    matches = Q()
+    score = None
+    for token in tokens:
+        matches |= Q(first_name__trigram_similar=token) | Q(last_name__trigram_similar=token)
+        token_score = Greatest(
+            TrigramSimilarity('first_name', token),
+            TrigramSimilarity('last_name', token),
+        )
+        score = token_score if score is None else score + token_score
+
+    queryset = (
+        queryset.filter(matches)
+        .annotate(score=score / len(tokens))
+        .order_by('-score', 'last_name', 'first_name')
+    )
+    return [(patient, round(patient.score, 3)) for patient in queryset[:limit]]
+
+
+def _fallback_search(queryset, tokens, limit):
+    matches = Q()
+    for token in tokens:
+        prefix = token[:3]
+        matches |= Q(first_name__icontains=prefix) | Q(last_name__icontains=prefix)
+
+    scored = []
+    for patient in queryset.filter(matches)[:FALLBACK_CANDIDATES]:
+        names = (patient.first_name.lower(), patient.last_name.lower())
+        score = sum(
+            max(SequenceMatcher(None, token.lower(), value).ratio() for value in names)
+            for token in tokens
+        ) / len(tokens)
+        scored.append((patient, round(score, 3)))
+    scored.sort(key=lambda match: (-match[1], match[0].last_name, match[0].first_name))
+    return scored[:limit]
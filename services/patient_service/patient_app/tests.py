@@ -1,3 +1,144 @@
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
 from django.test import TestCase
+from rest_framework.test import APIClient
+from . import importer
+from .models import Patient
 
-# Create your tests here.
+
+class PatientSearchTests(TestCase):
+    url = '/api/patients/search/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = Patient.objects.create(
+            first_name="Giulia", last_name="Rossi", date_of_birth=date(1980, 3, 14), gender='F',
+            address="Via Roma 1", phone_number="3331234567",
+            emergency_contact_name="Marco Rossi", emergency_contact_phone="3337654321",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User(id=1, username='tester'), token='test-token')
+
+    def test_malformed_and_impossible_dates_are_rejected(self):
+        for value in ('14/03/1980', '1980-13-45', '1980-02-30'):
+            with self.subTest(date_of_birth=value):
+                response = self.client.get(self.url, {'date_of_birth': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['detail'], "date_of_birth must be YYYY-MM-DD.")
+
+    def test_date_of_birth_narrows_the_search(self):
+        response = self.client.get(self.url, {'q': 'Rosi', 'date_of_birth': '1980-03-14'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], [self.patient.id])
+        response = self.client.get(self.url, {'q': 'Rosi', 'date_of_birth': '1980-03-15'})
+        self.assertEqual(response.data, [])
+
+
+CSV_HEADER = (
+    "first_name,last_name,date_of_birth,gender,address,phone_number,"
+    "emergency_contact_name,emergency_contact_phone,blood_type\n"
+)
+CSV_ROWS = [
+    "Giulia,Rossi,1980-03-14,F,Via Roma 1,3331234567,Marco Rossi,3337654321,A+\n",
+    "Luca,Bianchi,1975-11-02,M,Via Po 5,3339876543,Anna Bianchi,3331112222,\n",
+    "Sara,Verdi,1992-07-21,F,Via Dante 9,3334445555,Paolo Verdi,3336667777,0-\n",
+]
+
+
+class PatientImportTests(TestCase):
+    url = '/api/patients/bulk_import/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User(id=1, username='tester'), token='test-token')
+
+    def upload(self, content, name='patients.csv', **data):
+        file = SimpleUploadedFile(name, content.encode(), content_type='text/csv')
+        return self.client.post(self.url, {'file': file, **data}, format='multipart')
+
+    def test_valid_csv_is_imported(self):
+        response = self.upload(CSV_HEADER + ''.join(CSV_ROWS))
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data, {'total': 3, 'imported': 3, 'failed': 0, 'errors': []})
+        giulia = Patient.objects.get(last_name='Rossi')
+        self.assertEqual(giulia.date_of_birth, date(1980, 3, 14))
+        self.assertEqual(giulia.blood_type, 'A+')
+        self.assertIsNone(Patient.objects.get(last_name='Bianchi').blood_type)
+        self.assertIsNotNone(giulia.created_at)
+
+    def test_malformed_rows_are_reported_and_not_written(self):
+        malformed = [
+            "Bad,Date,1980-02-30,F,Via Roma 2,3330000000,X,3330000001,\n",
+            "Bad,Gender,1980-01-01,Z,Via Roma 3,3330000002,X,3330000003,\n",
+            ",Missing,1980-01-01,F,Via Roma 4,3330000004,X,3330000005,\n",
+        ]
+        response = self.upload(CSV_HEADER + CSV_ROWS[0] + ''.join(malformed) + CSV_ROWS[1])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['total'], response.data['imported'], response.data['failed']), (5, 2, 3))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3, 4])
+        self.assertIn('date_of_birth', response.data['errors'][0]['errors'])
+        self.assertIn('gender', response.data['errors'][1]['errors'])
+        self.assertIn('first_name', response.data['errors'][2]['errors'])
+        self.assertEqual(set(Patient.objects.values_list('last_name', flat=True)), {'Rossi', 'Bianchi'})
+
+    def test_dry_run_writes_nothing(self):
+        response = self.upload(CSV_HEADER + ''.join(CSV_ROWS), dry_run='true')
+        self.assertEqual(response.data['imported'], 3)
+        self.assertFalse(Patient.objects.exists())
+
+    def test_failed_chunk_is_rolled_back(self):
+        insert = importer._insert_patients
+        calls = []
+
+        def fail_second_chunk(rows):
+            calls.append(rows)
+            insert(rows)
+            if len(calls) == 2:
+                raise IntegrityError("simulated")
+
+        records = importer.read_rows(StringIO(CSV_HEADER + ''.join(CSV_ROWS)), 'csv')
+        with mock.patch('patient_app.importer._insert_patients', side_effect=fail_second_chunk):
+            with self.assertRaises(IntegrityError):
+                importer.import_patients(records, use_copy=False, chunk_size=2)
+        self.assertEqual(set(Patient.objects.values_list('last_name', flat=True)), {'Rossi', 'Bianchi'})
+
+    def test_duplicates_are_detected(self):
+        self.upload(CSV_HEADER + CSV_ROWS[0])
+        # Row 2 repeats row 1 with different case and spacing; row 3 is already stored.
+        duplicate = "  luca ,BIANCHI,1975-11-02,M,Elsewhere,3339876543,Someone,3330000000,\n"
+        response = self.upload(CSV_HEADER + CSV_ROWS[1] + duplicate + CSV_ROWS[0] + CSV_ROWS[2])
+        self.assertEqual((response.data['total'], response.data['imported'], response.data['failed']), (4, 2, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        self.assertEqual(Patient.objects.filter(last_name='Rossi').count(), 1)
+        self.assertEqual(Patient.objects.filter(last_name__iexact='Bianchi').count(), 1)
+        self.assertEqual(Patient.objects.count(), 3)
+
+    def test_ndjson_and_unknown_formats(self):
+        content = '{"first_name": "Giulia", "last_name": "Rossi", "date_of_birth": "1980-03-14", "gender": "F", ' \
+                  '"address": "Via Roma 1", "phone_number": "333", "emergency_contact_name": "Marco", ' \
+                  '"emergency_contact_phone": "334"}\nnot json\n'
+        response = self.upload(content, name='patients.ndjson')
+        self.assertEqual((response.data['imported'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        response = self.upload(content, name='patients.txt')
+        self.assertEqual(response.status_code, 400)
+
+    def test_management_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'patients.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(CSV_HEADER + ''.join(CSV_ROWS) + CSV_ROWS[0])
+            out = StringIO()
+            call_command('import_patients', path, '--chunk-size', '2', stdout=out)
+        self.assertIn("Imported 3 of 4 rows (1 failed)", out.getvalue())
+        self.assertIn("Row 4:", out.getvalue())
+        self.assertEqual(Patient.objects.count(), 3)
@@ -0,0 +1,159 @@
+"""
+Per-request performance breakdown: SQL queries, calls to the other services
+and response rendering, sent back in the Server-Timing header and logged as
+one JSON line per request, so a slow response can be pinned on the database,
+an upstream service or the Python code in between.
+
+Code calling another service wraps the call in `upstream_call`, which also
+traces it (see .tracing) and yields the headers to send along:
+
+    with upstream_call('patient', url) as trace_headers:
+        response = requests.get(url, headers={**headers, **trace_headers}, timeout=3)
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+from .tracing import client_span, current_trace_id
+
+logger = logging.getLogger(__name__)
+
+# The timings of the request being served. Set by ServerTimingMiddleware and
+# mutated in place, so updates made from the thread asgiref runs sync code in
+# are seen by the middleware.
+_current = ContextVar('request_timings', default=None)
+
+
+def _elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        # Upstream name -> [calls, milliseconds], and every call as (upstream, milliseconds).
+        self.upstream = {}
+        self.calls = []
+        self.render_ms = 0.0
+        self._render_started = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ms += _elapsed_ms(started)
+
+    def start_render(self, response):
+        self._render_started = time.perf_counter()
+        response.add_post_render_callback(self._rendered)
+
+    def _rendered(self, response):
+        self.render_ms += _elapsed_ms(self._render_started)
+
+    def as_dict(self):
+        total_ms = _elapsed_ms(self.started)
+        upstream_ms = sum(ms for _, ms in self.upstream.values())
+        return {
+            'total_ms': round(total_ms, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_ms, 2),
+            'upstream_calls': sum(calls for calls, _ in self.upstream.values()),
+            'upstream_ms': round(upstream_ms, 2),
+            'upstream': {
+                name: {'calls': calls, 'ms': round(ms, 2)} for name, (calls, ms) in sorted(self.upstream.items())
+            },
+            'render_ms': round(self.render_ms, 2),
+            # Views, serializers and middleware: everything not spent waiting
+            # on the database, other services or the renderer.
+            'app_ms': round(max(total_ms - self.db_ms - upstream_ms - self.render_ms, 0), 2),
+        }
+
+
+def current_timings():
+    """Timings of the request being served, or None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def upstream_call(upstream, url=None):
+    """
+    Count the wrapped call to another service, and its duration, against
+    `upstream`. Yields the trace headers to send with the call.
+    """
+    timings = _current.get()
+    started = time.perf_counter()
+    try:
+        with client_span(upstream, url) as trace_headers:
+            yield trace_headers
+    finally:
+        if timings is not None:
+            elapsed = _elapsed_ms(started)
+            totals = timings.upstream.setdefault(upstream, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+            timings.calls.append((upstream, elapsed))
+
+
+def server_timing_header(timings):
+    metrics = [f'db;dur={timings["db_ms"]};desc="{timings["db_queries"]} queries"']
+    metrics += [
+        f'{name};dur={upstream["ms"]};desc="{upstream["calls"]} calls"'
+        for name, upstream in timings['upstream'].items()
+    ]
+    metrics += [
+        f'render;dur={timings["render_ms"]}',
+        f'app;dur={timings["app_ms"]}',
+        f'total;dur={timings["total_ms"]}',
+    ]
+    return ', '.join(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    Times every request. Goes right after tracing.TracingMiddleware, ahead
+    of the other middleware, so that the total covers them, token
+    introspection included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        summary = timings.as_dict()
+        response['Server-Timing'] = server_timing_header(summary)
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'status': response.status_code,
+            'trace_id': current_trace_id(),
+            **summary,
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; being ahead of the
+        # other middleware this hook runs last, right before rendering.
+        timings = _current.get()
+        if timings is not None:
+            timings.start_render(response)
+        return response
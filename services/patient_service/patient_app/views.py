@@ -1,11 +1,15 @@
 from rest_framework import viewsets
 from .models import Patient, PatientFile
 from .serializers import PatientSerializer, PatientFileSerializer
+from .search import search_patients
+from .importer import format_from_filename, import_patients, read_rows
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from django.utils.dateparse import parse_date
+import io
 
 class PatientViewSet(viewsets.ModelViewSet):
     queryset = Patient.objects.all().select_related() 
@@ -25,6 +29,59 @@ class PatientViewSet(viewsets.ModelViewSet):
         count = self.get_queryset().count()
         return Response({'count': count}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        params = request.query_params
+        name = params.get('q', '').strip()
+        date_of_birth = params.get('date_of_birth')
+        phone = params.get('phone', '').strip()
+        if not (name or date_of_birth or phone):
+            return Response(
+                {"detail": "Provide at least one of q, date_of_birth or phone."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if date_of_birth:
+            try:
+                date_of_birth = parse_date(date_of_birth)
+            except ValueError:
+                # Well formed but not a real date, e.g. 1980-13-45.
+                date_of_birth = None
+            if date_of_birth is None:
+                return Response({"detail": "date_of_birth must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = search_patients(name=name, date_of_birth=date_of_birth, phone=phone, limit=limit)
+        results = []
+        for patient, score in matches:
+            data = self.get_serializer(patient).data
+            data['match_score'] = score
+            results.append(data)
+        return Response(results)
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    def bulk_import(self, request):
+        """
+        Import patients from an uploaded CSV (with header) or NDJSON file.
+        Invalid rows are skipped and reported; `dry_run=true` only validates.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload the patients as a 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+        input_format = request.data.get('input_format') or format_from_filename(upload.name)
+        if input_format not in ('csv', 'ndjson'):
+            return Response(
+                {"detail": "input_format must be csv or ndjson (or use a .csv/.ndjson file name)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        result = import_patients(read_rows(stream, input_format), dry_run=dry_run)
+        return Response(result, status=status.HTTP_200_OK)
+
 class PatientFileViewSet(viewsets.ModelViewSet):
     queryset = PatientFile.objects.all().select_related('patient')
     serializer_class = PatientFileSerializer
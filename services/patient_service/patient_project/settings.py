@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -46,6 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'patient_app.tracing.TracingMiddleware',
+    'patient_app.timing.ServerTimingMiddleware',
+    'patient_app.metrics.MetricsMiddleware',
     'patient_app.middleware.FixInvalidHostMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -159,4 +163,29 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+}
+
+# One JSON line per request with its SQL, upstream and rendering timings
+# (see patient_app.timing); logged when REQUEST_TIMING_LOG_LEVEL=INFO
+# (docker-compose sets it), silent by default so tests and benchmarks stay quiet.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'patient_app.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Tracing (see patient_app.tracing): finished spans kept in memory per process,
+# optionally appended to a JSON-lines file, and served at /traces when
+# enabled (span names carry patient and staff ids).
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 5000))
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH')
+TRACE_ENDPOINT_ENABLED = os.environ.get('TRACE_ENDPOINT_ENABLED', 'false').lower() == 'true'
@@ -0,0 +1,240 @@
+import json
+import re
+import statistics
+import time
+from datetime import date, datetime
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.test import APIRequestFactory
+
+# SQLite prints "SCAN <table>" for a full table scan and "SCAN <table> USING
+# [COVERING] INDEX <index>" for a full index scan (e.g. to avoid a sort).
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\S+)(.*)')
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\S+)')
+
+
+def list_endpoints(patterns=None, prefix=''):
+    """Yield (path, viewset class) for every router list route of the URLconf."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    seen = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            for path, viewset in list_endpoints(pattern.url_patterns, prefix + str(pattern.pattern)):
+                if viewset not in seen:
+                    seen.add(viewset)
+                    yield path, viewset
+        elif isinstance(pattern, URLPattern):
+            viewset = getattr(pattern.callback, 'cls', None)
+            actions = getattr(pattern.callback, 'actions', None) or {}
+            if viewset is not None and actions.get('get') == 'list' and viewset not in seen:
+                seen.add(viewset)
+                yield '/' + (prefix + str(pattern.pattern)).replace('^', '').replace('$', ''), viewset
+
+
+def seq_scanned_tables(plan):
+    if connection.vendor == 'postgresql':
+        return sorted(set(POSTGRES_SEQ_SCAN.findall(plan)))
+    tables = set()
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and 'INDEX' not in match.group(2):
+            tables.add(match.group(1))
+    return sorted(tables)
+
+
+def _format_value(value, lookup_expr):
+    if lookup_expr == 'isnull':
+        return 'false'
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date().isoformat() if lookup_expr == 'date' else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if lookup_expr in ('contains', 'icontains'):
+        return str(value)[:3]
+    return str(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN and time every declared filter, search and ordering of the "
+        "list endpoints, and filter/ordering pairs on models with composite "
+        "indexes, against the current database. Fails when a combination "
+        "scans a large table sequentially (unless it already did in --baseline) "
+        "or is slower than --budget-ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            default=200.0,
+            help="Latency budget of one list query, median of --repeat runs.",
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help="Runs of each query for the timing.",
+        )
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=1000,
+            help="Sequential scans of tables smaller than this are not reported.",
+        )
+        parser.add_argument(
+            '--baseline',
+            help="Report of a previous run; only new sequential scans are failures.",
+        )
+        parser.add_argument(
+            '--output',
+            help="Write the report (plans and timings) to this JSON file.",
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            default=[],
+            help="Only check list endpoints whose path contains this string (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        baseline = {}
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as baseline_file:
+                    baseline = {result['query']: result for result in json.load(baseline_file)['results']}
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read the baseline {options['baseline']}: {e}")
+
+        self.factory = APIRequestFactory()
+        self.row_counts = {}
+        results, failures = [], []
+        for path, viewset in list_endpoints():
+            if options['endpoint'] and not any(part in path for part in options['endpoint']):
+                continue
+            for params in self.combinations(path, viewset):
+                result = self.explain(path, viewset, params, options['repeat'])
+                problems = []
+                # Reading a whole unpaginated table is a sequential scan by
+                # design; only filtered or LIMITed queries should avoid one.
+                selective = result['limited'] or any(key != 'ordering' for key in params)
+                large = [table for table in result['seq_scans'] if self.row_count(table) >= options['min_rows']]
+                known = baseline.get(result['query'], {}).get('seq_scans', [])
+                if selective and any(table not in known for table in large):
+                    problems.append(f"sequential scan on {', '.join(large)}")
+                if result['ms'] > options['budget_ms']:
+                    problems.append(f"{result['ms']:.1f} ms over the {options['budget_ms']:.0f} ms budget")
+                result['problems'] = problems
+                results.append(result)
+
+                line = f"{result['ms']:8.1f} ms  {result['query']}"
+                if problems:
+                    failures.append(result)
+                    self.stdout.write(self.style.ERROR(f"{line}  [{'; '.join(problems)}]"))
+                else:
+                    self.stdout.write(line)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump({
+                    'urlconf': settings.ROOT_URLCONF,
+                    'vendor': connection.vendor,
+                    'generated_at': timezone.now().isoformat(),
+                    'budget_ms': options['budget_ms'],
+                    'results': results,
+                }, output_file, indent=2)
+
+        if failures:
+            raise CommandError(f"{len(failures)} of {len(results)} list queries regressed.")
+        self.stdout.write(self.style.SUCCESS(f"None of the {len(results)} list queries regressed."))
+
+    def make_view(self, path, viewset, params):
+        view = viewset(action='list', action_map={'get': 'list'}, basename=None, detail=False)
+        view.request = view.initialize_request(self.factory.get(path, params))
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+        return view
+
+    def combinations(self, path, viewset):
+        """
+        Query parameters to check: none, each filter, search, each ordering,
+        and every filter with every ordering when the model has a composite
+        index, as those are meant to serve a filter and a sort together.
+        """
+        view = self.make_view(path, viewset, {})
+        queryset = view.get_queryset()
+        backends = view.filter_backends
+        yield {}
+
+        filters = []
+        filterset_class = DjangoFilterBackend().get_filterset_class(view, queryset)
+        if filterset_class is not None:
+            if DjangoFilterBackend not in backends:
+                self.stderr.write(f"{path}: declares filters but has no DjangoFilterBackend; skipped.")
+            else:
+                for name, declared in filterset_class.base_filters.items():
+                    value = self.sample(queryset, declared.field_name)
+                    if value is None:
+                        self.stderr.write(f"{path}: no sample value for {name}; skipped.")
+                        continue
+                    filters.append({name: _format_value(value, declared.lookup_expr)})
+                    yield filters[-1]
+
+        search_fields = getattr(view, 'search_fields', None)
+        if search_fields and any(issubclass(backend, SearchFilter) for backend in backends):
+            value = self.sample(queryset, search_fields[0].lstrip('^=@$'))
+            if value:
+                yield {'search': str(value).split()[0]}
+
+        ordering_fields = getattr(view, 'ordering_fields', None)
+        if ordering_fields and ordering_fields != '__all__' and any(issubclass(backend, OrderingFilter) for backend in backends):
+            orderings = [prefix + field for field in ordering_fields for prefix in ('', '-')]
+            for ordering in orderings:
+                yield {'ordering': ordering}
+            if any(len(index.fields) > 1 for index in queryset.model._meta.indexes):
+                for params in filters:
+                    for ordering in orderings:
+                        yield {**params, 'ordering': ordering}
+
+    def sample(self, queryset, field_name):
+        """A value of the column from the database, so the filter matches rows."""
+        return (
+            queryset.model._default_manager.exclude(**{f'{field_name}__isnull': True})
+            .order_by('pk').values_list(field_name, flat=True).first()
+        )
+
+    def explain(self, path, viewset, params, repeat):
+        view = self.make_view(path, viewset, params)
+        queryset = view.filter_queryset(view.get_queryset())
+        page_size = view.paginator.get_page_size(view.request) if view.paginator is not None else None
+        if page_size:
+            queryset = queryset[:page_size]
+
+        plan = queryset.explain()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset._chain())
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'query': f"{path}?{urlencode(params)}" if params else path,
+            'plan': plan,
+            'seq_scans': seq_scanned_tables(plan),
+            'limited': bool(page_size),
+            'ms': round(statistics.median(timings), 2),
+        }
+
+    def row_count(self, table):
+        if table not in self.row_counts:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+                self.row_counts[table] = cursor.fetchone()[0]
+        return self.row_counts[table]
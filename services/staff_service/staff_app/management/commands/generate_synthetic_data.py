@@ -0,0 +1,207 @@
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from staff_app.models import Doctor, Nurse, Staff
+
+# Rows per unit of --scale. The generators of all services derive their id
+# ranges from these numbers, so ids referenced across services exist as long
+# as every service is generated with the same --scale.
+SCALE_UNIT = {
+    'doctors': 50,
+    'nurses': 150,
+    'staff': 100,
+    'patients': 10000,
+    'visits': 20000,
+    'beds': 200,
+    'inventory_items': 1000,
+}
+
+
+def scaled_counts(scale):
+    return {name: max(1, round(count * scale)) for name, count in SCALE_UNIT.items()}
+
+
+def user_ids(counts):
+    """Auth user id ranges: doctors first, then nurses, then other staff."""
+    doctors = range(1, counts['doctors'] + 1)
+    nurses = range(doctors.stop, doctors.stop + counts['nurses'])
+    staff = range(nurses.stop, nurses.stop + counts['staff'])
+    return doctors, nurses, staff
+
+
+def insert_rows(model, rows):
+    """
+    Batched INSERT of dicts keyed by attname with explicit primary keys.
+    Unlike bulk_create it keeps the given auto_now_add timestamps and skips
+    the per-object model work; fields missing from a row get their default.
+    Only dates and datetimes need adapting, the driver takes the rest as is.
+    """
+    if not rows:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    adapters = {
+        'DateTimeField': db.ops.adapt_datetimefield_value,
+        'DateField': db.ops.adapt_datefield_value,
+    }
+    columns = [
+        (field.attname, field.get_default(), adapters.get(field.get_internal_type()))
+        for field in model._meta.concrete_fields
+    ]
+    params = [
+        [
+            (adapt(row.get(name, default)) if adapt else row.get(name, default))
+            for name, default, adapt in columns
+        ]
+        for row in rows
+    ]
+    with db.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} "
+            f"({', '.join(db.ops.quote_name(field.column) for field in model._meta.concrete_fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            params,
+        )
+
+
+def reset_sequences(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def ensure_empty(models):
+    filled = [model._meta.label for model in models if model._default_manager.exists()]
+    if filled:
+        raise CommandError(
+            f"{', '.join(filled)} already contain rows; run `manage.py flush` first "
+            f"so the generated ids match the other services."
+        )
+
+
+
+FIRST_NAMES = ["Marco", "Giulia", "Luca", "Sofia", "Andrea", "Chiara", "Matteo", "Elena", "Paolo", "Sara",
+               "Davide", "Anna", "Stefano", "Laura", "Roberto", "Marta"]
+LAST_NAMES = ["Rossi", "Bianchi", "Ferrari", "Esposito", "Romano", "Colombo", "Ricci", "Marino",
+              "Greco", "Bruno", "Gallo", "Conti", "Costa", "Giordano", "Mancini", "Lombardi"]
+
+
+def user_rows(counts, seed, password, now):
+    """
+    The auth users, identical in the auth and staff services: `doctor<n>`,
+    `nurse<n>` and `staff<n>` with ids laid out by user_ids().
+    """
+    rng = random.Random(seed)
+    for prefix, ids in zip(('doctor', 'nurse', 'staff'), user_ids(counts)):
+        for number, user_id in enumerate(ids, start=1):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield {
+                'id': user_id,
+                'password': password,
+                'last_login': None,
+                'is_superuser': False,
+                'username': f"{prefix}{number}",
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': f"{prefix}{number}@hospital.example",
+                'is_staff': False,
+                'is_active': True,
+                'date_joined': now,
+            }
+
+UNITS = [('ER', 5), ('ICU', 2), ('MED-SURG', 3), ('CCU', 1), ('PACU', 1), ('NICU', 1), ('L&D', 1)]
+SPECIALIZATIONS = [
+    "Emergency Medicine", "Internal Medicine", "Cardiology", "Neurology", "General Surgery",
+    "Orthopedics", "Pediatrics", "Anesthesiology", "Radiology",
+]
+CERTIFICATIONS = ["BLS", "ACLS", "PALS", "TNCC", "CEN"]
+STAFF_ROLES = [('TEC', 4), ('ADM', 3), ('RES', 2), ('INT', 1)]
+STAFF_DEPARTMENTS = ["Emergency", "Radiology", "Laboratory", "Administration", "Pharmacy", "Admissions"]
+SHIFTS = ["Morning", "Afternoon", "Night", "Rotating"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with the synthetic hospital staff: the users "
+        "(mirroring the auth service's generator) and their doctor, nurse and "
+        "staff profiles. Doctor and nurse ids match the ones the visit service's "
+        "generator references for the same --scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help=f"Multiplier of the base volume ({SCALE_UNIT['doctors']} doctors, "
+                 f"{SCALE_UNIT['nurses']} nurses, {SCALE_UNIT['staff']} staff per unit).",
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed.")
+        parser.add_argument(
+            '--password',
+            default='synthetic-password',
+            help="Password of every generated user.",
+        )
+
+    def handle(self, *args, **options):
+        models = [User, Doctor, Nurse, Staff]
+        ensure_empty(models)
+        counts = scaled_counts(options['scale'])
+        doctor_users, nurse_users, staff_users = user_ids(counts)
+        rng = random.Random(options['seed'] + 1)
+        today = timezone.localdate()
+
+        started = time.monotonic()
+        users = list(user_rows(counts, options['seed'], make_password(options['password']), timezone.now()))
+
+        def person(number, user_id, prefix):
+            return {
+                'id': number,
+                'user_id': user_id,
+                'date_of_birth': today - timedelta(days=rng.randint(25 * 365, 65 * 365)),
+                'gender': rng.choice(['M', 'F']),
+                'address': f"Via {rng.choice(['Roma', 'Verdi', 'Manzoni', 'Cavour'])} {rng.randint(1, 150)}",
+                'phone_number': f"+39 3{rng.randint(10, 99)} {rng.randint(1000000, 9999999)}",
+                'badge_number': f"{prefix}{number:06d}",
+                'days_off': ", ".join(sorted(rng.sample(DAYS, 2), key=DAYS.index)),
+                'work_unit': rng.choices(*zip(*UNITS))[0],
+                'license_number': f"LIC-{prefix}{rng.randint(100000, 999999)}",
+            }
+
+        doctors = []
+        for number, user_id in enumerate(doctor_users, start=1):
+            doctors.append({**person(number, user_id, 'D'), 'specialization': rng.choice(SPECIALIZATIONS)})
+        nurses = []
+        for number, user_id in enumerate(nurse_users, start=1):
+            nurses.append({**person(number, user_id, 'N'), 'certification': rng.choice(CERTIFICATIONS)})
+        staff = [
+            {
+                'id': number,
+                'user_id': user_id,
+                'role': rng.choices(*zip(*STAFF_ROLES))[0],
+                'department': rng.choice(STAFF_DEPARTMENTS),
+                'hire_date': today - timedelta(days=rng.randint(30, 25 * 365)),
+                'is_active': rng.random() < 0.95,
+                'shift_schedule': rng.choice(SHIFTS),
+            }
+            for number, user_id in enumerate(staff_users, start=1)
+        ]
+
+        with transaction.atomic():
+            insert_rows(User, users)
+            insert_rows(Doctor, doctors)
+            insert_rows(Nurse, nurses)
+            insert_rows(Staff, staff)
+            reset_sequences(models)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(doctors)} doctors, {len(nurses)} nurses and {len(staff)} staff "
+            f"in {elapsed:.1f}s."
+        ))
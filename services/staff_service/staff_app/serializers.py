@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User 
 from .models import Staff, Doctor, Nurse
+from .timing import upstream_call
 import requests
 import os
 import logging
@@ -24,7 +25,8 @@ def _validate_user_from_auth_service(user_id, context):
     headers = _get_auth_header_from_context(context)
 
     try:
-        response = requests.get(user_detail_url, headers=headers, timeout=3)
+        with upstream_call('auth', user_detail_url) as trace_headers:
+            response = requests.get(user_detail_url, headers={**headers, **trace_headers}, timeout=3)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as e:
@@ -0,0 +1,182 @@
+"""
+Distributed tracing across the services, W3C Trace Context style.
+
+TracingMiddleware continues the trace of an incoming `traceparent` header
+(or starts one) with a server span for the request; every call to another
+service made through timing.upstream_call is a client span whose
+`traceparent` is sent along, so the callee's server span becomes its child.
+Finished spans are kept in a per-process ring buffer of TRACE_BUFFER_SIZE
+spans, served at /traces, and appended as JSON lines to TRACE_EXPORT_PATH
+when that is set. benchmarks/show_trace.py puts the spans of one trace
+from all the services back into a call tree.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+
+SERVICE = __name__.split('.')[0].replace('_app', '')
+# Scrapes and trace lookups are not worth a span.
+UNTRACED_PATHS = ('/metrics', '/traces')
+
+_current = ContextVar('current_span', default=None)
+_buffer = deque(maxlen=int(getattr(settings, 'TRACE_BUFFER_SIZE', 5000)))
+_export_lock = threading.Lock()
+
+
+def parse_traceparent(header):
+    """(trace_id, parent_span_id) of a version 00 traceparent header, or None."""
+    parts = (header or '').strip().split('-')
+    if len(parts) != 4 or parts[0] != '00' or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Span:
+    def __init__(self, name, kind, trace_id=None, parent_id=None, **attributes):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def finish(self, **attributes):
+        self.attributes.update(attributes)
+        record = {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'service': SERVICE,
+            'kind': self.kind,
+            'name': self.name,
+            'start': round(self.start, 6),
+            'duration_ms': round((time.perf_counter() - self._started) * 1000, 2),
+            'attributes': self.attributes,
+        }
+        _buffer.append(record)
+        export_path = getattr(settings, 'TRACE_EXPORT_PATH', None)
+        if export_path:
+            with _export_lock, open(export_path, 'a', encoding='utf-8') as export_file:
+                export_file.write(json.dumps(record) + '\n')
+        return record
+
+
+def current_trace_id():
+    span = _current.get()
+    return span.trace_id if span else None
+
+
+@contextmanager
+def client_span(upstream, url=None):
+    """
+    Span for a call to `upstream`, a child of the request's span. Yields the
+    headers that carry the trace to the callee.
+    """
+    parent = _current.get()
+    span = Span(
+        f"{upstream} {urlsplit(url).path}" if url else upstream, 'client',
+        trace_id=parent.trace_id if parent else None, parent_id=parent.span_id if parent else None,
+        upstream=upstream,
+    )
+    error = None
+    try:
+        yield {'traceparent': span.traceparent}
+    except Exception as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        span.finish(**({'error': error} if error else {}))
+
+
+class TracingMiddleware:
+    """Goes first in MIDDLEWARE, so the server span covers the whole request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith(UNTRACED_PATHS):
+            return self.get_response(request)
+
+        trace_id, parent_id = parse_traceparent(request.headers.get('traceparent')) or (None, None)
+        span = Span(f"{request.method} {request.path}", 'server', trace_id=trace_id, parent_id=parent_id)
+        token = _current.set(span)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        match = request.resolver_match
+        span.finish(route=match.route if match else None, status=response.status_code)
+        # W3C trace-context response header, so callers can look the trace up.
+        response['traceresponse'] = span.traceparent
+        return response
+
+
+def traces_view(request):
+    """
+    Spans of the given `trace_id`, or a summary of the most recent traces
+    (`limit`, default 50) seen by this process. Only served when
+    TRACE_ENDPOINT_ENABLED is set, as paths carry patient ids.
+    """
+    if not getattr(settings, 'TRACE_ENDPOINT_ENABLED', False):
+        raise Http404
+    spans = list(_buffer)
+    trace_id = request.GET.get('trace_id')
+    if trace_id:
+        return JsonResponse({
+            'service': SERVICE,
+            'trace_id': trace_id,
+            'spans': sorted((s for s in spans if s['trace_id'] == trace_id), key=lambda s: s['start']),
+        })
+
+    try:
+        limit = max(int(request.GET.get('limit', 50)), 1)
+    except ValueError:
+        limit = 50
+    traces = {}
+    for span in spans:
+        trace = traces.setdefault(span['trace_id'], {'trace_id': span['trace_id'], 'spans': 0, 'root': None})
+        trace['spans'] += 1
+        # The earliest server span: the request that first reached this service.
+        if span['kind'] == 'server' and (trace['root'] is None or span['start'] < trace['root']['start']):
+            trace['root'] = span
+    recent = sorted(
+        (t for t in traces.values() if t['root']), key=lambda t: t['root']['start'], reverse=True
+    )[:limit]
+    return JsonResponse({
+        'service': SERVICE,
+        'pid': os.getpid(),
+        'traces': [
+            {
+                'trace_id': t['trace_id'],
+                'name': t['root']['name'],
+                'status': t['root']['attributes'].get('status'),
+                'start': t['root']['start'],
+                'duration_ms': t['root']['duration_ms'],
+                'spans': t['spans'],
+            }
+            for t in recent
+        ],
+    })
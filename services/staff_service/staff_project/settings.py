@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'staff_app.tracing.TracingMiddleware',
+    'staff_app.timing.ServerTimingMiddleware',
+    'staff_app.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -155,4 +158,29 @@ REST_FRAMEWORK = {
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
-]
\ No newline at end of file
+]
+
+# One JSON line per request with its SQL, upstream and rendering timings
+# (see staff_app.timing); logged when REQUEST_TIMING_LOG_LEVEL=INFO
+# (docker-compose sets it), silent by default so tests and benchmarks stay quiet.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'staff_app.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Tracing (see staff_app.tracing): finished spans kept in memory per process,
+# optionally appended to a JSON-lines file, and served at /traces when
+# enabled (span names carry patient and staff ids).
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 5000))
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH')
+TRACE_ENDPOINT_ENABLED = os.environ.get('TRACE_ENDPOINT_ENABLED', 'false').lower() == 'true'
@@ -16,10 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from staff_app.metrics import metrics_view
+from staff_app.tracing import traces_view
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('staff_app.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('traces', traces_view, name='traces'),
 ]
         
\ No newline at end of file
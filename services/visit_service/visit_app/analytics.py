@@ -0,0 +1,116 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime, time, timedelta
+from math import floor
+from django.db.models import Min
+from django.utils import timezone
+from .models import EmergencyVisit
+
+# Upper bounds (minutes) of the histogram bins; the last bin is open-ended.
+HISTOGRAM_BOUNDS = [30, 60, 120, 240, 360, 720, 1440]
+PERCENTILES = (50, 90, 95)
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile (0-100) of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def histogram(sorted_values, bounds=HISTOGRAM_BOUNDS):
+    """Bin counts of a sorted sequence, found by bisecting at every bound."""
+    edges = [0] + [bisect_left(sorted_values, bound) for bound in bounds] + [len(sorted_values)]
+    labels = [f"<{bounds[0]}"] + [f"{low}-{high}" for low, high in zip(bounds, bounds[1:])] + [f">={bounds[-1]}"]
+    return [
+        {'bin': label, 'count': edges[i + 1] - edges[i]}
+        for i, label in enumerate(labels)
+    ]
+
+
+def summarize(values):
+    """Count, mean, percentiles, max and histogram of a buffer of minutes."""
+    values = array('d', sorted(values))
+    summary = {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 1) if values else None,
+    }
+    for q in PERCENTILES:
+        summary[f'p{q}'] = round(percentile(values, q), 1) if values else None
+    summary['max'] = round(values[-1], 1) if values else None
+    summary['histogram'] = histogram(values)
+    return summary
+
+
+def _minutes(start, end):
+    return (end - start).total_seconds() / 60
+
+
+def compute_kpis(date_from, date_to, chunk_size=5000):
+    """
+    ER throughput KPIs for the visits that arrived between two dates
+    (inclusive): length of stay, door-to-first-treatment and
+    door-to-admission times, and admissions by triage level.
+
+    Only the needed columns are streamed from the database and kept as
+    floats in array buffers, so memory stays at a few bytes per visit.
+    """
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    rows = (
+        EmergencyVisit.objects
+        .filter(arrival_time__gte=start, arrival_time__lt=end)
+        .annotate(first_treatment_at=Min('treatments__administered_at'))
+        .order_by()
+        .values_list(
+            'arrival_time', 'discharge_time', 'triage_level', 'is_admitted',
+            'admission__admission_time', 'first_treatment_at',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    length_of_stay = array('d')
+    door_to_treatment = array('d')
+    door_to_admission = array('d')
+    by_triage = {}
+    visits = 0
+    for arrival, discharge, triage_level, is_admitted, admitted_at, first_treatment_at in rows:
+        visits += 1
+        level = by_triage.setdefault(triage_level, {'visits': 0, 'admitted': 0, 'length_of_stay': array('d')})
+        level['visits'] += 1
+        if is_admitted or admitted_at is not None:
+            level['admitted'] += 1
+        if discharge is not None:
+            minutes = _minutes(arrival, discharge)
+            length_of_stay.append(minutes)
+            level['length_of_stay'].append(minutes)
+        if first_treatment_at is not None:
+            door_to_treatment.append(_minutes(arrival, first_treatment_at))
+        if admitted_at is not None:
+            door_to_admission.append(_minutes(arrival, admitted_at))
+
+    triage_levels = {}
+    for triage_level, level in sorted(by_triage.items()):
+        stays = sorted(level['length_of_stay'])
+        median = percentile(stays, 50)
+        triage_levels[triage_level] = {
+            'visits': level['visits'],
+            'admitted': level['admitted'],
+            'admission_rate': round(level['admitted'] / level['visits'], 3),
+            'median_length_of_stay_minutes': round(median, 1) if median is not None else None,
+        }
+
+    return {
+        'from': date_from,
+        'to': date_to,
+        'visits': visits,
+        'discharged': len(length_of_stay),
+        'length_of_stay_minutes': summarize(length_of_stay),
+        'door_to_treatment_minutes': summarize(door_to_treatment),
+        'door_to_admission_minutes': summarize(door_to_admission),
+        'by_triage_level': triage_levels,
+        'generated_at': timezone.now(),
+    }
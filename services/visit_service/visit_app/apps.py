@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class VisitAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'visit_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .terminology import get_catalog
+        get_catalog()
@@ -0,0 +1,85 @@
+from bisect import bisect_right
+from django.db import connection
+from django.db.models import Q
+from .models import Admission
+
+# Half-open stay interval of an admission. Must match the expression of the
+# GiST index created by migration 0008 for PostgreSQL to use it.
+STAY_RANGE_SQL = (
+    "tstzrange({alias}admission_time, COALESCE({alias}discharge_time, 'infinity'::timestamptz), '[)')"
+)
+
+
+def _filters_sql(department, bed_id, alias=''):
+    clauses, params = [], []
+    if department:
+        clauses.append(f"{alias}department = %s")
+        params.append(department)
+    if bed_id:
+        clauses.append(f"{alias}bed_id = %s")
+        params.append(bed_id)
+    return ''.join(f" AND {clause}" for clause in clauses), params
+
+
+def census_at(moment, department=None, bed_id=None):
+    """{department: admitted patients} at an instant."""
+    if connection.vendor == 'postgresql':
+        filters, params = _filters_sql(department, bed_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT department, COUNT(*) FROM {Admission._meta.db_table} "
+                f"WHERE {STAY_RANGE_SQL.format(alias='')} @> %s::timestamptz{filters} "
+                f"GROUP BY department ORDER BY department",
+                [moment, *params],
+            )
+            return dict(cursor.fetchall())
+
+    counts = {}
+    admissions = _overlapping(moment, moment, department, bed_id).values_list('department', 'admission_time', 'discharge_time')
+    for admission_department, admitted, discharged in admissions:
+        if admitted <= moment and (discharged is None or discharged > moment):
+            counts[admission_department] = counts.get(admission_department, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def census_series(start, end, step, department=None, bed_id=None):
+    """[(instant, admitted patients)] every `step` from `start` to `end` inclusive."""
+    if connection.vendor == 'postgresql':
+        filters, params = _filters_sql(department, bed_id, alias='a.')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT t.at, COUNT(a.id) "
+                f"FROM generate_series(%s::timestamptz, %s::timestamptz, %s) AS t(at) "
+                f"LEFT JOIN {Admission._meta.db_table} a "
+                f"ON {STAY_RANGE_SQL.format(alias='a.')} @> t.at{filters} "
+                f"GROUP BY t.at ORDER BY t.at",
+                [start, end, step, *params],
+            )
+            return cursor.fetchall()
+
+    # Sweep: the census at t is (admissions started by t) - (stays ended by t).
+    starts, ends = [], []
+    for admitted, discharged in _overlapping(start, end, department, bed_id).values_list('admission_time', 'discharge_time'):
+        starts.append(admitted)
+        if discharged is not None:
+            ends.append(discharged)
+    starts.sort()
+    ends.sort()
+
+    series = []
+    moment = start
+    while moment <= end:
+        series.append((moment, bisect_right(starts, moment) - bisect_right(ends, moment)))
+        moment += step
+    return series
+
+
+def _overlapping(start, end, department, bed_id):
+    admissions = Admission.objects.filter(admission_time__lte=end).filter(
+        Q(discharge_time__isnull=True) | Q(discharge_time__gt=start)
+    ).order_by()
+    if department:
+        admissions = admissions.filter(department=department)
+    if bed_id:
+        admissions = admissions.filter(bed_id=bed_id)
+    return admissions
@@ -0,0 +1,118 @@
+from datetime import datetime, time, timedelta
+import django_filters
+from django_filters.constants import EMPTY_VALUES
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections, models
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework.filters import SearchFilter
+from .models import Admission, EmergencyVisit
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    `?search=` backed by the trigger-maintained `search_vector` column and its
+    GIN index on PostgreSQL, ranked by relevance unless `?ordering=` is given.
+    Other databases fall back to the regular SearchFilter (icontains on
+    `search_fields`).
+
+    Full-text matching works on whole (stemmed) words, so on PostgreSQL each
+    term is also matched as a word prefix (`to_tsquery` with `:*`), which keeps
+    partially typed words matching, and as a prefix of the view's
+    `search_prefix_fields`: code-like columns such as ICD-10 codes, which the
+    text parser splits on their punctuation.
+
+    Must come after OrderingFilter in `filter_backends` so the rank ordering
+    is not replaced by the view's default ordering.
+    """
+    search_vector_field = 'search_vector'
+
+    @staticmethod
+    def prefix_tsquery(terms):
+        """Raw tsquery matching every term as a word prefix; excluded (-term) terms are left out."""
+        terms = [term.strip('"') for term in terms if not term.startswith('-')]
+        return ' & '.join(
+            "'{}':*".format(term.replace('\\', '\\\\').replace("'", "''")) for term in terms if term
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        config = settings.FULL_TEXT_SEARCH_CONFIG
+        query = SearchQuery(' '.join(search_terms), config=config, search_type='websearch')
+        prefix_query = self.prefix_tsquery(search_terms)
+        if prefix_query:
+            query |= SearchQuery(prefix_query, config=config, search_type='raw')
+        vector_field = getattr(view, 'search_vector_field', self.search_vector_field)
+        matches = Q(**{vector_field: query})
+        for field in getattr(view, 'search_prefix_fields', []):
+            for term in search_terms:
+                matches |= Q(**{f'{field}__istartswith': term})
+        queryset = queryset.filter(matches).annotate(
+            search_rank=SearchRank(F(vector_field), query)
+        )
+        if request.query_params.get('ordering'):
+            return queryset
+        return queryset.order_by('-search_rank', *(getattr(view, 'ordering', None) or []))
+
+
+class LocalDateFilter(django_filters.DateFilter):
+    """
+    `<field>__date=YYYY-MM-DD` on a DateTimeField as the half-open range
+    [day 00:00, next day 00:00) in the current time zone. Unlike the `date`
+    lookup, which casts every row's timestamp, the range can use the btree
+    index on the column.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        start = timezone.make_aware(datetime.combine(value, time.min))
+        end = timezone.make_aware(datetime.combine(value + timedelta(days=1), time.min))
+        if self.distinct:
+            qs = qs.distinct()
+        return self.get_method(qs)(**{
+            f'{self.field_name}__gte': start,
+            f'{self.field_name}__lt': end,
+        })
+
+
+class LocalDateFilterSet(django_filters.FilterSet):
+    """FilterSet whose `date` lookups on DateTimeFields use LocalDateFilter."""
+
+    @classmethod
+    def filter_for_field(cls, field, field_name, lookup_expr=None):
+        if lookup_expr == 'date' and isinstance(field, models.DateTimeField):
+            return LocalDateFilter(field_name=field_name, lookup_expr=lookup_expr)
+        return super().filter_for_field(field, field_name, lookup_expr)
+
+
+class EmergencyVisitFilter(LocalDateFilterSet):
+    class Meta:
+        model = EmergencyVisit
+        fields = {
+            'patient_id': ['exact'],
+            'triage_level': ['exact', 'lte', 'gte'],
+            'arrival_time': ['date', 'gte', 'lte'],
+            'is_admitted': ['exact'],
+            'attending_physician_id': ['exact'],
+            'triage_nurse_id': ['exact'],
+        }
+
+
+class AdmissionFilter(LocalDateFilterSet):
+    class Meta:
+        model = Admission
+        fields = {
+            'visit_id': ['exact'],
+            'bed_id': ['exact', 'isnull'],
+            'department': ['exact', 'icontains'],
+            'admission_time': ['date', 'gte', 'lte'],
+            'discharge_time': ['date', 'gte', 'lte', 'isnull'],
+        }
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from visit_app.models import EmergencyVisit, VitalSign, VitalSignArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the vital signs of long-discharged visits out of the live table "
+        "into compressed VitalSignArchive batches (one batch per visit)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=settings.VITAL_SIGN_ARCHIVE_AFTER_DAYS,
+            help="Archive visits discharged more than this many days ago.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of visits archived per transaction.",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report how many visits would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        visit_ids = (
+            EmergencyVisit.objects
+            .filter(discharge_time__lt=cutoff, vital_signs__isnull=False)
+            .values_list('id', flat=True)
+            .distinct()
+            .order_by('id')
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{visit_ids.count()} visits would be archived (discharged before {cutoff:%Y-%m-%d}).")
+            return
+
+        batch_size = options['batch_size']
+        archived_visits = archived_readings = 0
+        last_id = 0
+        while True:
+            batch = list(visit_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+            visits, readings = self._archive_batch(batch)
+            archived_visits += visits
+            archived_readings += readings
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived_readings} vital signs from {archived_visits} visits."
+        ))
+
+    @transaction.atomic
+    def _archive_batch(self, visit_ids):
+        readings_by_visit = {}
+        readings = (
+            VitalSign.objects
+            .select_for_update()
+            .filter(visit_id__in=visit_ids)
+            .order_by('visit_id', 'recorded_at')
+        )
+        for reading in readings:
+            readings_by_visit.setdefault(reading.visit_id, []).append(reading)
+
+        visits = EmergencyVisit.objects.in_bulk(readings_by_visit.keys())
+        VitalSignArchive.objects.bulk_create([
+            VitalSignArchive.from_readings(visits[visit_id], visit_readings)
+            for visit_id, visit_readings in readings_by_visit.items()
+        ])
+        reading_ids = [reading.id for visit_readings in readings_by_visit.values() for reading in visit_readings]
+        for start in range(0, len(reading_ids), 500):
+            VitalSign.objects.filter(id__in=reading_ids[start:start + 500]).delete()
+        return len(readings_by_visit), len(reading_ids)
@@ -0,0 +1,360 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from visit_app.models import (
+    Admission, ArrivalHourlyCount, Bed, DepartmentAdmissionCounter, Diagnosis,
+    DiagnosisDailyCount, EmergencyVisit, Prescription, Treatment, VitalSign, VitalSignArchive
+)
+from visit_app.terminology import TerminologyCatalog
+
+# Rows per unit of --scale. The generators of all services derive their id
+# ranges from these numbers, so ids referenced across services exist as long
+# as every service is generated with the same --scale.
+SCALE_UNIT = {
+    'doctors': 50,
+    'nurses': 150,
+    'staff': 100,
+    'patients': 10000,
+    'visits': 20000,
+    'beds': 200,
+    'inventory_items': 1000,
+}
+
+
+def scaled_counts(scale):
+    return {name: max(1, round(count * scale)) for name, count in SCALE_UNIT.items()}
+
+
+def user_ids(counts):
+    """Auth user id ranges: doctors first, then nurses, then other staff."""
+    doctors = range(1, counts['doctors'] + 1)
+    nurses = range(doctors.stop, doctors.stop + counts['nurses'])
+    staff = range(nurses.stop, nurses.stop + counts['staff'])
+    return doctors, nurses, staff
+
+
+def insert_rows(model, rows):
+    """
+    Batched INSERT of dicts keyed by attname with explicit primary keys.
+    Unlike bulk_create it keeps the given auto_now_add timestamps and skips
+    the per-object model work; fields missing from a row get their default.
+    Only dates and datetimes need adapting, the driver takes the rest as is.
+    """
+    if not rows:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    adapters = {
+        'DateTimeField': db.ops.adapt_datetimefield_value,
+        'DateField': db.ops.adapt_datefield_value,
+    }
+    columns = [
+        (field.attname, field.get_default(), adapters.get(field.get_internal_type()))
+        for field in model._meta.concrete_fields
+    ]
+    params = [
+        [
+            (adapt(row.get(name, default)) if adapt else row.get(name, default))
+            for name, default, adapt in columns
+        ]
+        for row in rows
+    ]
+    with db.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} "
+            f"({', '.join(db.ops.quote_name(field.column) for field in model._meta.concrete_fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            params,
+        )
+
+
+def reset_sequences(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def ensure_empty(models):
+    filled = [model._meta.label for model in models if model._default_manager.exists()]
+    if filled:
+        raise CommandError(
+            f"{', '.join(filled)} already contain rows; run `manage.py flush` first "
+            f"so the generated ids match the other services."
+        )
+
+
+# Relative arrival rate by hour of day: quiet nights, late-morning and
+# early-evening peaks.
+HOUR_WEIGHTS = [3, 2, 2, 1, 1, 1, 2, 4, 6, 8, 9, 9, 8, 8, 7, 7, 7, 8, 8, 7, 6, 5, 4, 3]
+TRIAGE_WEIGHTS = {1: 2, 2: 12, 3: 40, 4: 34, 5: 12}
+# Probability of admission and median length of stay (minutes) by triage level.
+ADMISSION_RATE = {1: 0.7, 2: 0.4, 3: 0.15, 4: 0.04, 5: 0.01}
+MEDIAN_STAY = {1: 360, 2: 300, 3: 240, 4: 150, 5: 90}
+CHIEF_COMPLAINTS = [
+    "Chest pain", "Shortness of breath", "Abdominal pain", "Headache", "Fever",
+    "Fall with head trauma", "Back pain", "Syncope", "Palpitations", "Laceration",
+    "Ankle injury", "Vomiting and diarrhea", "Dizziness", "Allergic reaction",
+    "Altered mental status", "Urinary retention", "Cough", "Wrist pain after fall",
+]
+DEPARTMENTS = [
+    "Cardiology", "Internal Medicine", "Neurology", "Orthopedics",
+    "General Surgery", "Pulmonology", "Gastroenterology", "Intensive Care",
+]
+TREATMENT_TYPES = [('MED', 5), ('PROC', 2), ('TEST', 4), ('OTHER', 1)]
+FREQUENCIES = ["Once daily", "Twice daily", "3 times a day", "Every 8 hours", "As needed"]
+DURATIONS = ["3 days", "5 days", "7 days", "10 days", "14 days"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a reproducible synthetic ER dataset: beds, "
+        "visits with vitals, treatments, diagnoses, prescriptions and admissions, "
+        "plus the rollup counters. Patient, staff and user ids fall in the ranges "
+        "the other services' generators create for the same --scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help=f"Multiplier of the base volume ({SCALE_UNIT['visits']} visits, "
+                 f"{SCALE_UNIT['patients']} patients per unit).",
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed.")
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help="Visits arrive over this many days up to now.",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help="Visits (with their related rows) written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        models = [
+            EmergencyVisit, VitalSign, VitalSignArchive, Treatment, Diagnosis, Prescription,
+            Bed, Admission, ArrivalHourlyCount, DiagnosisDailyCount, DepartmentAdmissionCounter,
+        ]
+        ensure_empty(models)
+
+        self.rng = random.Random(options['seed'])
+        self.counts = scaled_counts(options['scale'])
+        self.doctor_users, self.nurse_users, _ = user_ids(self.counts)
+        catalog = TerminologyCatalog.from_file(settings.TERMINOLOGY_CATALOG_PATH)
+        self.terms = {
+            kind: [(code, label) for entry_kind, code, label in catalog.entries if entry_kind == kind]
+            for kind in ('icd10', 'medication', 'procedure')
+        }
+        self.now = timezone.now()
+        self.arrivals_per_hour = Counter()
+        self.diagnoses_per_day = Counter()
+        self.admissions_per_department = Counter()
+        self.current_per_department = Counter()
+        self.next_ids = Counter()
+
+        started = time.monotonic()
+        beds = self.generate_beds()
+        self.free_beds = set(beds)
+        self.occupied_beds = {}
+
+        visits = self.counts['visits']
+        window_start = self.now - timedelta(days=options['days'])
+        seconds_per_visit = options['days'] * 86400 / visits
+        for chunk_start in range(0, visits, options['chunk_size']):
+            chunk = range(chunk_start, min(chunk_start + options['chunk_size'], visits))
+            with transaction.atomic():
+                self.generate_visits(chunk, window_start, seconds_per_visit)
+            self.stdout.write(f"{chunk.stop} of {visits} visits written.")
+
+        with transaction.atomic():
+            for bed_id, patient_id in self.occupied_beds.items():
+                Bed.objects.filter(pk=bed_id).update(status='OCCUP', patient_id=patient_id)
+            ArrivalHourlyCount.objects.bulk_create([
+                ArrivalHourlyCount(hour=hour, count=count) for hour, count in self.arrivals_per_hour.items()
+            ], batch_size=1000)
+            DiagnosisDailyCount.objects.bulk_create([
+                DiagnosisDailyCount(day=day, code=code, count=count)
+                for (day, code), count in self.diagnoses_per_day.items()
+            ], batch_size=1000)
+            DepartmentAdmissionCounter.objects.bulk_create([
+                DepartmentAdmissionCounter(
+                    department=department, total=total, current=self.current_per_department[department]
+                )
+                for department, total in self.admissions_per_department.items()
+            ])
+            reset_sequences(models)
+
+        elapsed = time.monotonic() - started
+        rows = sum(self.next_ids.values()) + len(beds)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {rows} rows ({visits} visits, {self.next_ids[VitalSign]} vital signs, "
+            f"{self.next_ids[Admission]} admissions) in {elapsed:.1f}s, {rows / elapsed:,.0f} rows/s."
+        ))
+
+    def next_id(self, model):
+        self.next_ids[model] += 1
+        return self.next_ids[model]
+
+    def generate_beds(self):
+        rng = self.rng
+        rows = [
+            {
+                'id': bed_id,
+                'bed_number': f"{DEPARTMENTS[(bed_id - 1) % len(DEPARTMENTS)][:3].upper()}-{bed_id:05d}",
+                'status': 'MAINT' if rng.random() < 0.03 else 'AVAIL',
+                'location': DEPARTMENTS[(bed_id - 1) % len(DEPARTMENTS)],
+                'is_isolation': rng.random() < 0.1,
+                'doctor_id': rng.randint(1, self.counts['doctors']),
+                'nurse_id': rng.randint(1, self.counts['nurses']),
+                'last_cleaned': self.now - timedelta(hours=rng.randint(1, 72)),
+            }
+            for bed_id in range(1, self.counts['beds'] + 1)
+        ]
+        with transaction.atomic():
+            insert_rows(Bed, rows)
+        return [row['id'] for row in rows if row['status'] == 'AVAIL']
+
+    def generate_visits(self, chunk, window_start, seconds_per_visit):
+        rng = self.rng
+        rows = {model: [] for model in (EmergencyVisit, VitalSign, Treatment, Diagnosis, Prescription, Admission)}
+        for index in chunk:
+            day_start = (window_start + timedelta(seconds=index * seconds_per_visit)).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            arrival = day_start + timedelta(
+                hours=rng.choices(range(24), HOUR_WEIGHTS)[0], seconds=rng.randint(0, 3599)
+            )
+            if arrival > self.now:
+                arrival = self.now - timedelta(seconds=rng.randint(60, 3600))
+            triage_level = rng.choices(list(TRIAGE_WEIGHTS), list(TRIAGE_WEIGHTS.values()))[0]
+            stay = timedelta(minutes=rng.lognormvariate(0, 0.5) * MEDIAN_STAY[triage_level])
+            discharge = arrival + stay if arrival + stay <= self.now else None
+            is_admitted = rng.random() < ADMISSION_RATE[triage_level]
+            patient_id = rng.randint(1, self.counts['patients'])
+            visit_id = self.next_id(EmergencyVisit)
+            physician = rng.randint(1, self.counts['doctors'])
+            nurse = rng.randint(1, self.counts['nurses'])
+            complaint = rng.choice(CHIEF_COMPLAINTS)
+            diagnosis_code, diagnosis_label = rng.choice(self.terms['icd10'])
+
+            rows[EmergencyVisit].append({
+                'id': visit_id,
+                'patient_id': patient_id,
+                'arrival_time': arrival,
+                'triage_level': triage_level,
+                'chief_complaint': complaint,
+                'initial_observation': f"Triage level {triage_level}: {complaint.lower()}.",
+                'discharge_time': discharge,
+                'discharge_diagnosis': diagnosis_label if discharge else None,
+                'discharge_instructions': "Follow up with your GP." if discharge and not is_admitted else None,
+                'is_admitted': is_admitted,
+                'attending_physician_id': physician,
+                'triage_nurse_id': nurse,
+            })
+            self.arrivals_per_hour[ArrivalHourlyCount.truncate(arrival)] += 1
+
+            stay_end = discharge or self.now
+            span = max((stay_end - arrival).total_seconds(), 60)
+            for reading in range(max(1, min(8, int(span // 3600) + 1))):
+                rows[VitalSign].append({
+                    'id': self.next_id(VitalSign),
+                    'visit_id': visit_id,
+                    'recorded_by_id': self.nurse_users[nurse - 1],
+                    'recorded_at': arrival + timedelta(seconds=min(span, 300 + reading * 3600)),
+                    'temperature': Decimal(f"{rng.gauss(37.0 + 0.3 * (triage_level < 3), 0.6):.1f}"),
+                    'heart_rate': int(min(180, max(40, rng.gauss(85 + (3 - triage_level) * 8, 12)))),
+                    'blood_pressure_systolic': int(min(220, max(70, rng.gauss(128, 18)))),
+                    'blood_pressure_diastolic': int(min(130, max(40, rng.gauss(80, 10)))),
+                    'respiratory_rate': int(min(40, max(8, rng.gauss(17, 3)))),
+                    'oxygen_saturation': int(min(100, max(80, rng.gauss(97 - (triage_level < 3) * 3, 2)))),
+                    'pain_level': rng.randint(0, 10),
+                    'gcs_score': 15 if triage_level > 2 else rng.randint(8, 15),
+                })
+
+            for _ in range(rng.randint(1, 3)):
+                treatment_type = rng.choices(*zip(*TREATMENT_TYPES))[0]
+                code, label = rng.choice(self.terms['medication' if treatment_type == 'MED' else 'procedure'])
+                rows[Treatment].append({
+                    'id': self.next_id(Treatment),
+                    'visit_id': visit_id,
+                    'treatment_type': treatment_type,
+                    'name': label[:200],
+                    'administered_by_id': self.nurse_users[nurse - 1] if treatment_type == 'MED' else physician,
+                    'administered_at': arrival + timedelta(seconds=rng.uniform(0.05, 0.8) * span),
+                    'dosage': "1 dose" if treatment_type == 'MED' else None,
+                    'outcome': "Completed",
+                })
+
+            for position in range(rng.choices([1, 2], [4, 1])[0]):
+                code, label = (diagnosis_code, diagnosis_label) if position == 0 else rng.choice(self.terms['icd10'])
+                diagnosed_at = arrival + timedelta(seconds=rng.uniform(0.3, 0.9) * span)
+                rows[Diagnosis].append({
+                    'id': self.next_id(Diagnosis),
+                    'visit_id': visit_id,
+                    'code': code,
+                    'description': label,
+                    'diagnosed_by_id': self.doctor_users[physician - 1],
+                    'diagnosed_at': diagnosed_at,
+                    'is_primary': position == 0,
+                })
+                self.diagnoses_per_day[
+                    (timezone.localdate(diagnosed_at), DiagnosisDailyCount.normalize_code(code))
+                ] += 1
+
+            for _ in range(rng.choices([0, 1, 2], [5, 4, 1])[0]):
+                code, label = rng.choice(self.terms['medication'])
+                prescribed_at = arrival + timedelta(seconds=rng.uniform(0.5, 1.0) * span)
+                dispensed = discharge is not None and rng.random() < 0.95
+                rows[Prescription].append({
+                    'id': self.next_id(Prescription),
+                    'visit_id': visit_id,
+                    'medication': label[:200],
+                    'dosage': f"{rng.choice([5, 10, 20, 40, 250, 500])}mg",
+                    'frequency': rng.choice(FREQUENCIES),
+                    'duration': rng.choice(DURATIONS),
+                    'prescribed_by_id': self.doctor_users[physician - 1],
+                    'prescribed_at': prescribed_at,
+                    'is_dispensed': dispensed,
+                    'refills': rng.choice([0, 0, 0, 1, 2]),
+                })
+
+            if is_admitted:
+                admission_time = arrival + timedelta(seconds=rng.uniform(0.5, 1.0) * span)
+                admission_discharge = admission_time + timedelta(hours=rng.lognormvariate(4.0, 0.7))
+                if admission_discharge > self.now:
+                    admission_discharge = None
+                department = rng.choice(DEPARTMENTS)
+                if admission_discharge is None and self.free_beds:
+                    bed_id = self.free_beds.pop()
+                    self.occupied_beds[bed_id] = patient_id
+                elif admission_discharge is None:
+                    bed_id = None
+                else:
+                    bed_id = rng.randint(1, self.counts['beds'])
+                rows[Admission].append({
+                    'id': self.next_id(Admission),
+                    'visit_id': visit_id,
+                    'bed_id': bed_id,
+                    'admitted_by_id': self.doctor_users[physician - 1],
+                    'admission_time': admission_time,
+                    'discharge_time': admission_discharge,
+                    'admitting_diagnosis': diagnosis_label,
+                    'department': department,
+                })
+                self.admissions_per_department[department] += 1
+                if admission_discharge is None:
+                    self.current_per_department[department] += 1
+
+        for model, model_rows in rows.items():
+            insert_rows(model, model_rows)
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from visit_app.models import Admission, DepartmentAdmissionCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-department admission counters from the Admission "
+        "table, or only compare them with --check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Report counters that differ from the Admission table without changing them; "
+                 "exits with an error if any differ.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stored = {
+                counter.department: (counter.total, counter.current)
+                for counter in DepartmentAdmissionCounter.objects.select_for_update()
+            }
+            expected = {
+                row['department']: (row['total'], row['current'])
+                for row in Admission.objects.order_by().values('department').annotate(
+                    total=models.Count('id'),
+                    current=models.Count('id', filter=models.Q(discharge_time__isnull=True)),
+                )
+            }
+            mismatches = sorted(
+                department for department in stored.keys() | expected.keys()
+                if stored.get(department, (0, 0)) != expected.get(department, (0, 0))
+            )
+
+            if options['check']:
+                for department in mismatches:
+                    self.stdout.write(
+                        f"{department}: stored (total, current) {stored.get(department, (0, 0))}, "
+                        f"expected {expected.get(department, (0, 0))}"
+                    )
+                if mismatches:
+                    raise CommandError(f"{len(mismatches)} department counters are out of date.")
+                self.stdout.write(self.style.SUCCESS(f"All {len(expected)} department counters are consistent."))
+                return
+
+            DepartmentAdmissionCounter.objects.all().delete()
+            DepartmentAdmissionCounter.objects.bulk_create([
+                DepartmentAdmissionCounter(department=department, total=total, current=current)
+                for department, (total, current) in expected.items()
+            ])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(expected)} department counters ({len(mismatches)} were out of date)."
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VitalSignArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_count', models.PositiveIntegerField(help_text='Number of readings in the batch')),
+                ('first_recorded_at', models.DateTimeField(help_text='Oldest reading in the batch')),
+                ('last_recorded_at', models.DateTimeField(help_text='Newest reading in the batch')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField(help_text='zlib-compressed JSON list of readings')),
+            ],
+            options={
+                'verbose_name': 'Vital Sign Archive',
+                'verbose_name_plural': 'Vital Sign Archives',
+                'ordering': ['-last_recorded_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vitalsign',
+            index=models.Index(fields=['visit', '-recorded_at'], name='visit_app_v_visit_i_d10b10_idx'),
+        ),
+        migrations.AddField(
+            model_name='vitalsignarchive',
+            name='visit',
+            field=models.ForeignKey(help_text='Associated emergency visit', on_delete=django.db.models.deletion.CASCADE, related_name='vital_sign_archives', to='visit_app.emergencyvisit'),
+        ),
+        migrations.AddIndex(
+            model_name='vitalsignarchive',
+            index=models.Index(fields=['visit', '-last_recorded_at'], name='visit_app_v_visit_i_395c76_idx'),
+        ),
+    ]
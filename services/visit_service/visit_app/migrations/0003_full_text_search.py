@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:57
+
+import re
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# table -> [(column, weight)] indexed into the table's search_vector column.
+SEARCH_COLUMNS = {
+    'visit_app_emergencyvisit': [('chief_complaint', 'A'), ('initial_observation', 'B')],
+    'visit_app_treatment': [('name', 'A'), ('description', 'B')],
+    'visit_app_diagnosis': [('code', 'A'), ('description', 'B')],
+}
+
+
+def _vector_sql(columns, config, row=''):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', coalesce({row}{column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    config = settings.FULL_TEXT_SEARCH_CONFIG
+    if not re.fullmatch(r'[a-z_]+', config):
+        raise ValueError(f"Invalid FULL_TEXT_SEARCH_CONFIG: {config!r}")
+
+    for table, columns in SEARCH_COLUMNS.items():
+        column_list = ', '.join(column for column, _ in columns)
+        schema_editor.execute(f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_vector_sql(columns, config, row='NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {column_list} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        schema_editor.execute(f"UPDATE {table} SET search_vector = {_vector_sql(columns, config)}")
+        schema_editor.execute(f"CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)")
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_vector_gin")
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0002_vitalsign_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='diagnosis',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='code/description tsvector, maintained by a PostgreSQL trigger', null=True),
+        ),
+        migrations.AddField(
+            model_name='emergencyvisit',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='chief_complaint/initial_observation tsvector, maintained by a PostgreSQL trigger', null=True),
+        ),
+        migrations.AddField(
+            model_name='treatment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='name/description tsvector, maintained by a PostgreSQL trigger', null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
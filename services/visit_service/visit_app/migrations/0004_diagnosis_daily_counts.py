@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:01
+
+from collections import Counter
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_daily_counts(apps, schema_editor):
+    Diagnosis = apps.get_model('visit_app', 'Diagnosis')
+    DiagnosisDailyCount = apps.get_model('visit_app', 'DiagnosisDailyCount')
+    counts = Counter(
+        (timezone.localdate(diagnosed_at), code.strip().upper())
+        for diagnosed_at, code in Diagnosis.objects.values_list('diagnosed_at', 'code').iterator(chunk_size=5000)
+    )
+    DiagnosisDailyCount.objects.bulk_create(
+        [DiagnosisDailyCount(day=day, code=code, count=count) for (day, code), count in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0003_full_text_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiagnosisDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('code', models.CharField(help_text='Normalized ICD-10 Code', max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Diagnosis Daily Count',
+                'verbose_name_plural': 'Diagnosis Daily Counts',
+                'ordering': ['-day', 'code'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='diagnosisdailycount',
+            constraint=models.UniqueConstraint(fields=('day', 'code'), name='unique_diagnosis_daily_count'),
+        ),
+        migrations.RunPython(backfill_daily_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0004_diagnosis_daily_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prescription',
+            name='claimed_by_id',
+            field=models.IntegerField(blank=True, help_text='ID of the pharmacist currently working on the prescription', null=True),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text="End of the pharmacist's claim; expired claims return to the queue", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(condition=models.Q(('is_dispensed', False)), fields=['prescribed_at'], name='prescription_queue_idx'),
+        ),
+    ]
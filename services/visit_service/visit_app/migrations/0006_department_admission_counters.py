@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+def backfill_department_counters(apps, schema_editor):
+    Admission = apps.get_model('visit_app', 'Admission')
+    DepartmentAdmissionCounter = apps.get_model('visit_app', 'DepartmentAdmissionCounter')
+    rows = Admission.objects.order_by().values('department').annotate(
+        total=models.Count('id'),
+        current=models.Count('id', filter=models.Q(discharge_time__isnull=True)),
+    )
+    DepartmentAdmissionCounter.objects.bulk_create([
+        DepartmentAdmissionCounter(department=row['department'], total=row['total'], current=row['current'])
+        for row in rows
+    ])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0005_prescription_work_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentAdmissionCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=100, unique=True)),
+                ('total', models.IntegerField(default=0, help_text='Admissions to the department')),
+                ('current', models.IntegerField(default=0, help_text='Admissions not yet discharged')),
+            ],
+            options={
+                'verbose_name': 'Department Admission Counter',
+                'verbose_name_plural': 'Department Admission Counters',
+                'ordering': ['department'],
+            },
+        ),
+        migrations.RunPython(backfill_department_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:11
+
+from collections import Counter
+from datetime import timezone
+from django.db import migrations, models
+
+
+def backfill_arrival_counts(apps, schema_editor):
+    EmergencyVisit = apps.get_model('visit_app', 'EmergencyVisit')
+    ArrivalHourlyCount = apps.get_model('visit_app', 'ArrivalHourlyCount')
+    counts = Counter(
+        arrival_time.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        for arrival_time in EmergencyVisit.objects.values_list('arrival_time', flat=True).iterator(chunk_size=5000)
+    )
+    ArrivalHourlyCount.objects.bulk_create(
+        [ArrivalHourlyCount(hour=hour, count=count) for hour, count in counts.items()],
+        batch_size=1000,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0006_department_admission_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArrivalHourlyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='Start of the hour', unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Arrival Hourly Count',
+                'verbose_name_plural': 'Arrival Hourly Counts',
+                'ordering': ['hour'],
+            },
+        ),
+        migrations.RunPython(backfill_arrival_counts, migrations.RunPython.noop),
+    ]
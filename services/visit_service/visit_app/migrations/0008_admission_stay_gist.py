@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:14
+
+from django.db import migrations
+
+STAY_INDEX = 'visit_app_admission_stay_gist'
+
+
+def create_stay_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # btree_gist lets department and bed_id share the GiST index with the range.
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        f"CREATE INDEX {STAY_INDEX} ON visit_app_admission USING gist ("
+        "tstzrange(admission_time, COALESCE(discharge_time, 'infinity'::timestamptz), '[)'), "
+        "department, bed_id)"
+    )
+
+
+def drop_stay_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {STAY_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0007_arrival_hourly_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_stay_index, drop_stay_index),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0008_admission_stay_gist'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='admission',
+            name='visit_app_a_dischar_a7fc79_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='admission',
+            name='visit_app_a_departm_322e93_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='bed',
+            name='visit_app_b_status_c1b8de_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='emergencyvisit',
+            name='visit_app_e_patient_629caa_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='emergencyvisit',
+            name='visit_app_e_triage__009cfa_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='emergencyvisit',
+            name='visit_app_e_is_admi_9d7b2d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(condition=models.Q(('discharge_time__isnull', False)), fields=['discharge_time'], name='admission_discharged_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(fields=['department', '-admission_time'], name='admission_department_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(condition=models.Q(('discharge_time__isnull', True)), fields=['-admission_time'], name='admission_current_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bed',
+            index=models.Index(fields=['status', 'bed_number'], name='bed_status_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='diagnosis',
+            index=models.Index(fields=['visit', '-diagnosed_at'], name='diagnosis_visit_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyvisit',
+            index=models.Index(fields=['patient_id', '-arrival_time'], name='visit_patient_arrival_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyvisit',
+            index=models.Index(fields=['triage_level', '-arrival_time'], name='visit_triage_arrival_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyvisit',
+            index=models.Index(fields=['attending_physician_id', '-arrival_time'], name='visit_physician_arrival_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyvisit',
+            index=models.Index(condition=models.Q(('discharge_time__isnull', True)), fields=['-arrival_time'], name='visit_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyvisit',
+            index=models.Index(condition=models.Q(('is_admitted', True)), fields=['-arrival_time'], name='visit_admitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['visit', '-prescribed_at'], name='prescription_visit_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatment',
+            index=models.Index(fields=['visit', '-administered_at'], name='treatment_visit_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatment',
+            index=models.Index(fields=['treatment_type', '-administered_at'], name='treatment_type_time_idx'),
+        ),
+    ]
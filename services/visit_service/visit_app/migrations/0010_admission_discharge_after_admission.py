@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visit_app', '0009_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='admission',
+            constraint=models.CheckConstraint(check=models.Q(('discharge_time__isnull', True), ('discharge_time__gte', models.F('admission_time')), _connector='OR'), name='admission_discharge_after_admission'),
+        ),
+    ]
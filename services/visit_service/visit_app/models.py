@@ -1,5 +1,12 @@
-from django.db import models
+import json
+import zlib
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from django.db import models, router, transaction, IntegrityError
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 class EmergencyVisit(models.Model):
     TRIAGE_LEVEL_CHOICES = [
@@ -41,21 +48,81 @@ class EmergencyVisit(models.Model):
     is_admitted = models.BooleanField(default=False, help_text="If the patient was admitted")
     attending_physician_id = models.IntegerField(null=True, blank=True, help_text="Attending physician ID from the staff service")
     triage_nurse_id = models.IntegerField(null=True, blank=True, help_text="Triage nurse ID from the staff service")
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="chief_complaint/initial_observation tsvector, maintained by a PostgreSQL trigger"
+    )
     
     class Meta:
         ordering = ['-arrival_time']
         verbose_name = "Emergency Visit"
         verbose_name_plural = "Emergency Visits"
         indexes = [
-            models.Index(fields=['patient_id']),
             models.Index(fields=['arrival_time']),
-            models.Index(fields=['triage_level']),
-            models.Index(fields=['is_admitted']),
+            # Filterset fields combined with the default -arrival_time
+            # ordering, so a page is read in index order without a sort.
+            models.Index(fields=['patient_id', '-arrival_time'], name='visit_patient_arrival_idx'),
+            models.Index(fields=['triage_level', '-arrival_time'], name='visit_triage_arrival_idx'),
+            models.Index(fields=['attending_physician_id', '-arrival_time'], name='visit_physician_arrival_idx'),
+            # Active board: only the visits still in the ER are indexed.
+            models.Index(
+                fields=['-arrival_time'],
+                condition=models.Q(discharge_time__isnull=True),
+                name='visit_active_idx',
+            ),
+            # is_admitted is true for a minority of visits; a two-valued
+            # leading column would not be selective enough to be chosen.
+            models.Index(
+                fields=['-arrival_time'],
+                condition=models.Q(is_admitted=True),
+                name='visit_admitted_idx',
+            ),
         ]
 
     def __str__(self):
         return f"ER Visit #{self.id} - Patient {self.patient_id}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if adding:
+                ArrivalHourlyCount.bump(self.arrival_time, 1)
+
+class ArrivalHourlyCount(models.Model):
+    """
+    Number of visits that arrived in each hour (UTC, truncated), kept up to
+    date by EmergencyVisit.save() and the post_delete handler in signals.py.
+    Arrival heatmaps sum these rows instead of scanning the visits.
+    """
+    hour = models.DateTimeField(unique=True, help_text="Start of the hour")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['hour']
+        verbose_name = "Arrival Hourly Count"
+        verbose_name_plural = "Arrival Hourly Counts"
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00: {self.count}"
+
+    @staticmethod
+    def truncate(moment):
+        return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def bump(cls, moment, delta):
+        hour = cls.truncate(moment)
+        rows = cls.objects.filter(hour=hour)
+        if rows.update(count=models.F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(hour=hour, count=delta)
+        except IntegrityError:
+            rows.update(count=models.F('count') + delta)
+
 class VitalSign(models.Model):
     visit = models.ForeignKey(
         EmergencyVisit,
@@ -128,10 +195,79 @@ class VitalSign(models.Model):
         ordering = ['-recorded_at']
         verbose_name = "Vital Sign"
         verbose_name_plural = "Vital Signs"
+        indexes = [
+            models.Index(fields=['visit', '-recorded_at']),
+        ]
 
     def __str__(self):
         return f"Vitals for Visit #{self.visit_id} at {self.recorded_at}"
 
+class VitalSignArchive(models.Model):
+    """
+    Compressed batch of vital signs moved out of the live VitalSign table
+    once the visit has been discharged for a while (see archive_vital_signs).
+    """
+    READING_FIELDS = [
+        'id', 'recorded_by_id', 'recorded_at', 'temperature', 'heart_rate',
+        'blood_pressure_systolic', 'blood_pressure_diastolic', 'respiratory_rate',
+        'oxygen_saturation', 'pain_level', 'gcs_score', 'notes',
+    ]
+
+    visit = models.ForeignKey(
+        EmergencyVisit,
+        on_delete=models.CASCADE,
+        related_name='vital_sign_archives',
+        help_text="Associated emergency visit"
+    )
+    reading_count = models.PositiveIntegerField(help_text="Number of readings in the batch")
+    first_recorded_at = models.DateTimeField(help_text="Oldest reading in the batch")
+    last_recorded_at = models.DateTimeField(help_text="Newest reading in the batch")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField(help_text="zlib-compressed JSON list of readings")
+
+    class Meta:
+        ordering = ['-last_recorded_at']
+        verbose_name = "Vital Sign Archive"
+        verbose_name_plural = "Vital Sign Archives"
+        indexes = [
+            models.Index(fields=['visit', '-last_recorded_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.reading_count} archived vitals for Visit #{self.visit_id}"
+
+    @classmethod
+    def from_readings(cls, visit, readings):
+        rows = []
+        for reading in readings:
+            row = {field: getattr(reading, field) for field in cls.READING_FIELDS}
+            row['recorded_at'] = reading.recorded_at.isoformat()
+            if reading.temperature is not None:
+                row['temperature'] = str(reading.temperature)
+            rows.append(row)
+        recorded = [reading.recorded_at for reading in readings]
+        return cls(
+            visit=visit,
+            reading_count=len(rows),
+            first_recorded_at=min(recorded),
+            last_recorded_at=max(recorded),
+            payload=zlib.compress(json.dumps(rows, separators=(',', ':')).encode(), level=9),
+        )
+
+    def readings(self):
+        """Rebuild the archived rows as unsaved VitalSign instances."""
+        rows = json.loads(zlib.decompress(bytes(self.payload)))
+        readings = []
+        for row in rows:
+            row['recorded_at'] = parse_datetime(row['recorded_at'])
+            if row['temperature'] is not None:
+                row['temperature'] = Decimal(row['temperature'])
+            reading = VitalSign(visit_id=self.visit_id, **row)
+            if self._meta.get_field('visit').is_cached(self):
+                reading.visit = self.visit
+            readings.append(reading)
+        return readings
+
 class Treatment(models.Model):
     TREATMENT_TYPE_CHOICES = [
         ('MED', 'Medication'),
@@ -182,11 +318,20 @@ class Treatment(models.Model):
         null=True,
         help_text="Any complications"
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="name/description tsvector, maintained by a PostgreSQL trigger"
+    )
 
     class Meta:
         ordering = ['-administered_at']
         verbose_name = "Treatment"
         verbose_name_plural = "Treatments"
+        indexes = [
+            models.Index(fields=['visit', '-administered_at'], name='treatment_visit_time_idx'),
+            models.Index(fields=['treatment_type', '-administered_at'], name='treatment_type_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_treatment_type_display()}: {self.name} (Visit #{self.visit_id})"
@@ -215,6 +360,11 @@ class Diagnosis(models.Model):
         null=True,
         help_text="Additional notes"
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="code/description tsvector, maintained by a PostgreSQL trigger"
+    )
 
     class Meta:
         ordering = ['-diagnosed_at']
@@ -222,11 +372,68 @@ class Diagnosis(models.Model):
         verbose_name_plural = "Diagnoses"
         indexes = [
             models.Index(fields=['code']),
+            models.Index(fields=['visit', '-diagnosed_at'], name='diagnosis_visit_time_idx'),
         ]
 
     def __str__(self):
         return f"{self.code}: {self.description[:50]} (Visit #{self.visit_id})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_code = dict(zip(field_names, values)).get('code')
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        previous_code = getattr(self, '_loaded_code', None)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            day = timezone.localdate(self.diagnosed_at)
+            if adding:
+                DiagnosisDailyCount.bump(day, self.code, 1)
+            elif previous_code is not None and previous_code != self.code:
+                DiagnosisDailyCount.bump(day, previous_code, -1)
+                DiagnosisDailyCount.bump(day, self.code, 1)
+        self._loaded_code = self.code
+
+class DiagnosisDailyCount(models.Model):
+    """
+    Number of diagnoses per ICD-10 code and day, kept up to date by
+    Diagnosis.save() and the post_delete handler in signals.py. Category and
+    chapter totals are derived from the code at query time.
+    """
+    day = models.DateField()
+    code = models.CharField(max_length=20, help_text="Normalized ICD-10 Code")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day', 'code']
+        verbose_name = "Diagnosis Daily Count"
+        verbose_name_plural = "Diagnosis Daily Counts"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'code'], name='unique_diagnosis_daily_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.code} on {self.day}: {self.count}"
+
+    @staticmethod
+    def normalize_code(code):
+        return code.strip().upper()
+
+    @classmethod
+    def bump(cls, day, code, delta):
+        code = cls.normalize_code(code)
+        rows = cls.objects.filter(day=day, code=code)
+        if rows.update(count=models.F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(day=day, code=code, count=delta)
+        except IntegrityError:
+            rows.update(count=models.F('count') + delta)
+
 class Prescription(models.Model):
     visit = models.ForeignKey(
         EmergencyVisit,
@@ -263,11 +470,30 @@ class Prescription(models.Model):
     )
     is_dispensed = models.BooleanField(default=False, help_text="If the medication has been dispensed")
     refills = models.PositiveIntegerField(default=0, help_text="Number of allowed refills")
+    claimed_by_id = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="ID of the pharmacist currently working on the prescription"
+    )
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="End of the pharmacist's claim; expired claims return to the queue"
+    )
 
     class Meta:
         ordering = ['-prescribed_at']
         verbose_name = "Prescription"
         verbose_name_plural = "Prescriptions"
+        indexes = [
+            # Pharmacy work queue: only the (few) undispensed rows are indexed.
+            models.Index(
+                fields=['prescribed_at'],
+                condition=models.Q(is_dispensed=False),
+                name='prescription_queue_idx',
+            ),
+            models.Index(fields=['visit', '-prescribed_at'], name='prescription_visit_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.medication} for Visit #{self.visit_id}"
@@ -320,7 +546,7 @@ class Bed(models.Model):
         verbose_name = "Bed"
         verbose_name_plural = "Beds"
         indexes = [
-            models.Index(fields=['status']),
+            models.Index(fields=['status', 'bed_number'], name='bed_status_number_idx'),
             models.Index(fields=['location']),
             models.Index(fields=['is_isolation']),
         ]
@@ -363,9 +589,91 @@ class Admission(models.Model):
         verbose_name_plural = "Admissions"
         indexes = [
             models.Index(fields=['admission_time']),
-            models.Index(fields=['discharge_time']),
-            models.Index(fields=['department']),
+            # Range filters on discharge_time imply it is not null; leaving
+            # the NULLs out keeps current admissions on the index below.
+            models.Index(
+                fields=['discharge_time'],
+                condition=models.Q(discharge_time__isnull=False),
+                name='admission_discharged_idx',
+            ),
+            models.Index(fields=['department', '-admission_time'], name='admission_department_time_idx'),
+            # Current admissions: only the patients still in a bed are indexed.
+            models.Index(
+                fields=['-admission_time'],
+                condition=models.Q(discharge_time__isnull=True),
+                name='admission_current_idx',
+            ),
+        ]
+        constraints = [
+            # The stay interval of the census index (migration 0008) cannot end
+            # before it starts: tstzrange raises on such a row.
+            models.CheckConstraint(
+                check=models.Q(discharge_time__isnull=True) | models.Q(discharge_time__gte=models.F('admission_time')),
+                name='admission_discharge_after_admission',
+            ),
         ]
 
     def __str__(self):
-        return f"Admission #{self.id} for Visit #{self.visit_id}"
\ No newline at end of file
+        return f"Admission #{self.id} for Visit #{self.visit_id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if 'department' in loaded and 'discharge_time' in loaded:
+            instance._loaded_counts = (loaded['department'], loaded['discharge_time'] is None)
+        return instance
+
+    def counter_contribution(self):
+        """(department, currently admitted) as counted by DepartmentAdmissionCounter."""
+        return self.department, self.discharge_time is None
+
+    def save(self, *args, **kwargs):
+        previous = None if self._state.adding else getattr(self, '_loaded_counts', None)
+        current = self.counter_contribution()
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            if previous is None and self.pk is not None:
+                # Not loaded with both fields (e.g. built with a known pk, or
+                # fetched with only()): count the row as it is stored, if it is.
+                stored = (
+                    type(self)._base_manager.using(using).select_for_update()
+                    .filter(pk=self.pk).values_list('department', 'discharge_time').first()
+                )
+                if stored is not None:
+                    previous = (stored[0], stored[1] is None)
+            super().save(*args, **kwargs)
+            if previous != current:
+                if previous is not None:
+                    DepartmentAdmissionCounter.bump(previous[0], total=-1, current=-int(previous[1]))
+                DepartmentAdmissionCounter.bump(current[0], total=1, current=int(current[1]))
+        self._loaded_counts = current
+
+class DepartmentAdmissionCounter(models.Model):
+    """
+    Total and currently admitted patients per department, kept up to date by
+    Admission.save() and the post_delete handler in signals.py. Rebuilt and
+    checked by `manage.py rebuild_department_counters`.
+    """
+    department = models.CharField(max_length=100, unique=True)
+    total = models.IntegerField(default=0, help_text="Admissions to the department")
+    current = models.IntegerField(default=0, help_text="Admissions not yet discharged")
+
+    class Meta:
+        ordering = ['department']
+        verbose_name = "Department Admission Counter"
+        verbose_name_plural = "Department Admission Counters"
+
+    def __str__(self):
+        return f"{self.department}: {self.current}/{self.total}"
+
+    @classmethod
+    def bump(cls, department, total=0, current=0):
+        rows = cls.objects.filter(department=department)
+        if rows.update(total=models.F('total') + total, current=models.F('current') + current):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(department=department, total=total, current=current)
+        except IntegrityError:
+            rows.update(total=models.F('total') + total, current=models.F('current') + current)
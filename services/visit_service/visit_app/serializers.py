@@ -1,16 +1,37 @@
+from collections import Counter
+from django.utils import timezone
 from rest_framework import serializers
+import functools
 import requests
 import logging
 import os
 from .models import (
-    EmergencyVisit, VitalSign, Treatment, Diagnosis, Prescription, Bed, Admission
+    EmergencyVisit, VitalSign, Treatment, Diagnosis, DiagnosisDailyCount,
+    Prescription, Bed, Admission
 )
+from .metrics import record_cache
+from .timing import upstream_call
 
 logger = logging.getLogger(__name__)
 
 STAFF_SERVICE_BASE_URL = os.getenv("STAFF_SERVICE_URL", "http://staff_service:8000/api/")
 PATIENT_SERVICE_BASE_URL = os.getenv("PATIENT_SERVICE_URL", "http://patient_service:8000/api/")
 AUTH_SERVICE_BASE_URL = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8000/api/auth/")
+INVENTORY_SERVICE_BASE_URL = os.getenv("INVENTORY_SERVICE_URL", "http://inventory_service:8001/api/inventory/")
+
+def _upstream_name(url):
+    """Service a URL belongs to, as labelled in the request timings."""
+    base_urls = {
+        PATIENT_SERVICE_BASE_URL: 'patient',
+        STAFF_SERVICE_BASE_URL: 'staff',
+        AUTH_SERVICE_BASE_URL: 'auth',
+        INVENTORY_SERVICE_BASE_URL: 'inventory',
+    }
+    # Longest prefix first, in case the services share a host.
+    for base_url in sorted(base_urls, key=len, reverse=True):
+        if url.startswith(base_url):
+            return base_urls[base_url]
+    return 'other'
 
 def _get_auth_header():
     return {}
@@ -21,6 +42,41 @@ def _get_auth_header_from_request(request=None):
     logger.warning("Nessun oggetto request o token di autenticazione trovato nel contesto della richiesta per la chiamata inter-servizio. Effettuando una richiesta non autenticata.")
     return {}
 
+def _request_cache(request, name):
+    """Dict stored on the request, shared by every lookup made while serving it."""
+    if request is None:
+        return {}
+    cache = getattr(request, name, None)
+    if cache is None:
+        cache = {}
+        setattr(request, name, cache)
+    return cache
+
+def _memoize_per_request(validate):
+    """
+    Cache the outcome of a remote validation on the request, so a list payload
+    that references the same user or entity many times triggers a single call.
+    The wrapped validator's last positional argument is the error field name.
+    """
+    @functools.wraps(validate)
+    def wrapper(*args, request=None):
+        if request is None:
+            return validate(*args, request=request)
+        *key, field_name = args
+        cache = _request_cache(request, '_remote_validation_cache')
+        cache_key = (validate.__name__, *key)
+        record_cache('remote_validation', cache_key in cache)
+        if cache_key not in cache:
+            try:
+                cache[cache_key] = (validate(*args, request=request), None)
+            except serializers.ValidationError as e:
+                cache[cache_key] = (None, e.detail[field_name])
+        value, error = cache[cache_key]
+        if error is not None:
+            raise serializers.ValidationError({field_name: error})
+        return value
+    return wrapper
+
 def _make_authenticated_request(url, entity_type, entity_id, field_name_for_error="entity", request=None):
     auth_header = _get_auth_header_from_request(request)
     if url.startswith((PATIENT_SERVICE_BASE_URL, STAFF_SERVICE_BASE_URL, AUTH_SERVICE_BASE_URL)):
@@ -31,10 +87,19 @@ def _make_authenticated_request(url, entity_type, entity_id, field_name_for_erro
 
     full_url = f"{url.rstrip('/')}/{entity_type.strip('/')}/{entity_id}/"
 
+    # Successful lookups are reused for the rest of the request, so a list of
+    # records sharing a patient or staff member fetches their details once.
+    cache = _request_cache(request, '_remote_detail_cache')
+    record_cache('remote_detail', full_url in cache)
+    if full_url in cache:
+        return cache[full_url]
+
     try:
-        response = requests.get(full_url, headers=auth_header, timeout=3)
+        with upstream_call(_upstream_name(url), full_url) as trace_headers:
+            response = requests.get(full_url, headers={**auth_header, **trace_headers}, timeout=3)
         response.raise_for_status()
-        return response.json()
+        cache[full_url] = response.json()
+        return cache[full_url]
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
             logger.warning(f"{entity_type.capitalize()} with ID {entity_id} not found at {full_url}.")
@@ -45,6 +110,7 @@ def _make_authenticated_request(url, entity_type, entity_id, field_name_for_erro
         logger.error(f"Request error while retrieving {entity_type} {entity_id} from {full_url}: {e}")
         return {"id": entity_id, "error": f"Communication error while retrieving details for {field_name_for_error}."}
 
+@_memoize_per_request
 def _validate_user_exists_in_auth_service(user_id, field_name_for_error, request=None):
     auth_header = _get_auth_header_from_request(request)
     auth_header['X-Forwarded-Host'] = 'localhost'
@@ -55,7 +121,8 @@ def _validate_user_exists_in_auth_service(user_id, field_name_for_error, request
     user_detail_url = f"{AUTH_SERVICE_BASE_URL.rstrip('/')}/users/{user_id}/"
 
     try:
-        response = requests.get(user_detail_url, headers=auth_header, timeout=3)
+        with upstream_call('auth', user_detail_url) as trace_headers:
+            response = requests.get(user_detail_url, headers={**auth_header, **trace_headers}, timeout=3)
         response.raise_for_status()
     except requests.exceptions.HTTPError as e:
         error_detail_msg = ""
@@ -83,6 +150,7 @@ def _validate_user_exists_in_auth_service(user_id, field_name_for_error, request
         })
     return user_id
 
+@_memoize_per_request
 def _validate_external_entity(url, entity_type, entity_id, field_name, request=None):
     auth_header = _get_auth_header_from_request(request)
     if url.startswith((PATIENT_SERVICE_BASE_URL, STAFF_SERVICE_BASE_URL, AUTH_SERVICE_BASE_URL)):
@@ -94,7 +162,8 @@ def _validate_external_entity(url, entity_type, entity_id, field_name, request=N
     full_url = f"{url.rstrip('/')}/{entity_type.strip('/')}/{entity_id}/"
 
     try:
-        response = requests.get(full_url, headers=auth_header, timeout=2)
+        with upstream_call(_upstream_name(url), full_url) as trace_headers:
+            response = requests.get(full_url, headers={**auth_header, **trace_headers}, timeout=2)
         response.raise_for_status()
     except requests.exceptions.HTTPError as e:
         error_detail = ""
@@ -116,6 +185,136 @@ def _validate_external_entity(url, entity_type, entity_id, field_name, request=N
         })
     return entity_id
 
+def _decrement_inventory_stock(lines, request=None):
+    auth_header = _get_auth_header_from_request(request)
+    auth_header['X-Forwarded-Host'] = 'localhost'
+
+    url = f"{INVENTORY_SERVICE_BASE_URL.rstrip('/')}/inventoryitems/decrement_stock/"
+
+    try:
+        with upstream_call('inventory', url) as trace_headers:
+            response = requests.post(url, json={'items': lines}, headers={**auth_header, **trace_headers}, timeout=5)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.HTTPError as e:
+        try:
+            error_detail = e.response.json()
+        except ValueError:
+            error_detail = e.response.text[:250]
+        logger.error(f"Errore HTTP {e.response.status_code} dal servizio di inventario ({url}): {error_detail}")
+        raise serializers.ValidationError({
+            'inventory': f"Errore ({e.response.status_code}) durante l'aggiornamento delle scorte. Dettaglio dal servizio: {error_detail}"
+        })
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Errore di richiesta al servizio di inventario ({url}): {str(e)}")
+        raise serializers.ValidationError({
+            'inventory': f"Errore di comunicazione durante l'aggiornamento delle scorte. Dettaglio: {str(e)}"
+        })
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Foreign key field that resolves its pk from the objects BulkListSerializer
+    fetched once for the whole batch, and only queries on its own for a pk
+    that was not among them (e.g. to report it as missing).
+    """
+    prefetched = None
+
+    def to_internal_value(self, data):
+        if self.prefetched is not None and not isinstance(data, bool):
+            try:
+                obj = self.prefetched.get(int(data))
+            except (TypeError, ValueError):
+                obj = None
+            if obj is not None:
+                return obj
+        return super().to_internal_value(data)
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer for the bulk POST/PATCH of visit sub-resources: every item
+    is validated first, then all of them are written with a single
+    bulk_create or bulk_update. For updates `instance` is the list of objects
+    in the same order as the payload, which carries their `id`. The objects
+    the items' foreign keys point to are fetched with one query per field.
+    """
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        fields = [
+            field for field in self.child.fields.values()
+            if isinstance(field, BatchPrimaryKeyRelatedField) and not field.read_only
+        ]
+        if isinstance(data, list):
+            for field in fields:
+                pks = set()
+                for item in data:
+                    value = item.get(field.field_name) if isinstance(item, dict) else None
+                    if value is not None and not isinstance(value, bool):
+                        try:
+                            pks.add(int(value))
+                        except (TypeError, ValueError):
+                            pass
+                field.prefetched = field.get_queryset().in_bulk(pks) if pks else {}
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in fields:
+                field.prefetched = None
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            if not hasattr(self, '_instances_by_id'):
+                self._instances_by_id = {obj.pk: obj for obj in self.instance}
+            self.child.instance = self._instances_by_id.get(data.get('id')) if isinstance(data, dict) else None
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data], batch_size=self.batch_size
+        )
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for obj, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+        if fields:
+            self.child.Meta.model.objects.bulk_update(instances, sorted(fields), batch_size=self.batch_size)
+        return instances
+
+class DiagnosisBulkListSerializer(BulkListSerializer):
+    """bulk_create/bulk_update skip Diagnosis.save(), so the daily counters are moved here."""
+
+    def create(self, validated_data):
+        diagnoses = super().create(validated_data)
+        counts = Counter(
+            (timezone.localdate(diagnosis.diagnosed_at), DiagnosisDailyCount.normalize_code(diagnosis.code))
+            for diagnosis in diagnoses
+        )
+        for (day, code), count in counts.items():
+            DiagnosisDailyCount.bump(day, code, count)
+        for diagnosis in diagnoses:
+            diagnosis._loaded_code = diagnosis.code
+        return diagnoses
+
+    def update(self, instances, validated_data):
+        previous_codes = [getattr(diagnosis, '_loaded_code', None) for diagnosis in instances]
+        diagnoses = super().update(instances, validated_data)
+        counts = Counter()
+        for diagnosis, previous_code in zip(diagnoses, previous_codes):
+            if previous_code is not None and previous_code != diagnosis.code:
+                day = timezone.localdate(diagnosis.diagnosed_at)
+                counts[(day, DiagnosisDailyCount.normalize_code(previous_code))] -= 1
+                counts[(day, DiagnosisDailyCount.normalize_code(diagnosis.code))] += 1
+            diagnosis._loaded_code = diagnosis.code
+        for (day, code), count in counts.items():
+            if count:
+                DiagnosisDailyCount.bump(day, code, count)
+        return diagnoses
+
 class EmergencyVisitSerializer(serializers.ModelSerializer):
     patient_id = serializers.IntegerField()
     attending_physician_id = serializers.IntegerField(allow_null=True, required=False)
@@ -171,12 +370,14 @@ class EmergencyVisitSerializer(serializers.ModelSerializer):
         )
 
 class VitalSignSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
     visit_id = serializers.IntegerField(source='visit.id', read_only=True, required=False)
     recorded_by_id = serializers.IntegerField(allow_null=True, required=False)
     recorded_by_details = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = VitalSign
+        list_serializer_class = BulkListSerializer
         fields = [
             'id', 'visit', 'visit_id',
             'recorded_by_id', 'recorded_at',
@@ -203,12 +404,14 @@ class VitalSignSerializer(serializers.ModelSerializer):
         )
 
 class TreatmentSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
     visit_id = serializers.IntegerField(source='visit.id', read_only=True, required=False)
     administered_by_id = serializers.IntegerField(allow_null=True, required=False)
     administered_by_details = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Treatment
+        list_serializer_class = BulkListSerializer
         fields = [
             'id', 'visit', 'visit_id', 'treatment_type', 'name', 'description',
             'administered_by_id', 'administered_at', 'dosage',
@@ -232,12 +435,14 @@ class TreatmentSerializer(serializers.ModelSerializer):
         )
 
 class DiagnosisSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
     visit_id = serializers.IntegerField(source='visit.id', read_only=True, required=False)
     diagnosed_by_id = serializers.IntegerField(allow_null=True, required=False)
     diagnosed_by_details = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Diagnosis
+        list_serializer_class = DiagnosisBulkListSerializer
         fields = [
             'id', 'visit', 'visit_id', 'code', 'description', 'diagnosed_by_id',
             'diagnosed_at', 'is_primary', 'notes', 'diagnosed_by_details'
@@ -260,18 +465,20 @@ class DiagnosisSerializer(serializers.ModelSerializer):
         )
 
 class PrescriptionSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
     visit_id = serializers.IntegerField(source='visit.id', read_only=True, required=False)
     prescribed_by_id = serializers.IntegerField(allow_null=True, required=False)
     prescribed_by_details = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Prescription
+        list_serializer_class = BulkListSerializer
         fields = [
             'id', 'visit', 'visit_id', 'medication', 'dosage', 'frequency', 'duration',
             'prescribed_by_id', 'prescribed_at', 'instructions', 'is_dispensed',
-            'refills', 'prescribed_by_details'
+            'refills', 'claimed_by_id', 'claimed_until', 'prescribed_by_details'
         ]
-        read_only_fields = ['prescribed_at', 'visit_id']
+        read_only_fields = ['prescribed_at', 'visit_id', 'claimed_by_id', 'claimed_until']
         extra_kwargs = {
             'visit': {'queryset': EmergencyVisit.objects.all(), 'write_only': False}
         }
@@ -288,6 +495,18 @@ class PrescriptionSerializer(serializers.ModelSerializer):
             value, "prescribed_by_id", request=request
         )
 
+class PrescriptionDispenseSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    inventory_item_id = serializers.IntegerField(required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+class DischargeWorkflowSerializer(serializers.Serializer):
+    discharge_diagnosis = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    discharge_instructions = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    dispense_prescriptions = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
 class BedSerializer(serializers.ModelSerializer):
     patient_id = serializers.IntegerField(allow_null=True, required=False)
     doctor_id = serializers.IntegerField(allow_null=True, required=False)
@@ -372,3 +591,67 @@ class AdmissionSerializer(serializers.ModelSerializer):
         return _validate_user_exists_in_auth_service(
             value, "admitted_by_id", request=request
         )
+
+    def validate(self, attrs):
+        discharge_time = attrs.get('discharge_time')
+        # admission_time is set on creation, so a new admission starts now.
+        admission_time = self.instance.admission_time if self.instance else timezone.now()
+        if discharge_time is not None and discharge_time < admission_time:
+            raise serializers.ValidationError({
+                'discharge_time': "Discharge time cannot be before the admission time."
+            })
+        return attrs
+
+def _without_remote_details(fields):
+    return [field for field in fields if not field.endswith('_details') and field not in ('visit', 'visit_id')]
+
+class TimelineVitalSignSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VitalSign
+        fields = _without_remote_details(VitalSignSerializer.Meta.fields)
+
+class TimelineTreatmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Treatment
+        fields = _without_remote_details(TreatmentSerializer.Meta.fields)
+
+class TimelineDiagnosisSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Diagnosis
+        fields = _without_remote_details(DiagnosisSerializer.Meta.fields)
+
+class TimelinePrescriptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Prescription
+        fields = _without_remote_details(PrescriptionSerializer.Meta.fields)
+
+class TimelineAdmissionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Admission
+        fields = _without_remote_details(AdmissionSerializer.Meta.fields)
+
+class TimelineVisitSerializer(serializers.ModelSerializer):
+    """
+    A visit with its clinical records for the patient timeline. Only local
+    data is serialized: the patient details are fetched once for the whole
+    timeline and staff members are referenced by ID.
+    """
+    vital_signs = TimelineVitalSignSerializer(many=True, read_only=True)
+    treatments = TimelineTreatmentSerializer(many=True, read_only=True)
+    diagnoses = TimelineDiagnosisSerializer(many=True, read_only=True)
+    prescriptions = TimelinePrescriptionSerializer(many=True, read_only=True)
+    admission = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = EmergencyVisit
+        fields = [
+            field for field in EmergencyVisitSerializer.Meta.fields
+            if not field.endswith('_details') and field != 'patient_id'
+        ] + ['admission', 'vital_signs', 'treatments', 'diagnoses', 'prescriptions']
+
+    def get_admission(self, obj):
+        try:
+            admission = obj.admission
+        except Admission.DoesNotExist:
+            return None
+        return TimelineAdmissionSerializer(admission, context=self.context).data
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import (
+    Admission, ArrivalHourlyCount, DepartmentAdmissionCounter, Diagnosis,
+    DiagnosisDailyCount, EmergencyVisit
+)
+
+
+@receiver(post_delete, sender=Diagnosis)
+def decrement_diagnosis_daily_count(sender, instance, **kwargs):
+    # Runs inside the deletion transaction, also for cascades from EmergencyVisit.
+    code = getattr(instance, '_loaded_code', None) or instance.code
+    DiagnosisDailyCount.bump(timezone.localdate(instance.diagnosed_at), code, -1)
+
+
+@receiver(pre_delete, sender=Admission)
+def load_department_admission_counts(sender, instance, using, **kwargs):
+    # Deferred fields can no longer be loaded once the row is gone.
+    if getattr(instance, '_loaded_counts', None) is None:
+        stored = (
+            sender._base_manager.using(using).filter(pk=instance.pk)
+            .values_list('department', 'discharge_time').first()
+        )
+        if stored is not None:
+            instance._loaded_counts = (stored[0], stored[1] is None)
+
+
+@receiver(post_delete, sender=Admission)
+def decrement_department_admission_counter(sender, instance, **kwargs):
+    department, admitted = getattr(instance, '_loaded_counts', None) or instance.counter_contribution()
+    DepartmentAdmissionCounter.bump(department, total=-1, current=-int(admitted))
+
+
+@receiver(post_delete, sender=EmergencyVisit)
+def decrement_arrival_hourly_count(sender, instance, **kwargs):
+    ArrivalHourlyCount.bump(instance.arrival_time, -1)
@@ -0,0 +1,131 @@
+import gzip
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('icd10', 'medication', 'procedure')
+
+# (first category, last category, chapter, title) of the ICD-10 chapters.
+ICD10_CHAPTERS = [
+    ('A00', 'B99', 'I', 'Certain infectious and parasitic diseases'),
+    ('C00', 'D48', 'II', 'Neoplasms'),
+    ('D50', 'D89', 'III', 'Diseases of the blood and blood-forming organs'),
+    ('E00', 'E90', 'IV', 'Endocrine, nutritional and metabolic diseases'),
+    ('F00', 'F99', 'V', 'Mental and behavioural disorders'),
+    ('G00', 'G99', 'VI', 'Diseases of the nervous system'),
+    ('H00', 'H59', 'VII', 'Diseases of the eye and adnexa'),
+    ('H60', 'H95', 'VIII', 'Diseases of the ear and mastoid process'),
+    ('I00', 'I99', 'IX', 'Diseases of the circulatory system'),
+    ('J00', 'J99', 'X', 'Diseases of the respiratory system'),
+    ('K00', 'K93', 'XI', 'Diseases of the digestive system'),
+    ('L00', 'L99', 'XII', 'Diseases of the skin and subcutaneous tissue'),
+    ('M00', 'M99', 'XIII', 'Diseases of the musculoskeletal system and connective tissue'),
+    ('N00', 'N99', 'XIV', 'Diseases of the genitourinary system'),
+    ('O00', 'O99', 'XV', 'Pregnancy, childbirth and the puerperium'),
+    ('P00', 'P96', 'XVI', 'Certain conditions originating in the perinatal period'),
+    ('Q00', 'Q99', 'XVII', 'Congenital malformations, deformations and chromosomal abnormalities'),
+    ('R00', 'R99', 'XVIII', 'Symptoms, signs and abnormal clinical and laboratory findings'),
+    ('S00', 'T98', 'XIX', 'Injury, poisoning and certain other consequences of external causes'),
+    ('U00', 'U99', 'XXII', 'Codes for special purposes'),
+    ('V01', 'Y98', 'XX', 'External causes of morbidity and mortality'),
+    ('Z00', 'Z99', 'XXI', 'Factors influencing health status and contact with health services'),
+]
+
+
+def icd10_chapter(code):
+    """Return (chapter, title) for an ICD-10 code, or (None, None) if unknown."""
+    category = code.strip().upper()[:3]
+    for first, last, chapter, title in ICD10_CHAPTERS:
+        if first <= category <= last:
+            return chapter, title
+    return None, None
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower().replace('.', ''))
+
+
+class TerminologyCatalog:
+    """
+    In-memory prefix index over a terminology file.
+
+    The file is a (optionally gzip-compressed) tab-separated list of
+    `kind<TAB>code<TAB>label` lines. Every code and every word of a label is
+    an index key; keys are kept in one sorted list per kind, so a prefix
+    lookup is a bisect plus a short forward scan.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._indexes = {}
+        for kind in (None,) + KINDS:
+            keys = []
+            for entry_id, (entry_kind, code, label) in enumerate(entries):
+                if kind is not None and entry_kind != kind:
+                    continue
+                words = {_normalize(code)} | set(_normalize(label).split())
+                keys.extend((word, entry_id) for word in words if word)
+            keys.sort()
+            self._indexes[kind] = ([key for key, _ in keys], [entry_id for _, entry_id in keys])
+
+    @classmethod
+    def from_file(cls, path):
+        path = str(path)
+        opener = gzip.open if path.endswith('.gz') else open
+        entries = []
+        with opener(path, 'rt', encoding='utf-8') as catalog_file:
+            for line in catalog_file:
+                line = line.rstrip('\n')
+                if not line or line.startswith('#'):
+                    continue
+                kind, code, label = line.split('\t', 2)
+                entries.append((kind, code, label))
+        return cls(entries)
+
+    def autocomplete(self, query, kind=None, limit=10):
+        tokens = _normalize(query).split()
+        if not tokens:
+            return []
+        keys, entry_ids = self._indexes[kind]
+        first, rest = tokens[0], tokens[1:]
+
+        results = []
+        seen = set()
+        position = bisect_left(keys, first)
+        while position < len(keys) and keys[position].startswith(first) and len(results) < limit:
+            entry_id = entry_ids[position]
+            position += 1
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            entry_kind, code, label = self.entries[entry_id]
+            if rest:
+                words = _normalize(f"{code} {label}").split()
+                if not all(any(word.startswith(token) for word in words) for token in rest):
+                    continue
+            results.append({'kind': entry_kind, 'code': code, 'label': label})
+        return results
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                path = settings.TERMINOLOGY_CATALOG_PATH
+                try:
+                    _catalog = TerminologyCatalog.from_file(path)
+                except OSError as e:
+                    logger.error(f"Could not load terminology catalog from {path}: {e}")
+                    _catalog = TerminologyCatalog([])
+    return _catalog
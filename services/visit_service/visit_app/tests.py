@@ -1,3 +1,740 @@
-from django.test import TestCase
+import io
+import random
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from .filters import FullTextSearchFilter
+from .models import (
+    Admission, ArrivalHourlyCount, Bed, Diagnosis, DiagnosisDailyCount, EmergencyVisit, Prescription, Treatment,
+    VitalSign, VitalSignArchive,
+)
 
-# Create your tests here.
+DEPARTMENTS = ['Cardiology', 'Internal Medicine', 'Neurology', 'Orthopedics', 'Pediatrics', 'Surgery']
+
+
+class FilterIndexPlannerTests(TestCase):
+    """
+    The partial and composite indexes of migration 0009 must be picked by
+    the planner for the queries the viewsets issue. The dataset mimics a
+    few months of ER activity: most visits discharged, ~15% admitted and
+    only the latest arrivals still active, with fresh planner statistics.
+    """
+    VISITS = 12000
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        now = timezone.now()
+
+        visits = EmergencyVisit.objects.bulk_create([
+            EmergencyVisit(
+                patient_id=rng.randint(1, 4000),
+                triage_level=rng.choices([1, 2, 3, 4, 5], weights=[3, 12, 40, 33, 12])[0],
+                chief_complaint="Synthetic complaint",
+                is_admitted=rng.random() < 0.15,
+                attending_physician_id=rng.randint(1, 60),
+                triage_nurse_id=rng.randint(61, 120),
+            )
+            for _ in range(cls.VISITS)
+        ], batch_size=1000)
+        # arrival_time is auto_now_add, so the timeline is spread afterwards.
+        for i, visit in enumerate(visits):
+            visit.arrival_time = now - timedelta(minutes=(cls.VISITS - i) * 15)
+            # Visits of the last ~10 hours are still in the ER.
+            if i < cls.VISITS - 40:
+                visit.discharge_time = visit.arrival_time + timedelta(minutes=rng.randint(30, 600))
+        EmergencyVisit.objects.bulk_update(visits, ['arrival_time', 'discharge_time'], batch_size=1000)
+
+        beds = Bed.objects.bulk_create([
+            Bed(bed_number=f"B{i:03d}", location=DEPARTMENTS[i % len(DEPARTMENTS)],
+                status=rng.choice(['AVAIL', 'OCCUP', 'OCCUP', 'MAINT']))
+            for i in range(120)
+        ])
+        admitted = [visit for visit in visits if visit.is_admitted]
+        admissions = Admission.objects.bulk_create([
+            Admission(
+                visit=visit,
+                bed=rng.choice(beds),
+                admitted_by_id=visit.attending_physician_id,
+                admitting_diagnosis="Synthetic diagnosis",
+                department=rng.choice(DEPARTMENTS),
+            )
+            for visit in admitted
+        ], batch_size=1000)
+        for i, admission in enumerate(admissions):
+            admission.admission_time = admission.visit.arrival_time + timedelta(hours=2)
+            if i < len(admissions) - 50:
+                admission.discharge_time = admission.admission_time + timedelta(days=rng.randint(1, 10))
+        Admission.objects.bulk_update(admissions, ['admission_time', 'discharge_time'], batch_size=1000)
+
+        treatments, diagnoses, prescriptions = [], [], []
+        for visit in visits:
+            for _ in range(rng.randint(1, 3)):
+                treatments.append(Treatment(
+                    visit=visit, treatment_type=rng.choice(['MED', 'PROC', 'TEST', 'OTHER']), name="Synthetic"
+                ))
+            diagnoses.append(Diagnosis(visit=visit, code=f"R{rng.randint(0, 99):02d}", description="Synthetic"))
+            if rng.random() < 0.5:
+                prescriptions.append(Prescription(
+                    visit=visit, medication="Synthetic", dosage="1", frequency="1/d", duration="1d", is_dispensed=True
+                ))
+        Treatment.objects.bulk_create(treatments, batch_size=1000)
+        Diagnosis.objects.bulk_create(diagnoses, batch_size=1000)
+        Prescription.objects.bulk_create(prescriptions, batch_size=1000)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"{index_name} not used:\n{plan}")
+
+    def test_active_visits(self):
+        self.assertUsesIndex(
+            EmergencyVisit.objects.filter(discharge_time__isnull=True).order_by('-arrival_time')[:20],
+            'visit_active_idx',
+        )
+
+    def test_visit_filters_with_arrival_ordering(self):
+        visits = EmergencyVisit.objects.order_by('-arrival_time')
+        self.assertUsesIndex(visits.filter(triage_level=1)[:20], 'visit_triage_arrival_idx')
+        self.assertUsesIndex(visits.filter(is_admitted=True)[:20], 'visit_admitted_idx')
+        self.assertUsesIndex(visits.filter(attending_physician_id=7)[:20], 'visit_physician_arrival_idx')
+        self.assertUsesIndex(visits.filter(patient_id=42)[:20], 'visit_patient_arrival_idx')
+
+    def test_current_admissions(self):
+        self.assertUsesIndex(
+            Admission.objects.filter(discharge_time__isnull=True).order_by('-admission_time')[:20],
+            'admission_current_idx',
+        )
+        self.assertUsesIndex(
+            Admission.objects.filter(department='Neurology').order_by('-admission_time')[:20],
+            'admission_department_time_idx',
+        )
+        self.assertUsesIndex(
+            Admission.objects.filter(discharge_time__gte=timezone.now() - timedelta(days=1)).order_by('-discharge_time'),
+            'admission_discharged_idx',
+        )
+
+    def test_visit_children(self):
+        visit_id = EmergencyVisit.objects.order_by('id').values_list('id', flat=True)[500]
+        self.assertUsesIndex(
+            Treatment.objects.filter(visit_id=visit_id).order_by('-administered_at'), 'treatment_visit_time_idx'
+        )
+        self.assertUsesIndex(
+            Treatment.objects.filter(treatment_type='PROC').order_by('-administered_at')[:20], 'treatment_type_time_idx'
+        )
+        self.assertUsesIndex(
+            Diagnosis.objects.filter(visit_id=visit_id).order_by('-diagnosed_at'), 'diagnosis_visit_time_idx'
+        )
+        self.assertUsesIndex(
+            Prescription.objects.filter(visit_id=visit_id).order_by('-prescribed_at'), 'prescription_visit_time_idx'
+        )
+
+    def test_available_beds(self):
+        self.assertUsesIndex(Bed.objects.filter(status='AVAIL').order_by('bed_number'), 'bed_status_number_idx')
+
+
+class APITestCase(TestCase):
+    """Requests made as an authenticated user, without the auth service."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User(id=1, username='tester'), token='test-token')
+
+
+class BulkPartialUpdateTests(APITestCase):
+    url = '/api/visit/vital-signs/'
+
+    def setUp(self):
+        super().setUp()
+        self.visits = EmergencyVisit.objects.bulk_create([
+            EmergencyVisit(patient_id=i, triage_level=3, chief_complaint="Synthetic complaint") for i in range(10)
+        ])
+        self.vitals = VitalSign.objects.bulk_create([VitalSign(visit=visit, heart_rate=80) for visit in self.visits])
+
+    def test_non_numeric_ids_are_rejected(self):
+        response = self.client.patch(
+            self.url, [{'id': 'abc', 'heart_rate': 90}, {'id': self.vitals[0].id, 'heart_rate': 90}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['invalid'], ['abc'])
+
+    def test_numeric_string_ids_are_found(self):
+        response = self.client.patch(self.url, [{'id': str(self.vitals[0].id), 'heart_rate': 95}], format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.vitals[0].refresh_from_db()
+        self.assertEqual(self.vitals[0].heart_rate, 95)
+
+    def test_same_id_as_int_and_string_is_a_duplicate(self):
+        pk = self.vitals[0].id
+        response = self.client.patch(self.url, [{'id': pk}, {'id': str(pk)}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_visits_are_fetched_once_per_batch(self):
+        def queries(count):
+            payload = [
+                {'id': vital.id, 'visit': self.visits[-1 - i].id} for i, vital in enumerate(self.vitals[:count])
+            ]
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.patch(self.url, payload, format='json')
+            self.assertEqual(response.status_code, 200, response.data)
+            return len(captured)
+
+        self.assertEqual(queries(2), queries(10))
+        self.assertEqual(VitalSign.objects.get(id=self.vitals[0].id).visit_id, self.visits[-1].id)
+
+    def test_unknown_visit_is_reported(self):
+        response = self.client.patch(self.url, [{'id': self.vitals[0].id, 'visit': 999999}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class DispenseBatchTests(APITestCase):
+    url = '/api/visit/prescriptions/dispense_batch/'
+
+    def setUp(self):
+        super().setUp()
+        visit = EmergencyVisit.objects.create(patient_id=1, triage_level=3, chief_complaint="Synthetic complaint")
+        self.prescriptions = Prescription.objects.bulk_create([
+            Prescription(visit=visit, medication="Synthetic", dosage="1", frequency="1/d", duration="1d")
+            for _ in range(3)
+        ])
+        self.payload = {'prescriptions': [
+            {'id': prescription.id, 'inventory_item_id': 4, 'quantity': 2} for prescription in self.prescriptions
+        ]}
+
+    def test_list_body_is_rejected(self):
+        response = self.client.post(self.url, [{'id': self.prescriptions[0].id}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_stock_is_decremented_outside_the_transaction(self):
+        depth = len(connection.savepoint_ids)
+
+        def decrement(lines, request=None):
+            self.assertEqual(len(connection.savepoint_ids), depth)
+            self.assertFalse(Prescription.objects.filter(is_dispensed=True).exists())
+            return [{'id': 4, 'quantity': 4}]
+
+        with mock.patch('visit_app.views._decrement_inventory_stock', side_effect=decrement) as decrement_stock:
+            response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        decrement_stock.assert_called_once()
+        self.assertEqual(decrement_stock.call_args.args[0], [{'id': 4, 'quantity': 2}] * 3)
+        self.assertEqual(
+            set(Prescription.objects.values_list('is_dispensed', 'claimed_by_id')), {(True, None)}
+        )
+
+    def test_rejected_decrement_releases_the_prescriptions(self):
+        error = ValidationError({'inventory': 'Insufficient stock'})
+        with mock.patch('visit_app.views._decrement_inventory_stock', side_effect=error):
+            response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(Prescription.objects.values_list('is_dispensed', 'claimed_by_id')), {(False, None)}
+        )
+
+    def test_reservations_lost_during_the_decrement_are_reported(self):
+        lost = self.prescriptions[0].id
+
+        def decrement(lines, request=None):
+            # The lease expires meanwhile and another pharmacist claims the row.
+            Prescription.objects.filter(id=lost).update(
+                claimed_by_id=2, claimed_until=timezone.now() + timedelta(minutes=5)
+            )
+            return [{'id': 4, 'quantity': 4}]
+
+        with mock.patch('visit_app.views._decrement_inventory_stock', side_effect=decrement), \
+                self.assertLogs('visit_app.views', 'ERROR'):
+            response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['lost'], [lost])
+        self.assertEqual(response.data['dispensed'], sorted(p.id for p in self.prescriptions[1:]))
+        self.assertEqual(
+            set(Prescription.objects.filter(id=lost).values_list('is_dispensed', 'claimed_by_id')), {(False, 2)}
+        )
+
+    def test_prescriptions_claimed_by_others_are_not_dispensed(self):
+        Prescription.objects.filter(id=self.prescriptions[0].id).update(
+            claimed_by_id=2, claimed_until=timezone.now() + timedelta(minutes=5)
+        )
+        with mock.patch('visit_app.views._decrement_inventory_stock') as decrement_stock:
+            response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['claimed'], [self.prescriptions[0].id])
+        decrement_stock.assert_not_called()
+
+
+class ArchivedVitalSignListTests(APITestCase):
+    url = '/api/visit/vital-signs/'
+
+    def setUp(self):
+        super().setUp()
+        self.visit, other = EmergencyVisit.objects.bulk_create([
+            EmergencyVisit(patient_id=i, triage_level=3, chief_complaint="Synthetic complaint") for i in range(2)
+        ])
+        now = timezone.now()
+        readings = VitalSign.objects.bulk_create([
+            VitalSign(visit=visit, heart_rate=60 + i) for visit in (self.visit, other) for i in range(12)
+        ])
+        # Every third hour of each visit is live, the rest is archived in
+        # batches of four readings that interleave with the live ones.
+        for i, reading in enumerate(readings):
+            reading.recorded_at = now - timedelta(hours=i % 12)
+        VitalSign.objects.bulk_update(readings, ['recorded_at'])
+        self.recorded_at = [reading.recorded_at for reading in readings]
+        archived = [reading for i, reading in enumerate(readings) if i % 3]
+        VitalSignArchive.objects.bulk_create([
+            VitalSignArchive.from_readings(batch[0].visit, batch)
+            for batch in (archived[i:i + 4] for i in range(0, len(archived), 4))
+        ])
+        VitalSign.objects.filter(id__in=[reading.id for reading in archived]).delete()
+
+    def test_visit_or_date_range_is_required(self):
+        self.assertEqual(self.client.get(self.url, {'include_archived': 'true'}).status_code, 400)
+        response = self.client.get(
+            self.url, {'include_archived': 'true', 'from': '2024-01-01', 'to': '2024-06-01'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_live_and_archived_readings_are_merged_in_order(self):
+        response = self.client.get(self.url, {'include_archived': 'true', 'visit_id': self.visit.id, 'page_size': 5})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual([row['heart_rate'] for row in response.data['results']], [60, 61, 62, 63, 64])
+
+        response = self.client.get(self.url, {
+            'include_archived': 'true', 'visit_id': self.visit.id, 'ordering': 'recorded_at',
+            'page_size': 5, 'page': 2,
+        })
+        self.assertEqual([row['heart_rate'] for row in response.data['results']], [66, 65, 64, 63, 62])
+
+    def test_date_range_applies_to_both_sides(self):
+        today = timezone.localdate()
+        response = self.client.get(self.url, {
+            'include_archived': 'true', 'from': today - timedelta(days=1), 'to': today, 'page_size': 100,
+        })
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['count'], 24)
+        recorded = [row['recorded_at'] for row in response.data['results']]
+        self.assertEqual(recorded, sorted(recorded, reverse=True))
+
+        # Archived batches straddling midnight are only partly in range.
+        response = self.client.get(self.url, {'include_archived': 'true', 'from': today, 'to': today})
+        expected = sum(1 for recorded_at in self.recorded_at if timezone.localdate(recorded_at) == today)
+        self.assertEqual(response.data['count'], expected)
+        self.assertEqual(len(response.data['results']), expected)
+
+
+class AdmissionStayTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        visit = EmergencyVisit.objects.create(patient_id=1, triage_level=2, chief_complaint="Synthetic complaint")
+        self.admission = Admission.objects.create(
+            visit=visit, admitted_by_id=7, admitting_diagnosis="Synthetic", department='Neurology'
+        )
+
+    def test_discharge_before_admission_is_rejected(self):
+        response = self.client.patch(
+            f'/api/visit/admissions/{self.admission.id}/',
+            {'discharge_time': (self.admission.admission_time - timedelta(hours=1)).isoformat()}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('discharge_time', response.data)
+        self.admission.refresh_from_db()
+        self.assertIsNone(self.admission.discharge_time)
+
+    def test_constraint_rejects_inverted_stays(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Admission.objects.filter(id=self.admission.id).update(
+                discharge_time=self.admission.admission_time - timedelta(seconds=1)
+            )
+
+
+class DateParameterTests(APITestCase):
+    """Malformed or impossible `from`/`to` dates are a 400, not a 500."""
+    invalid_dates = ('2024-13-45', '2024-02-30', 'yesterday')
+
+    def assertRejectsInvalidDates(self, url):
+        for param in ('from', 'to'):
+            for value in self.invalid_dates:
+                with self.subTest(url=url, **{param: value}):
+                    response = self.client.get(url, {param: value})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(param, response.data)
+
+    def test_kpis(self):
+        self.assertRejectsInvalidDates('/api/visit/emergency-visits/kpis/')
+        response = self.client.get('/api/visit/emergency-visits/kpis/', {'from': '2024-03-01', 'to': '2024-02-01'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/visit/emergency-visits/kpis/', {'from': '2024-02-01', 'to': '2024-02-29'})
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_arrivals_heatmap(self):
+        self.assertRejectsInvalidDates('/api/visit/emergency-visits/arrivals_heatmap/')
+        response = self.client.get('/api/visit/emergency-visits/arrivals_heatmap/', {'from': '2024-02-01'})
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_arrivals_heatmap_rejects_time_zones_off_the_hour(self):
+        url = '/api/visit/emergency-visits/arrivals_heatmap/'
+        for tz in ('Asia/Kolkata', 'Australia/Adelaide', 'Asia/Kathmandu'):
+            with self.subTest(tz=tz):
+                response = self.client.get(url, {'from': '2024-02-01', 'to': '2024-02-07', 'tz': tz})
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {'from': '2024-02-01', 'to': '2024-02-07', 'tz': 'Europe/Rome'})
+        self.assertEqual(response.status_code, 200, response.data)
+        response = self.client.get(url, {'tz': 'Mars/Olympus'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_top_diagnoses(self):
+        self.assertRejectsInvalidDates('/api/visit/diagnoses/top/')
+        response = self.client.get('/api/visit/diagnoses/top/', {'from': '2024-03-01', 'to': '2024-02-01'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/visit/diagnoses/top/', {'from': '2024-02-01', 'to': '2024-02-07'})
+        self.assertEqual(response.status_code, 200, response.data)
+
+
+class DepartmentAdmissionCounterTests(TestCase):
+    """The maintained counters must match a recount of the Admission table."""
+
+    def setUp(self):
+        visits = EmergencyVisit.objects.bulk_create([
+            EmergencyVisit(patient_id=i, triage_level=2, chief_complaint="Synthetic complaint") for i in range(3)
+        ])
+        self.admissions = [
+            Admission.objects.create(
+                visit=visit, admitted_by_id=7, admitting_diagnosis="Synthetic", department=department
+            )
+            for visit, department in zip(visits, ['Neurology', 'Neurology', 'Surgery'])
+        ]
+
+    def assertCountersMatchRecount(self):
+        call_command('rebuild_department_counters', check=True, stdout=io.StringIO())
+
+    def test_loaded_admissions(self):
+        admission = Admission.objects.get(pk=self.admissions[0].pk)
+        admission.discharge_time = timezone.now()
+        admission.save()
+        admission.department = 'Surgery'
+        admission.save()
+        self.assertCountersMatchRecount()
+
+    def test_admission_loaded_without_the_counted_fields(self):
+        admission = Admission.objects.only('id', 'notes').get(pk=self.admissions[0].pk)
+        admission.department = 'Cardiology'
+        admission.save()
+        self.assertCountersMatchRecount()
+
+    def test_admission_built_with_an_existing_pk(self):
+        stored = self.admissions[1]
+        Admission(
+            pk=stored.pk, visit_id=stored.visit_id, admitted_by_id=7, admitting_diagnosis="Synthetic",
+            department='Surgery', admission_time=stored.admission_time, discharge_time=timezone.now(),
+        ).save()
+        self.assertCountersMatchRecount()
+
+    def test_deletes(self):
+        Admission.objects.only('id').get(pk=self.admissions[2].pk).delete()
+        self.admissions[0].visit.delete()
+        self.assertCountersMatchRecount()
+
+
+class FullTextSearchFilterTests(TestCase):
+    def test_prefix_tsquery(self):
+        self.assertEqual(
+            FullTextSearchFilter.prefix_tsquery(['I21.4', "o'neil", '"chest']), "'I21.4':* & 'o''neil':* & 'chest':*"
+        )
+        # Excluded terms must not be matched back in as prefixes.
+        self.assertEqual(FullTextSearchFilter.prefix_tsquery(['pain', '-chest']), "'pain':*")
+        self.assertEqual(FullTextSearchFilter.prefix_tsquery(['-chest']), '')
+
+
+class PrescriptionQueueTests(APITestCase):
+    url = '/api/visit/prescriptions/'
+
+    def setUp(self):
+        super().setUp()
+        visit = EmergencyVisit.objects.create(patient_id=1, triage_level=3, chief_complaint="Synthetic complaint")
+        self.prescriptions = Prescription.objects.bulk_create([
+            Prescription(visit=visit, medication="Synthetic", dosage="1", frequency="1/d", duration="1d")
+            for _ in range(4)
+        ])
+        self.other = APIClient()
+        self.other.force_authenticate(User(id=2, username='other'), token='other-token')
+
+    def test_list_body_is_rejected(self):
+        response = self.client.post(f'{self.url}claim/', [{'limit': 2}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_limit_is_rejected(self):
+        response = self.client.post(f'{self.url}claim/', {'limit': 'all'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_claims_do_not_overlap(self):
+        mine = self.client.post(f'{self.url}claim/', {'limit': 3}, format='json')
+        theirs = self.other.post(f'{self.url}claim/', {'limit': 3}, format='json')
+        self.assertEqual(mine.status_code, 200)
+        mine_ids = [row['id'] for row in mine.data]
+        theirs_ids = [row['id'] for row in theirs.data]
+        self.assertEqual(len(mine_ids), 3)
+        self.assertEqual(len(theirs_ids), 1)
+        self.assertFalse(set(mine_ids) & set(theirs_ids))
+
+    def test_expired_claims_return_to_the_queue(self):
+        self.client.post(f'{self.url}claim/', {'limit': 4}, format='json')
+        Prescription.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        response = self.other.post(f'{self.url}claim/', {'limit': 4}, format='json')
+        self.assertEqual(len(response.data), 4)
+
+    def test_release_and_complete_only_own_claims(self):
+        claimed = self.client.post(f'{self.url}claim/', {'limit': 2}, format='json').data
+        first, second = (row['id'] for row in claimed)
+
+        self.assertEqual(self.other.post(f'{self.url}{first}/complete/').status_code, 409)
+        self.assertEqual(self.client.post(f'{self.url}{first}/complete/').status_code, 200)
+        self.assertEqual(self.client.post(f'{self.url}{second}/release/').status_code, 200)
+        # Neither can be completed again by its former holder.
+        self.assertEqual(self.client.post(f'{self.url}{first}/complete/').status_code, 409)
+        self.assertEqual(self.client.post(f'{self.url}{second}/complete/').status_code, 409)
+
+        first, second = Prescription.objects.get(id=first), Prescription.objects.get(id=second)
+        self.assertEqual((first.is_dispensed, first.claimed_by_id), (True, None))
+        self.assertEqual((second.is_dispensed, second.claimed_by_id), (False, None))
+
+    def test_unknown_prescription(self):
+        self.assertEqual(self.client.post(f'{self.url}999999/release/').status_code, 404)
+
+
+@override_settings(AUTH_SERVICE_INTROSPECT_URL='http://auth.test/api/auth/introspect/')
+class IntrospectedClaimTests(TestCase):
+    """Claims made by users authenticated through the auth service's token introspection."""
+    url = '/api/visit/prescriptions/'
+
+    def setUp(self):
+        visit = EmergencyVisit.objects.create(patient_id=1, triage_level=3, chief_complaint="Synthetic complaint")
+        self.prescriptions = Prescription.objects.bulk_create([
+            Prescription(visit=visit, medication="Synthetic", dosage="1", frequency="1/d", duration="1d")
+            for _ in range(2)
+        ])
+
+    def client_for(self, user):
+        """Client whose token the mocked introspection resolves to `user`."""
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'active': True, 'user': user}
+        patcher = mock.patch('visit_app.authentication.requests.post', return_value=response)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token introspected-token')
+        return client
+
+    def test_claims_are_owned_by_the_introspected_user(self):
+        client = self.client_for({'id': 5, 'username': 'pharmacist', 'email': 'pharmacist@example.com'})
+        response = client.post(f'{self.url}claim/', {'limit': 1}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        claimed = Prescription.objects.get(id=response.data[0]['id'])
+        self.assertEqual(claimed.claimed_by_id, 5)
+
+        # Another user can neither complete the claim nor dispense it.
+        with mock.patch('visit_app.authentication.requests.post') as post:
+            post.return_value = mock.Mock(status_code=200)
+            post.return_value.json.return_value = {'active': True, 'user': {'id': 6, 'username': 'other'}}
+            self.assertEqual(client.post(f'{self.url}{claimed.id}/complete/').status_code, 409)
+            response = client.post(
+                f'{self.url}dispense_batch/', {'prescriptions': [{'id': claimed.id}]}, format='json'
+            )
+            self.assertEqual(response.status_code, 409)
+        self.assertEqual(client.post(f'{self.url}{claimed.id}/complete/').status_code, 200)
+
+    def test_users_without_an_id_cannot_claim(self):
+        client = self.client_for({'username': 'service-account'})
+        self.assertEqual(client.post(f'{self.url}claim/', {}, format='json').status_code, 403)
+        self.assertEqual(client.post(f'{self.url}{self.prescriptions[0].id}/release/').status_code, 403)
+        self.assertEqual(client.post(f'{self.url}{self.prescriptions[0].id}/complete/').status_code, 403)
+        response = client.post(
+            f'{self.url}dispense_batch/', {'prescriptions': [{'id': self.prescriptions[0].id}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Prescription.objects.filter(claimed_by_id__isnull=False).exists())
+
+
+class BulkCreateTests(APITestCase):
+    url = '/api/visit/vital-signs/'
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('visit_app.serializers._make_authenticated_request', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.visits = EmergencyVisit.objects.bulk_create([
+            EmergencyVisit(patient_id=i, triage_level=3, chief_complaint="Synthetic complaint") for i in range(10)
+        ])
+
+    def test_list_is_created_in_one_batch(self):
+        payload = [{'visit': visit.id, 'heart_rate': 70 + i} for i, visit in enumerate(self.visits)]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(VitalSign.objects.count(), 10)
+        self.assertTrue(all(row['id'] for row in response.data))
+        # One query for the visits and one INSERT, not one of each per row.
+        self.assertLess(len(captured), 10)
+
+    def test_one_invalid_item_rejects_the_batch(self):
+        payload = [{'visit': self.visits[0].id, 'heart_rate': 70}, {'visit': 999999, 'heart_rate': 70}]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(VitalSign.objects.exists())
+
+    def test_batch_size_is_limited(self):
+        payload = [{'visit': self.visits[0].id}] * 501
+        self.assertEqual(self.client.post(self.url, payload, format='json').status_code, 400)
+
+    def test_bulk_update_needs_a_list_of_objects_with_ids(self):
+        self.assertEqual(self.client.patch(self.url, {'id': 1}, format='json').status_code, 400)
+        self.assertEqual(self.client.patch(self.url, ['1'], format='json').status_code, 400)
+        self.assertEqual(self.client.patch(self.url, [{'heart_rate': 70}], format='json').status_code, 400)
+
+
+class DischargeWorkflowTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.visit = EmergencyVisit.objects.create(patient_id=1, triage_level=2, chief_complaint="Synthetic complaint")
+        self.bed = Bed.objects.create(bed_number="B001", location='Neurology', status='OCCUP', patient_id=1)
+        self.admission = Admission.objects.create(
+            visit=self.visit, bed=self.bed, admitted_by_id=7, admitting_diagnosis="Synthetic", department='Neurology'
+        )
+        self.prescriptions = Prescription.objects.bulk_create([
+            Prescription(visit=self.visit, medication="Synthetic", dosage="1", frequency="1/d", duration="1d")
+            for _ in range(2)
+        ])
+        self.url = f'/api/visit/emergency-visits/{self.visit.id}/discharge_workflow/'
+
+    def test_discharge(self):
+        response = self.client.post(self.url, {
+            'discharge_diagnosis': "Synthetic", 'dispense_prescriptions': [self.prescriptions[0].id],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+        self.visit.refresh_from_db()
+        self.admission.refresh_from_db()
+        self.bed.refresh_from_db()
+        self.assertIsNotNone(self.visit.discharge_time)
+        self.assertEqual(self.visit.discharge_diagnosis, "Synthetic")
+        self.assertEqual(self.admission.discharge_time, self.visit.discharge_time)
+        self.assertEqual((self.bed.status, self.bed.patient_id), ('AVAIL', None))
+        self.assertEqual(
+            dict(Prescription.objects.values_list('id', 'is_dispensed')),
+            {self.prescriptions[0].id: True, self.prescriptions[1].id: False},
+        )
+        call_command('rebuild_department_counters', check=True, stdout=io.StringIO())
+
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_body_is_rejected(self):
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, 400)
+
+    def test_foreign_prescriptions_reject_the_whole_discharge(self):
+        other = EmergencyVisit.objects.create(patient_id=2, triage_level=3, chief_complaint="Synthetic complaint")
+        foreign = Prescription.objects.create(
+            visit=other, medication="Synthetic", dosage="1", frequency="1/d", duration="1d"
+        )
+        response = self.client.post(
+            self.url, {'dispense_prescriptions': [self.prescriptions[0].id, foreign.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['prescriptions'], [foreign.id])
+        self.visit.refresh_from_db()
+        self.assertIsNone(self.visit.discharge_time)
+        self.assertFalse(Prescription.objects.filter(is_dispensed=True).exists())
+
+    def test_unknown_visit(self):
+        response = self.client.post('/api/visit/emergency-visits/999999/discharge_workflow/', {}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+def recount_diagnoses():
+    counts = {}
+    for diagnosed_at, code in Diagnosis.objects.values_list('diagnosed_at', 'code'):
+        key = (timezone.localdate(diagnosed_at), DiagnosisDailyCount.normalize_code(code))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+
+class DiagnosisDailyCountTests(APITestCase):
+    """The daily diagnosis counters must match a recount after every write path."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('visit_app.serializers._make_authenticated_request', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.visits = [
+            EmergencyVisit.objects.create(patient_id=i, triage_level=3, chief_complaint="Synthetic complaint")
+            for i in range(3)
+        ]
+
+    def assertDiagnosisCountsMatch(self):
+        stored = {
+            (day, code): count
+            for day, code, count in DiagnosisDailyCount.objects.values_list('day', 'code', 'count') if count
+        }
+        self.assertEqual(stored, recount_diagnoses())
+
+    def test_diagnosis_write_paths(self):
+        response = self.client.post('/api/visit/diagnoses/', [
+            {'visit': visit.id, 'code': code, 'description': "Synthetic"}
+            for visit, code in zip(self.visits, ['I21.4', 'i21.4', 'R07.9'])
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertDiagnosisCountsMatch()
+
+        ids = [row['id'] for row in response.data]
+        response = self.client.patch('/api/visit/diagnoses/', [
+            {'id': ids[0], 'code': 'R07.9'}, {'id': ids[1], 'description': "Unchanged code"},
+        ], format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertDiagnosisCountsMatch()
+
+        response = self.client.patch(f'/api/visit/diagnoses/{ids[2]}/', {'code': 'J18.9'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertDiagnosisCountsMatch()
+
+        self.assertEqual(self.client.delete(f'/api/visit/diagnoses/{ids[1]}/').status_code, 204)
+        self.visits[0].delete()
+        self.assertDiagnosisCountsMatch()
+
+
+def recount_arrivals():
+    counts = {}
+    for arrival_time in EmergencyVisit.objects.values_list('arrival_time', flat=True):
+        hour = ArrivalHourlyCount.truncate(arrival_time)
+        counts[hour] = counts.get(hour, 0) + 1
+    return counts
+
+
+
+class ArrivalHourlyCountTests(TestCase):
+    """The hourly arrival rollups must match a recount after creates and deletes."""
+
+    def assertArrivalCountsMatch(self):
+        stored = {hour: count for hour, count in ArrivalHourlyCount.objects.values_list('hour', 'count') if count}
+        self.assertEqual(stored, recount_arrivals())
+
+    def test_creates_and_deletes(self):
+        visits = [
+            EmergencyVisit.objects.create(patient_id=i, triage_level=3, chief_complaint="Synthetic complaint")
+            for i in range(3)
+        ]
+        self.assertArrivalCountsMatch()
+        EmergencyVisit.objects.filter(id=visits[0].id).delete()
+        visits[1].delete()
+        self.assertArrivalCountsMatch()
@@ -1,11 +1,18 @@
+import copy
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     EmergencyVisitViewSet, VitalSignViewSet, TreatmentViewSet,
-    DiagnosisViewSet, PrescriptionViewSet, BedViewSet, AdmissionViewSet
+    DiagnosisViewSet, PrescriptionViewSet, BedViewSet, AdmissionViewSet,
+    TerminologyViewSet
 )
 
-router = DefaultRouter()
+class BulkRouter(DefaultRouter):
+    """DefaultRouter that also routes PATCH on the list URL to `bulk_partial_update`."""
+    routes = copy.deepcopy(DefaultRouter.routes)
+    routes[0].mapping['patch'] = 'bulk_partial_update'
+
+router = BulkRouter()
 router.register(r'emergency-visits', EmergencyVisitViewSet, basename='emergencyvisit')
 router.register(r'vital-signs', VitalSignViewSet, basename='vitalsign')
 router.register(r'treatments', TreatmentViewSet, basename='treatment')
@@ -13,6 +20,7 @@ router.register(r'diagnoses', DiagnosisViewSet, basename='diagnosis')
 router.register(r'prescriptions', PrescriptionViewSet, basename='prescription')
 router.register(r'beds', BedViewSet, basename='bed')
 router.register(r'admissions', AdmissionViewSet, basename='admission')
+router.register(r'terminology', TerminologyViewSet, basename='terminology')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,39 +1,165 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db import models 
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db.models.functions import Substr
+from datetime import datetime, time, timedelta
+import heapq
+import itertools
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db import models, transaction
+from .analytics import compute_kpis
+from .census import census_at, census_series
+from .exports import StreamingExportMixin
+from .filters import AdmissionFilter, EmergencyVisitFilter, FullTextSearchFilter
+from .metrics import record_cache
+from .terminology import KINDS, get_catalog, icd10_chapter
 from .models import (
-    EmergencyVisit, VitalSign, Treatment,
-    Diagnosis, Prescription, Bed, Admission
+    EmergencyVisit, ArrivalHourlyCount, VitalSign, VitalSignArchive, Treatment,
+    Diagnosis, DiagnosisDailyCount, Prescription, Bed, Admission,
+    DepartmentAdmissionCounter
 )
 from .serializers import (
     EmergencyVisitSerializer, VitalSignSerializer,
     TreatmentSerializer, DiagnosisSerializer,
-    PrescriptionSerializer, BedSerializer,
-    AdmissionSerializer
+    PrescriptionSerializer, PrescriptionDispenseSerializer, DischargeWorkflowSerializer,
+    BedSerializer, AdmissionSerializer, TimelineVisitSerializer,
+    PATIENT_SERVICE_BASE_URL, _decrement_inventory_stock, _make_authenticated_request
 )
+import logging
 
-class EmergencyVisitViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+def _date_param(request, name, default=None):
+    """
+    The `name` query parameter as a date (YYYY-MM-DD), or `default` when it
+    is absent. A malformed or impossible date (1980-13-45) is a 400.
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({name: "Enter a valid date in the YYYY-MM-DD format."})
+    return day
+
+def _coerce_id(value):
+    """Primary key given in a payload as an int or a numeric string, or None if it is neither."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return None
+
+class HasUserId(BasePermission):
+    """Prescription claims are keyed on the user id, so the user must have one."""
+    message = "The authenticated user has no id, which claiming prescriptions requires."
+
+    def has_permission(self, request, view):
+        return getattr(request.user, 'id', None) is not None
+
+class BulkWriteMixin:
+    """
+    List payloads for a ModelViewSet: POST with a list creates all items and
+    PATCH on the list route (each item carrying its `id`) partially updates
+    them. Items are validated together, with remote user checks memoized per
+    request, and written with bulk_create/bulk_update in one transaction;
+    a single invalid item rejects the whole batch.
+    """
+    bulk_max_items = 500
+
+    def _check_bulk_payload(self, data):
+        if not isinstance(data, list):
+            return Response({"detail": "Expected a list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} objects can be written at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        error = self._check_bulk_payload(request.data)
+        if error:
+            return error
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_partial_update(self, request, *args, **kwargs):
+        error = self._check_bulk_payload(request.data)
+        if error:
+            return error
+        raw_ids = [item.get('id') if isinstance(item, dict) else None for item in request.data]
+        if None in raw_ids:
+            return Response({"detail": "Every object must include its id."}, status=status.HTTP_400_BAD_REQUEST)
+        ids = [_coerce_id(pk) for pk in raw_ids]
+        invalid = [raw for raw, pk in zip(raw_ids, ids) if pk is None]
+        if invalid:
+            return Response(
+                {"detail": "Ids must be integers.", "invalid": invalid}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(set(ids)) != len(ids):
+            return Response({"detail": "Each object can only appear once."}, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = self.get_queryset().in_bulk(ids)
+        missing = [pk for pk in ids if pk not in instances]
+        if missing:
+            return Response({"detail": "Objects not found", "missing": missing}, status=status.HTTP_404_NOT_FOUND)
+
+        data = [{**item, 'id': pk} for item, pk in zip(request.data, ids)]
+        serializer = self.get_serializer([instances[pk] for pk in ids], data=data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            # Remote validation ran without locks held; lock the rows only for the write.
+            list(self.get_queryset().select_for_update().filter(id__in=ids).values_list('id', flat=True))
+            self.perform_update(serializer)
+        return Response(serializer.data)
+
+class TimelinePagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+class EmergencyVisitViewSet(StreamingExportMixin, viewsets.ModelViewSet):
     queryset = EmergencyVisit.objects.all()
     serializer_class = EmergencyVisitSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = {
-        'patient_id': ['exact'],
-        'triage_level': ['exact', 'lte', 'gte'],
-        'arrival_time': ['date', 'gte', 'lte'],
-        'is_admitted': ['exact'],
-        'attending_physician_id': ['exact'],
-        'triage_nurse_id': ['exact'],
-    }
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
+    filterset_class = EmergencyVisitFilter
     search_fields = ['chief_complaint', 'initial_observation']
     ordering_fields = ['arrival_time', 'triage_level']
     ordering = ['-arrival_time']
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+    export_date_field = 'arrival_time'
+    export_fields = (
+        'id', 'patient_id', 'arrival_time', 'triage_level', 'chief_complaint',
+        'initial_observation', 'discharge_time', 'discharge_diagnosis',
+        'discharge_instructions', 'is_admitted', 'attending_physician_id', 'triage_nurse_id',
+    )
 
     @action(detail=True, methods=['patch'])
     def discharge(self, request, pk=None):
@@ -57,6 +183,86 @@ class EmergencyVisitViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'])
+    def discharge_workflow(self, request, pk=None):
+        """
+        Discharge the visit, close its open admission, free the bed and
+        dispense the listed prescriptions in one transaction, with one UPDATE
+        per table and no remote lookups. Returns the resulting state.
+        """
+        payload = DischargeWorkflowSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        data = payload.validated_data
+        prescription_ids = set(data['dispense_prescriptions'])
+        now = timezone.now()
+
+        with transaction.atomic():
+            visit = self.get_queryset().select_for_update().filter(pk=pk).first()
+            if visit is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            if visit.discharge_time:
+                return Response(
+                    {"detail": "Visit already discharged"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            admission = (
+                Admission.objects.select_for_update()
+                .filter(visit_id=visit.pk, discharge_time__isnull=True)
+                .values('id', 'department', 'bed_id')
+                .first()
+            )
+            dispensable = set(
+                Prescription.objects.select_for_update()
+                .filter(visit_id=visit.pk, id__in=prescription_ids, is_dispensed=False)
+                .values_list('id', flat=True)
+            )
+            if dispensable != prescription_ids:
+                return Response(
+                    {
+                        "detail": "Prescriptions not found for this visit or already dispensed",
+                        "prescriptions": sorted(prescription_ids - dispensable),
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            visit_changes = {'discharge_time': now}
+            for field in ('discharge_diagnosis', 'discharge_instructions'):
+                if field in data:
+                    visit_changes[field] = data[field]
+            EmergencyVisit.objects.filter(pk=visit.pk).update(**visit_changes)
+
+            if admission:
+                # QuerySet.update() bypasses Admission.save(), so the counter is moved here.
+                Admission.objects.filter(pk=admission['id']).update(discharge_time=now)
+                DepartmentAdmissionCounter.bump(admission['department'], current=-1)
+                if admission['bed_id']:
+                    Bed.objects.filter(pk=admission['bed_id']).update(patient_id=None, status='AVAIL')
+
+            if prescription_ids:
+                Prescription.objects.filter(id__in=prescription_ids).update(
+                    is_dispensed=True, claimed_by_id=None, claimed_until=None
+                )
+
+        return Response({
+            'visit': {
+                'id': visit.pk,
+                'discharge_time': now,
+                'discharge_diagnosis': visit_changes.get('discharge_diagnosis', visit.discharge_diagnosis),
+                'discharge_instructions': visit_changes.get('discharge_instructions', visit.discharge_instructions),
+            },
+            'admission': {
+                'id': admission['id'],
+                'department': admission['department'],
+                'discharge_time': now,
+            } if admission else None,
+            'bed': {
+                'id': admission['bed_id'],
+                'status': 'AVAIL',
+            } if admission and admission['bed_id'] else None,
+            'dispensed_prescriptions': sorted(prescription_ids),
+        })
+
     @action(detail=False, methods=['get'])
     def active(self, request):
         queryset = self.filter_queryset(
@@ -84,7 +290,162 @@ class EmergencyVisitViewSet(viewsets.ModelViewSet):
         }
         return Response(stats_data)
 
-class VitalSignViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """
+        All visits of `patient_id`, newest first and paginated by visit, each
+        with its vital signs, treatments, diagnoses, prescriptions and
+        admission. Runs a fixed number of queries per page and fetches the
+        patient details once.
+        """
+        try:
+            patient_id = int(request.query_params['patient_id'])
+        except (KeyError, ValueError):
+            return Response({"detail": "patient_id is required and must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        visits = (
+            EmergencyVisit.objects.filter(patient_id=patient_id)
+            .select_related('admission')
+            .prefetch_related(
+                models.Prefetch('vital_signs', queryset=VitalSign.objects.order_by('recorded_at')),
+                models.Prefetch('treatments', queryset=Treatment.objects.order_by('administered_at')),
+                models.Prefetch('diagnoses', queryset=Diagnosis.objects.order_by('diagnosed_at')),
+                models.Prefetch('prescriptions', queryset=Prescription.objects.order_by('prescribed_at')),
+            )
+            .order_by('-arrival_time', '-id')
+        )
+        paginator = TimelinePagination()
+        page = paginator.paginate_queryset(visits, request, view=self)
+        return Response({
+            'patient_id': patient_id,
+            'patient_details': _make_authenticated_request(
+                PATIENT_SERVICE_BASE_URL, "patients", patient_id, "patient", request=request
+            ),
+            'count': paginator.page.paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': TimelineVisitSerializer(page, many=True, context={'request': request}).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def kpis(self, request):
+        date_to = _date_param(request, 'to', timezone.localdate())
+        date_from = _date_param(request, 'from', date_to - timedelta(days=29))
+        if date_from > date_to:
+            return Response({"detail": "from must not be after to."}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_key = f"visit-kpis:{date_from.isoformat()}:{date_to.isoformat()}"
+        kpis = cache.get(cache_key)
+        record_cache('kpis', kpis is not None)
+        if kpis is None:
+            kpis = compute_kpis(date_from, date_to)
+            cache.set(cache_key, kpis, settings.KPI_CACHE_SECONDS)
+        return Response(kpis)
+
+    @action(detail=False, methods=['get'])
+    def arrivals_heatmap(self, request):
+        """
+        Arrivals by day of week (0=Monday) and hour of day between `from` and
+        `to` (inclusive), summed from the hourly rollups in the time zone
+        given by `tz` (default: the server time zone). The rollups are whole
+        UTC hours, so zones whose offset is not a whole hour somewhere in the
+        range (e.g. Asia/Kolkata) are rejected rather than misbucketed.
+        """
+        date_to = _date_param(request, 'to', timezone.localdate())
+        date_from = _date_param(request, 'from', date_to - timedelta(days=27))
+        if date_from > date_to:
+            return Response({"detail": "from must not be after to."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            tz = ZoneInfo(request.query_params['tz']) if request.query_params.get('tz') else timezone.get_current_timezone()
+        except (ZoneInfoNotFoundError, ValueError):
+            return Response({"detail": "Unknown time zone."}, status=status.HTTP_400_BAD_REQUEST)
+
+        start = timezone.make_aware(datetime.combine(date_from, time.min), tz)
+        end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min), tz)
+        days = (date_to - date_from).days + 2
+        if any((start + timedelta(days=i)).astimezone(tz).utcoffset().total_seconds() % 3600 for i in range(days)):
+            return Response({"detail": "The time zone must be a whole number of hours from UTC in the requested range."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        heatmap = [[0] * 24 for _ in range(7)]
+        rollups = ArrivalHourlyCount.objects.filter(hour__gte=start, hour__lt=end).values_list('hour', 'count')
+        for hour, count in rollups:
+            local = hour.astimezone(tz)
+            heatmap[local.weekday()][local.hour] += count
+
+        return Response({
+            'from': date_from,
+            'to': date_to,
+            'timezone': str(tz),
+            'total': sum(map(sum, heatmap)),
+            'by_weekday': [sum(row) for row in heatmap],
+            'by_hour': [sum(row[hour] for row in heatmap) for hour in range(24)],
+            'heatmap': heatmap,
+        })
+
+class ArchivedReadingsPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+class MergedReadings:
+    """
+    Live and archived vital signs as one sequence ordered by recorded_at, for
+    the paginator. Both sides are read as ordered streams and merged, so a
+    page only decompresses the archives that reach it; the count comes from
+    the archives' reading_count, decompressing only the batches that straddle
+    the [start, end) range.
+    """
+
+    def __init__(self, live, archives, descending, start=None, end=None):
+        self.live = live
+        self.archives = archives
+        self.descending = descending
+        self.start = start
+        self.end = end
+
+    def _in_range(self, reading):
+        return self.start is None or self.start <= reading.recorded_at < self.end
+
+    def count(self):
+        total = self.live.count()
+        inside = self.archives
+        if self.start is not None:
+            inside = self.archives.filter(first_recorded_at__gte=self.start, last_recorded_at__lt=self.end)
+            for archive in self.archives.exclude(pk__in=inside.values('pk')):
+                total += sum(1 for reading in archive.readings() if self._in_range(reading))
+        return total + (inside.aggregate(total=models.Sum('reading_count'))['total'] or 0)
+
+    def _key(self, recorded_at):
+        timestamp = recorded_at.timestamp()
+        return -timestamp if self.descending else timestamp
+
+    def _archived(self):
+        # Archives come in order of their newest (or oldest) reading: once the
+        # next archive starts, nothing after it can precede what is buffered
+        # up to its boundary.
+        boundary_field = 'last_recorded_at' if self.descending else 'first_recorded_at'
+        archives = self.archives.order_by(f"{'-' if self.descending else ''}{boundary_field}", 'id')
+        buffered = []
+        for archive in archives.iterator(chunk_size=100):
+            boundary = self._key(getattr(archive, boundary_field))
+            while buffered and buffered[0][0] <= boundary:
+                yield heapq.heappop(buffered)[2]
+            for reading in archive.readings():
+                if self._in_range(reading):
+                    heapq.heappush(buffered, (self._key(reading.recorded_at), reading.id, reading))
+        while buffered:
+            yield heapq.heappop(buffered)[2]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("MergedReadings only supports slicing")
+        merged = heapq.merge(
+            self.live.iterator(chunk_size=500), self._archived(),
+            key=lambda reading: reading.recorded_at, reverse=self.descending,
+        )
+        return list(itertools.islice(merged, index.start, index.stop))
+
+class VitalSignViewSet(StreamingExportMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = VitalSignSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -92,23 +453,78 @@ class VitalSignViewSet(viewsets.ModelViewSet):
     ordering_fields = ['recorded_at']
     ordering = ['-recorded_at']
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+    export_date_field = 'recorded_at'
+    archive_max_days = 31
+    export_fields = (
+        'id', 'visit_id', 'recorded_by_id', 'recorded_at', 'temperature', 'heart_rate',
+        'blood_pressure_systolic', 'blood_pressure_diastolic', 'respiratory_rate',
+        'oxygen_saturation', 'pain_level', 'gcs_score', 'notes',
+    )
 
     def get_queryset(self):
         queryset = VitalSign.objects.all()
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """
+        With `include_archived`, the archived readings are merged in. That
+        requires `visit_id` or a `from`/`to` date range of at most
+        `archive_max_days` days, and the merged list is always paginated.
+        """
+        include_archived = request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+        if not include_archived:
+            return super().list(request, *args, **kwargs)
+
+        date_from = _date_param(request, 'from')
+        date_to = _date_param(request, 'to')
+        if (date_from is None) != (date_to is None):
+            return Response({"detail": "from and to must be given together."}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from and date_from > date_to:
+            return Response({"detail": "from must not be after to."}, status=status.HTTP_400_BAD_REQUEST)
+        bounded = date_from and (date_to - date_from).days < self.archive_max_days
+        if not request.query_params.get('visit_id') and not bounded:
+            return Response(
+                {"detail": f"include_archived requires visit_id or a from/to range of at most {self.archive_max_days} days."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        readings = self.filter_queryset(self.get_queryset()).select_related('visit')
+        archives = VitalSignArchive.objects.select_related('visit')
+        for backend in self.filter_backends:
+            if not issubclass(backend, OrderingFilter):
+                archives = backend().filter_queryset(request, archives, self)
+        start = end = None
+        if date_from:
+            start = timezone.make_aware(datetime.combine(date_from, time.min))
+            end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+            readings = readings.filter(recorded_at__gte=start, recorded_at__lt=end)
+            archives = archives.filter(last_recorded_at__gte=start, first_recorded_at__lt=end)
+        ordering = OrderingFilter().get_ordering(request, readings, self) or self.ordering
+
+        paginator = ArchivedReadingsPagination()
+        page = paginator.paginate_queryset(
+            MergedReadings(readings, archives, ordering[0].startswith('-'), start, end), request, view=self
+        )
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     def perform_create(self, serializer):
         serializer.save(recorded_by_id=self.request.user.id)
 
-class TreatmentViewSet(viewsets.ModelViewSet):
+class TreatmentViewSet(StreamingExportMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = TreatmentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['visit_id', 'treatment_type'] 
     search_fields = ['name', 'description']
     ordering_fields = ['administered_at']
     ordering = ['-administered_at']
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+    export_date_field = 'administered_at'
+    export_fields = (
+        'id', 'visit_id', 'treatment_type', 'name', 'description', 'administered_by_id',
+        'administered_at', 'dosage', 'outcome', 'complications',
+    )
 
     def get_queryset(self):
         return Treatment.objects.all()
@@ -116,13 +532,19 @@ class TreatmentViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(administered_by_id=self.request.user.id)
 
-class DiagnosisViewSet(viewsets.ModelViewSet):
+class DiagnosisViewSet(StreamingExportMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = DiagnosisSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['visit_id', 'is_primary'] 
     search_fields = ['code', 'description']
+    search_prefix_fields = ['code']
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+    export_date_field = 'diagnosed_at'
+    export_fields = (
+        'id', 'visit_id', 'code', 'description', 'diagnosed_by_id', 'diagnosed_at',
+        'is_primary', 'notes',
+    )
 
     def get_queryset(self):
         return Diagnosis.objects.all()
@@ -130,7 +552,52 @@ class DiagnosisViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(diagnosed_by_id=self.request.user.id)
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        level = request.query_params.get('level', 'code')
+        if level not in ('code', 'category', 'chapter'):
+            return Response(
+                {"detail": "level must be one of: code, category, chapter"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        date_to = _date_param(request, 'to', timezone.localdate())
+        date_from = _date_param(request, 'from', date_to - timedelta(days=6))
+        if date_from > date_to:
+            return Response({"detail": "from must not be after to."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 200)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        counts = DiagnosisDailyCount.objects.filter(day__range=(date_from, date_to))
+        if level == 'code':
+            rows = counts.values_list('code').annotate(total=models.Sum('count')).order_by()
+        else:
+            rows = (
+                counts.annotate(category=Substr('code', 1, 3))
+                .values_list('category').annotate(total=models.Sum('count')).order_by()
+            )
+
+        if level == 'chapter':
+            totals, titles = {}, {}
+            for category, total in rows:
+                chapter, title = icd10_chapter(category)
+                totals[chapter] = totals.get(chapter, 0) + total
+                titles[chapter] = title
+            results = [
+                {'chapter': chapter, 'title': titles[chapter], 'count': total}
+                for chapter, total in totals.items()
+            ]
+        else:
+            results = [{level: key, 'count': total} for key, total in rows]
+
+        results = sorted(
+            (result for result in results if result['count'] > 0),
+            key=lambda result: (-result['count'], str(result[level]))
+        )[:limit]
+        return Response({'from': date_from, 'to': date_to, 'level': level, 'results': results})
+
+class PrescriptionViewSet(StreamingExportMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = PrescriptionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -139,6 +606,11 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
     ordering_fields = ['prescribed_at']
     ordering = ['-prescribed_at']
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+    export_date_field = 'prescribed_at'
+    export_fields = (
+        'id', 'visit_id', 'medication', 'dosage', 'frequency', 'duration',
+        'prescribed_by_id', 'prescribed_at', 'instructions', 'is_dispensed', 'refills',
+    )
 
     def get_queryset(self):
         return Prescription.objects.all()
@@ -156,10 +628,172 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
             )
         
         prescription.is_dispensed = True
+        prescription.claimed_by_id = None
+        prescription.claimed_until = None
         prescription.save()
         serializer = self.get_serializer(prescription)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, HasUserId])
+    def claim(self, request):
+        """
+        Claim up to `limit` undispensed prescriptions, oldest first, for the
+        current pharmacist. Rows locked by a concurrent claim are skipped, so
+        several pharmacists can work the queue without getting the same rows.
+        Claims expire after PRESCRIPTION_CLAIM_LEASE_SECONDS.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"detail": "Expected an object"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(request.data.get('limit', 10)), 1), 100)
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                Prescription.objects
+                .select_for_update(skip_locked=True)
+                .filter(is_dispensed=False)
+                .filter(models.Q(claimed_until__isnull=True) | models.Q(claimed_until__lt=now))
+                .order_by('prescribed_at', 'id')
+                .values_list('id', flat=True)[:limit]
+            )
+            Prescription.objects.filter(id__in=ids).update(
+                claimed_by_id=request.user.id,
+                claimed_until=now + timedelta(seconds=settings.PRESCRIPTION_CLAIM_LEASE_SECONDS),
+            )
+
+        claimed = self.get_queryset().filter(id__in=ids).order_by('prescribed_at', 'id')
+        serializer = self.get_serializer(claimed, many=True)
+        return Response(serializer.data)
+
+    def _update_own_claim(self, request, pk, **changes):
+        updated = Prescription.objects.filter(
+            pk=pk,
+            is_dispensed=False,
+            claimed_by_id=request.user.id,
+            claimed_until__gte=timezone.now(),
+        ).update(claimed_by_id=None, claimed_until=None, **changes)
+        if not updated:
+            self.get_object()
+            return Response(
+                {"detail": "Prescription is not claimed by you or the claim has expired"},
+                status=status.HTTP_409_CONFLICT
+            )
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, HasUserId])
+    def release(self, request, pk=None):
+        """Return a claimed prescription to the queue."""
+        return self._update_own_claim(request, pk)
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, HasUserId])
+    def complete(self, request, pk=None):
+        """Mark a claimed prescription as dispensed."""
+        return self._update_own_claim(request, pk, is_dispensed=True)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, HasUserId])
+    def dispense_batch(self, request):
+        """
+        Dispense several prescriptions and decrement the linked inventory
+        items with a single call to inventory_service.
+        Body: {"prescriptions": [{"id": 1, "inventory_item_id": 5, "quantity": 2}, ...]}
+
+        The prescriptions are first reserved as a claim of the current user,
+        in a short transaction, so that no row lock is held while waiting on
+        inventory_service. They are marked dispensed once the stock has been
+        decremented, and released if inventory_service rejects the decrement.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"detail": "Expected an object with a prescriptions list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        items = PrescriptionDispenseSerializer(data=request.data.get('prescriptions'), many=True)
+        items.is_valid(raise_exception=True)
+        ids = [item['id'] for item in items.validated_data]
+        if len(set(ids)) != len(ids):
+            return Response(
+                {"detail": "Each prescription can only appear once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        now = timezone.now()
+        with transaction.atomic():
+            prescriptions = {
+                prescription.id: prescription
+                for prescription in self.get_queryset().select_for_update().filter(id__in=ids).order_by('id')
+            }
+            missing = sorted(set(ids) - set(prescriptions))
+            if missing:
+                return Response(
+                    {"detail": "Prescriptions not found", "missing": missing},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            already_dispensed = sorted(pk for pk, prescription in prescriptions.items() if prescription.is_dispensed)
+            if already_dispensed:
+                return Response(
+                    {"detail": "Prescriptions already dispensed", "already_dispensed": already_dispensed},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            claimed_by_others = sorted(
+                pk for pk, prescription in prescriptions.items()
+                if prescription.claimed_by_id not in (None, request.user.id)
+                and prescription.claimed_until and prescription.claimed_until >= now
+            )
+            if claimed_by_others:
+                return Response(
+                    {"detail": "Prescriptions claimed by another user", "claimed": claimed_by_others},
+                    status=status.HTTP_409_CONFLICT
+                )
+            Prescription.objects.filter(id__in=ids).update(
+                claimed_by_id=request.user.id,
+                claimed_until=now + timedelta(seconds=settings.PRESCRIPTION_CLAIM_LEASE_SECONDS),
+            )
+
+        reserved = Prescription.objects.filter(id__in=ids, is_dispensed=False, claimed_by_id=request.user.id)
+        stock_lines = [
+            {'id': item['inventory_item_id'], 'quantity': item['quantity']}
+            for item in items.validated_data if item.get('inventory_item_id')
+        ]
+        try:
+            stock = _decrement_inventory_stock(stock_lines, request=request) if stock_lines else []
+        except ValidationError:
+            reserved.update(claimed_by_id=None, claimed_until=None)
+            raise
+        with transaction.atomic():
+            dispensed = sorted(reserved.select_for_update().values_list('id', flat=True))
+            Prescription.objects.filter(id__in=dispensed).update(
+                is_dispensed=True, claimed_by_id=None, claimed_until=None
+            )
+        lost = sorted(set(ids) - set(dispensed))
+        if lost:
+            # The lease ran out during the inventory call and the rows were
+            # claimed (or dispensed) by someone else: their stock has been
+            # decremented all the same and needs reconciling by hand.
+            logger.error(
+                "dispense_batch decremented the stock of prescriptions %s whose reservation was lost", lost
+            )
+            return Response(
+                {
+                    "detail": "Stock was decremented but some reservations expired before dispensing",
+                    "dispensed": dispensed,
+                    "lost": lost,
+                    "stock": stock,
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({'dispensed': dispensed, 'stock': stock})
+
 class BedViewSet(viewsets.ModelViewSet):
     queryset = Bed.objects.all()
     serializer_class = BedSerializer
@@ -211,21 +845,20 @@ class BedViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(bed)
         return Response(serializer.data)
 
-class AdmissionViewSet(viewsets.ModelViewSet):
+class AdmissionViewSet(StreamingExportMixin, viewsets.ModelViewSet):
     queryset = Admission.objects.all()
     serializer_class = AdmissionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = {
-        'visit_id': ['exact'], 
-        'bed_id': ['exact', 'isnull'], 
-        'department': ['exact', 'icontains'],
-        'admission_time': ['date', 'gte', 'lte'],
-        'discharge_time': ['date', 'gte', 'lte', 'isnull'],
-    }
+    filterset_class = AdmissionFilter
     ordering_fields = ['admission_time', 'discharge_time']
     ordering = ['-admission_time']
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+    export_date_field = 'admission_time'
+    export_fields = (
+        'id', 'visit_id', 'bed_id', 'admitted_by_id', 'admission_time', 'discharge_time',
+        'admitting_diagnosis', 'department', 'notes',
+    )
 
     @action(detail=True, methods=['patch'])
     def discharge(self, request, pk=None):
@@ -266,12 +899,86 @@ class AdmissionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def department_stats(self, request):
-        stats_data = dict( 
-            Admission.objects.values_list('department')
-            .annotate(
-                count=models.Count('id'),
-                current=models.Count('id', filter=models.Q(discharge_time__isnull=True))
+        counters = DepartmentAdmissionCounter.objects.filter(total__gt=0).order_by('department')
+        stats_data = {
+            counter.department: {'total': counter.total, 'current': counter.current}
+            for counter in counters
+        }
+        return Response(stats_data)
+
+    @action(detail=False, methods=['get'])
+    def census(self, request):
+        """
+        Admitted patients at an instant (`at`, default now) by department, or
+        a time series from `from` to `to` every `interval` seconds. Both can
+        be narrowed to a `department` or a `bed_id`.
+        """
+        params = request.query_params
+        department = params.get('department') or None
+        bed_id = params.get('bed_id') or None
+        try:
+            bed_id = int(bed_id) if bed_id else None
+            moments = {key: self._parse_moment(params[key]) for key in ('at', 'from', 'to') if params.get(key)}
+        except ValueError:
+            return Response(
+                {"detail": "at, from and to must be ISO 8601 date-times; bed_id must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            .order_by('department')
-        )
-        return Response(stats_data)
\ No newline at end of file
+
+        if 'from' not in moments and 'to' not in moments:
+            at = moments.get('at', timezone.now())
+            by_department = census_at(at, department=department, bed_id=bed_id)
+            return Response({
+                'at': at,
+                'occupied': sum(by_department.values()),
+                'by_department': by_department,
+            })
+
+        if 'from' not in moments or 'to' not in moments or moments['from'] > moments['to']:
+            return Response(
+                {"detail": "A time series needs both from and to, with from not after to."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            step = timedelta(seconds=int(params.get('interval', 3600)))
+        except ValueError:
+            return Response({"detail": "interval must be a number of seconds."}, status=status.HTTP_400_BAD_REQUEST)
+        if step <= timedelta(0) or (moments['to'] - moments['from']) / step > 1000:
+            return Response(
+                {"detail": "interval must be positive and produce at most 1000 points."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        series = census_series(moments['from'], moments['to'], step, department=department, bed_id=bed_id)
+        return Response({
+            'from': moments['from'],
+            'to': moments['to'],
+            'interval': int(step.total_seconds()),
+            'series': [{'at': at, 'occupied': occupied} for at, occupied in series],
+        })
+
+    @staticmethod
+    def _parse_moment(value):
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(value)
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+class TerminologyViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        query = request.query_params.get('q', '')
+        kind = request.query_params.get('kind') or None
+        if kind is not None and kind not in KINDS:
+            return Response(
+                {"detail": f"kind must be one of: {', '.join(KINDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(get_catalog().autocomplete(query, kind=kind, limit=limit))
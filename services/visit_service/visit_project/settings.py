@@ -48,6 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'visit_app.tracing.TracingMiddleware',
+    'visit_app.timing.ServerTimingMiddleware',
+    'visit_app.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -142,6 +145,33 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_SERVICE_INTROSPECT_URL = os.environ.get('AUTH_INTROSPECT_URL')
 
+# Vital signs of visits discharged longer ago than this are moved to
+# VitalSignArchive by `manage.py archive_vital_signs`.
+VITAL_SIGN_ARCHIVE_AFTER_DAYS = int(os.environ.get('VITAL_SIGN_ARCHIVE_AFTER_DAYS', 90))
+
+# Text search configuration used by the PostgreSQL search_vector triggers and
+# by FullTextSearchFilter, by default the one of LANGUAGE_CODE. The triggers
+# are created with the value active when migration 0003 runs: changing it
+# afterwards requires recreating them, or queries stem differently from the
+# stored vectors.
+FULL_TEXT_SEARCH_CONFIG = os.environ.get(
+    'FULL_TEXT_SEARCH_CONFIG',
+    {'en': 'english', 'it': 'italian'}.get(LANGUAGE_CODE.split('-')[0], 'simple'),
+)
+
+# Tab-separated kind/code/label catalog (optionally .gz) served by the
+# terminology autocomplete endpoint. Loaded once at startup.
+TERMINOLOGY_CATALOG_PATH = os.environ.get(
+    'TERMINOLOGY_CATALOG_PATH', BASE_DIR / 'visit_app' / 'data' / 'terminology.tsv'
+)
+
+# Seconds a pharmacist keeps the prescriptions claimed from the work queue
+# before they are handed out to someone else.
+PRESCRIPTION_CLAIM_LEASE_SECONDS = int(os.environ.get('PRESCRIPTION_CLAIM_LEASE_SECONDS', 300))
+
+# Seconds the emergency-visits/kpis/ results are cached for a given date range.
+KPI_CACHE_SECONDS = int(os.environ.get('KPI_CACHE_SECONDS', 300))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'visit_app.authentication.RemoteTokenAuthentication',
@@ -154,4 +184,29 @@ REST_FRAMEWORK = {
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
-]
\ No newline at end of file
+]
+
+# One JSON line per request with its SQL, upstream and rendering timings
+# (see visit_app.timing); logged when REQUEST_TIMING_LOG_LEVEL=INFO
+# (docker-compose sets it), silent by default so tests and benchmarks stay quiet.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'visit_app.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Tracing (see visit_app.tracing): finished spans kept in memory per process,
+# optionally appended to a JSON-lines file, and served at /traces when
+# enabled (span names carry patient and staff ids).
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 5000))
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH')
+TRACE_ENDPOINT_ENABLED = os.environ.get('TRACE_ENDPOINT_ENABLED', 'false').lower() == 'true'
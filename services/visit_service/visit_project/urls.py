@@ -16,8 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from visit_app.metrics import metrics_view
+from visit_app.tracing import traces_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/visit/', include('visit_app.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('traces', traces_view, name='traces'),
 ]